@@ -71,6 +71,7 @@ class CrawlerStartRequest(BaseModel):
     save_option: SaveDataOptionEnum = SaveDataOptionEnum.JSON
     cookies: str = ""
     headless: bool = False
+    resume_run_id: str = ""  # 从指定运行ID的断点继续爬取
 
 
 class CrawlerStatusResponse(BaseModel):
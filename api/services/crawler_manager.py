@@ -230,6 +230,9 @@ class CrawlerManager:
 
         cmd.extend(["--headless", "true" if config.headless else "false"])
 
+        if config.resume_run_id:
+            cmd.extend(["--resume", config.resume_run_id])
+
         return cmd
 
     async def _read_output(self):
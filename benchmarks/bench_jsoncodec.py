@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/benchmarks/bench_jsoncodec.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# JSON 编解码层基准：对比标准库 json 与 tools.jsoncodec（安装 orjson 时为 orjson）在热路径上的单次调用耗时
+# 用法（项目根目录下）: python benchmarks/bench_jsoncodec.py [--number 2000]
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools import jsoncodec  # noqa: E402
+
+
+def _search_response(count: int = 20) -> bytes:
+    """搜索接口响应（XiaoHongShuClient.request 解析的数据）"""
+    items = [
+        {
+            "id": f"{i:024x}",
+            "model_type": "note",
+            "xsec_token": "ABx" + "t" * 40,
+            "note_card": {
+                "display_title": f"笔记标题 {i} " + "内容" * 10,
+                "type": "normal",
+                "user": {"user_id": f"{i:024x}", "nickname": f"用户{i}", "avatar": "https://sns-avatar.example/" + "a" * 60},
+                "interact_info": {"liked": False, "liked_count": str(i * 13)},
+                "cover": {"url_default": "https://sns-webpic.example/" + "c" * 80, "width": 1080, "height": 1440},
+                "corner_tag_info": [{"type": "publish_time", "text": "3天前"}],
+            },
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"code": 0, "success": True, "msg": "成功", "data": {"has_more": True, "items": items}}, ensure_ascii=False).encode("utf-8")
+
+
+_COMMENT_ROW = {
+    "comment_id": "65a1b2c3000000001f00abcd",
+    "create_time": 1700000000000,
+    "ip_location": "上海",
+    "note_id": "64b8f0e1000000001203c5a1",
+    "content": "这条评论的内容比较长，" * 8,
+    "user_id": "5f0a1b2c000000000100abcd",
+    "nickname": "评论用户",
+    "avatar": "https://sns-avatar.example/" + "a" * 60,
+    "sub_comment_count": "3",
+    "pictures": "",
+    "parent_comment_id": 0,
+    "last_modify_ts": 1700000000123,
+    "like_count": "42",
+    "source_keyword": "露营",
+}
+_SIGN_PAYLOAD = {"keyword": "露营 装备", "page": 2, "page_size": 20, "search_id": "2c7hu5b3kzoivkh848hp0", "sort": "general", "note_type": 0}
+_EVENT = {"stage": "crawl", "type": "comments", "note_id": "64b8f0e1000000001203c5a1", "count": 20}
+_RESPONSE = _search_response()
+_JSONL_LINE = json.dumps(_COMMENT_ROW, ensure_ascii=False)
+
+CASES = [
+    ("response.json", lambda: json.loads(_RESPONSE), lambda: jsoncodec.loads(_RESPONSE)),
+    ("jsonl row", lambda: json.dumps(_COMMENT_ROW, ensure_ascii=False), lambda: jsoncodec.dumps(_COMMENT_ROW)),
+    ("jsonl read", lambda: json.loads(_JSONL_LINE), lambda: jsoncodec.loads(_JSONL_LINE)),
+    ("[EVENT]", lambda: json.dumps(_EVENT), lambda: jsoncodec.dumps(_EVENT)),
+    (
+        "sign string",
+        lambda: json.dumps(_SIGN_PAYLOAD, separators=(",", ":"), ensure_ascii=False),
+        lambda: jsoncodec.dumps_compact(_SIGN_PAYLOAD),
+    ),
+]
+
+
+def _normalize(value):
+    # 序列化结果的分隔符可能不同，比较解析后的对象
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _per_call_us(func, number: int) -> float:
+    # 取多轮中的最小值，降低调度抖动的影响
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="jsoncodec microbenchmark")
+    parser.add_argument("--number", type=int, default=2000, help="每轮调用次数")
+    args = parser.parse_args()
+
+    print(f"backend: {jsoncodec.BACKEND}, search response: {len(_RESPONSE)} bytes")
+    print(f"{'case':<16}{'stdlib(us)':>12}{'codec(us)':>12}{'speedup':>10}")
+    for name, stdlib, codec in CASES:
+        assert _normalize(stdlib()) == _normalize(codec()), f"{name}: result differs"
+        std_us = _per_call_us(stdlib, args.number)
+        codec_us = _per_call_us(codec, args.number)
+        print(f"{name:<16}{std_us:>12.2f}{codec_us:>12.2f}{std_us / codec_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/benchmarks/bench_proxy_pool.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 代理池基准：本地代理（proxy/providers/local_proxy.py）+ 本地模拟上游，
+# 通过 ProxyIpPool + XiaoHongShuClient.request 并发请求，对比稳定代理与代理频繁失效（churn）时的吞吐量和尾延迟
+# 代理、上游和客户端运行在同一个事件循环中，结果只用于不同场景/版本之间的相对比较
+# 用法（项目根目录下）: python benchmarks/bench_proxy_pool.py [--duration 10] [--concurrency 16] [--kill-interval 2]
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from media_platform.xhs.client import XiaoHongShuClient  # noqa: E402
+from proxy.providers.local_proxy import LocalProxyProvider  # noqa: E402
+from proxy.proxy_health import proxy_url  # noqa: E402
+from proxy.proxy_ip_pool import ProxyIpPool  # noqa: E402
+from tools import utils  # noqa: E402
+from tools.rate_limiter import AdaptiveRateController  # noqa: E402
+
+# 模拟上游的连接及其处理协程，退出前关闭
+_upstream_conns = {}
+
+_BODY = json.dumps({"success": True, "code": 0, "data": {"items": [{"id": i} for i in range(20)]}}).encode()
+
+
+async def _handle_upstream(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """模拟上游：keep-alive，任意请求都返回同一个成功响应"""
+    _upstream_conns[writer] = asyncio.current_task()
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            for line in head.decode("latin-1").split("\r\n"):
+                if line.lower().startswith("content-length:"):
+                    await reader.readexactly(int(line.split(":", 1)[1]))
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(_BODY)}\r\n\r\n".encode()
+                + _BODY
+            )
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        _upstream_conns.pop(writer, None)
+        writer.close()
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def _run_scenario(args, upstream_port: int, kill_interval: Optional[float]) -> Dict:
+    provider = LocalProxyProvider(
+        latency=args.proxy_latency_ms / 1000,
+        latency_jitter=args.proxy_jitter_ms / 1000,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    pool = ProxyIpPool(
+        ip_pool_count=args.proxies,
+        enable_validate_ip=True,
+        ip_provider=provider,
+        maintain_interval=2,
+        evict_after_failures=config.IP_PROXY_EVICT_AFTER_FAILURES,
+        refresh_check_interval=0.2,
+    )
+    pool.valid_ip_url = f"http://127.0.0.1:{upstream_port}/"
+    await pool.start()
+    first_proxy = await pool.get_proxy()
+    client = XiaoHongShuClient(
+        timeout=5,
+        proxy=proxy_url(first_proxy),
+        headers={},
+        playwright_page=None,
+        cookie_dict={},
+        proxy_ip_pool=pool,
+        # 不限速，只测代理路径本身
+        rate_controller=AdaptiveRateController(initial_rate=1e6, min_rate=1e6, max_rate=1e6, burst=10000),
+    )
+    url = f"http://127.0.0.1:{upstream_port}/api/sns/web/v1/feed"
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + args.duration
+
+    async def worker() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                await client.request("GET", url)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    async def killer() -> None:
+        # 周期性停止当前代理，模拟代理突然失效
+        while True:
+            await asyncio.sleep(kill_interval)
+            if pool.current_proxy is not None:
+                await provider.stop_proxy(pool.current_proxy.port)
+
+    killer_task = asyncio.create_task(killer()) if kill_interval else None
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+    elapsed = time.perf_counter() - started
+    if killer_task is not None:
+        killer_task.cancel()
+        await asyncio.gather(killer_task, return_exceptions=True)
+
+    pool_stats = pool.stats()
+    provider_stats = provider.stats()
+    await pool.close()
+    await client.close()
+    await provider.close()
+    latencies.sort()
+    return {
+        "ok": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "refresh": pool_stats["refresh"],
+        "evicted": pool_stats["evicted"],
+        "proxies_started": provider_stats["started"],
+    }
+
+
+async def _main(args) -> None:
+    upstream = await asyncio.start_server(_handle_upstream, "127.0.0.1", 0)
+    upstream_port = upstream.sockets[0].getsockname()[1]
+    scenarios = [("steady", None), (f"churn/{args.kill_interval}s", args.kill_interval)]
+    print(
+        f"proxies: {args.proxies}, concurrency: {args.concurrency}, duration: {args.duration}s, "
+        f"proxy latency: {args.proxy_latency_ms}±{args.proxy_jitter_ms}ms, failure rate: {args.failure_rate}"
+    )
+    print(
+        f"{'scenario':<14}{'ok':>8}{'errors':>8}{'req/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}"
+        f"{'p99(ms)':>10}{'max(ms)':>10}{'rotations':>11}{'inline':>8}{'evicted':>9}"
+    )
+    try:
+        for name, kill_interval in scenarios:
+            r = await _run_scenario(args, upstream_port, kill_interval)
+            print(
+                f"{name:<14}{r['ok']:>8}{r['errors']:>8}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+                f"{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}{r['refresh']['rotations']:>11}"
+                f"{r['refresh']['inline_refreshes']:>8}{r['evicted']:>9}"
+            )
+    finally:
+        upstream.close()
+        for writer in list(_upstream_conns):
+            writer.close()
+        if _upstream_conns:
+            await asyncio.wait(list(_upstream_conns.values()), timeout=1)
+        await upstream.wait_closed()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="proxy pool benchmark against local proxies and a mock upstream")
+    parser.add_argument("--duration", type=float, default=10, help="每个场景的持续时间（秒）")
+    parser.add_argument("--concurrency", type=int, default=16, help="并发请求数")
+    parser.add_argument("--proxies", type=int, default=4, help="代理池可用代理数量")
+    parser.add_argument("--proxy-latency-ms", type=float, default=5, help="代理为每个请求增加的延迟（毫秒）")
+    parser.add_argument("--proxy-jitter-ms", type=float, default=2, help="代理延迟抖动（毫秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="请求被代理直接断开的概率")
+    parser.add_argument("--kill-interval", type=float, default=2, help="churn 场景中停止当前代理的间隔（秒）")
+    parser.add_argument(
+        "--breaker-threshold", type=int, default=1000,
+        help="接口熔断阈值；默认调大，避免当前代理失效时进行中的请求同时失败把整个接口熔断，只观察代理切换本身",
+    )
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")
+    args = parser.parse_args()
+    config.CIRCUIT_BREAKER_FAILURE_THRESHOLD = args.breaker_threshold
+    # 只输出结果汇总，屏蔽代理切换等 INFO 日志
+    utils.logger.setLevel(logging.WARNING)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
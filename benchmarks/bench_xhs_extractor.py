@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/benchmarks/bench_xhs_extractor.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 小红书 __INITIAL_STATE__ 提取基准：对比原先的整页正则 + 全量 json.loads + 全量 decamelize（legacy）
+# 与按位置只解析目标子树的实现（fast），输出每个页面的 CPU 耗时与峰值内存
+# 用法（项目根目录下）: python benchmarks/bench_xhs_extractor.py [--fixtures 保存的html目录] [--number 20]
+# 不指定 --fixtures 时使用内置生成的笔记详情页与用户主页
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+import humps
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_platform.xhs.extractor import XiaoHongShuExtractor  # noqa: E402
+
+_NOTE_ID = "64b8f0e1000000001203c5a1"
+
+
+def _legacy_note_detail(note_id: str, html: str):
+    """原先的实现，仅用于对比"""
+    if "noteDetailMap" not in html:
+        return None
+    state = re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[0].replace("undefined", '""')
+    if state != "{}":
+        note_dict = humps.decamelize(json.loads(state))
+        return note_dict["note"]["note_detail_map"][note_id]["note"]
+    return None
+
+
+def _legacy_creator_info(html: str):
+    """原先的实现，仅用于对比"""
+    match = re.search(r"<script>window.__INITIAL_STATE__=(.+)<\/script>", html, re.M)
+    if match is None:
+        return None
+    info = json.loads(match.group(1).replace(":undefined", ":null"), strict=False)
+    if info is None:
+        return None
+    return info.get("user").get("userPageData")
+
+
+def _feed_items(count: int) -> List[dict]:
+    return [
+        {
+            "id": f"{i:024x}",
+            "modelType": "note",
+            "noteCard": {
+                "displayTitle": f"推荐笔记 {i} " + "内容" * 20,
+                "user": {"userId": f"{i:024x}", "nickName": f"用户{i}", "avatar": "https://sns-avatar.example/" + "a" * 60},
+                "interactInfo": {"liked": False, "likedCount": str(i * 7)},
+                "cover": {"urlDefault": "https://sns-webpic.example/" + "c" * 80, "width": 1080, "height": 1440},
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def _page(state: dict) -> str:
+    text = json.dumps(state, ensure_ascii=False, separators=(",", ":")).replace('"__undefined__"', "undefined")
+    return (
+        "<!doctype html><html><head>" + "<meta name=\"x\" content=\"" + "m" * 200 + "\">" * 50 + "</head><body>"
+        "<div id=\"app\">" + "<div class=\"note-item\">占位</div>" * 500 + "</div>"
+        f"<script>window.__INITIAL_STATE__={text}</script>\n"
+        "<script src=\"https://fe-static.example/vendor.js\"></script></body></html>"
+    )
+
+
+def _note_page(feed_count: int) -> str:
+    note = {
+        "noteId": _NOTE_ID,
+        "type": "normal",
+        "title": "示例笔记",
+        "desc": "正文 " * 300,
+        "time": 1700000000000,
+        "user": {"userId": "5f0a1b2c000000000100abcd", "nickname": "作者"},
+        "interactInfo": {"likedCount": "1024", "collectedCount": "88", "commentCount": "64", "shareCount": "12"},
+        "imageList": [{"urlDefault": "https://sns-webpic.example/" + "i" * 80, "width": 1080, "height": 1440}] * 9,
+        "tagList": [{"id": str(i), "name": f"标签{i}", "type": "topic"} for i in range(10)],
+        "ipLocation": "__undefined__",
+    }
+    state = {
+        "global": {"appSettings": {"notificationInterval": 30}, "serverTime": "__undefined__"},
+        "feed": {"feeds": _feed_items(feed_count)},
+        "note": {"noteDetailMap": {_NOTE_ID: {"note": note, "comments": {"list": [], "cursor": ""}}}},
+    }
+    return _page(state)
+
+
+def _creator_page(feed_count: int) -> str:
+    state = {
+        "global": {"appSettings": {"notificationInterval": 30}},
+        "user": {
+            "userPageData": {
+                "basicInfo": {"nickname": "作者", "desc": "简介", "gender": 1, "ipLocation": "__undefined__"},
+                "interactions": [{"type": "follows", "count": "10"}, {"type": "fans", "count": "2000"}],
+                "tags": [{"tagType": "info", "name": "标签"}],
+            },
+            "notes": [_feed_items(feed_count), [], [], []],
+        },
+    }
+    return _page(state)
+
+
+def _load_fixtures(path: str) -> List[Tuple[str, str]]:
+    pages = []
+    for file in sorted(glob.glob(os.path.join(path, "*.html"))):
+        with open(file, "r", encoding="utf-8") as f:
+            pages.append((os.path.basename(file), f.read()))
+    return pages
+
+
+def _cases(name: str, html: str) -> Tuple[Callable, Callable]:
+    extractor = XiaoHongShuExtractor()
+    if "noteDetailMap" in html:
+        # 保存的笔记页文件名可能不是笔记ID，取 noteDetailMap 中的第一个笔记
+        state = re.search(r"window.__INITIAL_STATE__=({.*})</script>", html).group(1).replace("undefined", "null")
+        note_id = next(iter(json.loads(state)["note"]["noteDetailMap"]))
+        return (
+            lambda: _legacy_note_detail(note_id, html),
+            lambda: extractor.extract_note_detail_from_html(note_id, html),
+        )
+    return (
+        lambda: _legacy_creator_info(html),
+        lambda: extractor.extract_creator_info_from_html(html),
+    )
+
+
+def _cpu_ms(func: Callable, number: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.process_time()
+        for _ in range(number):
+            func()
+        best = min(best, time.process_time() - start)
+    return best / number * 1000
+
+
+def _peak_kb(func: Callable) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="xhs __INITIAL_STATE__ extractor benchmark")
+    parser.add_argument("--fixtures", default="", help="保存的 html 页面目录（*.html）")
+    parser.add_argument("--number", type=int, default=20, help="每轮解析次数")
+    parser.add_argument("--feeds", type=int, default=300, help="内置页面中附带的推荐笔记数量")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        pages = _load_fixtures(args.fixtures)
+    else:
+        pages = [("note_detail.html", _note_page(args.feeds)), ("creator.html", _creator_page(args.feeds))]
+
+    print(f"{'page':<24}{'size(KB)':>10}{'legacy(ms)':>12}{'fast(ms)':>10}{'legacy peak(KB)':>17}{'fast peak(KB)':>15}")
+    for name, html in pages:
+        legacy, fast = _cases(name, html)
+        assert legacy() == fast(), f"{name}: fast extractor differs from legacy"
+        print(
+            f"{name:<24}{len(html.encode('utf-8')) / 1024:>10.0f}"
+            f"{_cpu_ms(legacy, args.number):>12.2f}{_cpu_ms(fast, args.number):>10.2f}"
+            f"{_peak_kb(legacy):>17.0f}{_peak_kb(fast):>15.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
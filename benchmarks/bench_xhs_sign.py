@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/benchmarks/bench_xhs_sign.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 小红书签名编码函数微基准：对比原始 JS 移植实现（reference）与快速实现（fast）的单次调用耗时
+# 用法（项目根目录下）: python benchmarks/bench_xhs_sign.py [--number 20000]
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_platform.xhs import xhs_sign  # noqa: E402
+
+_X_T = "1700000000000"
+_X_S = "XYS_2UQhPsHCH0c1PjhlHjIj2erjwjQhyoPTqBPT49pjHjIj2eHjwjQgynEDJ74AHjIj2ePjwjQTJdPIPAZlg94tP"
+_B1 = "I38rHdgsjopgIvesdVwgIC+oIELmBZ5e3VwXLgFTIxS3bqwErFeexd0ekncAzMFYnqthIhJeSnMDKutRI3KsYorWHPtGrbV0P9WfIi/eWc6eYqtyQApPI37ekmR6QL" * 4
+_PAYLOAD = json.dumps(
+    {
+        "s0": 3, "s1": "", "x0": "1", "x1": "4.2.2", "x2": "Mac OS", "x3": "xhs-pc-web", "x4": "4.74.0",
+        "x5": "18c0a1b2c3d4e5f6", "x6": _X_T, "x7": _X_S, "x8": _B1, "x9": -44488565, "x10": 154, "x11": "normal",
+    },
+    separators=(",", ":"),
+)
+_PAYLOAD_BYTES = xhs_sign.encode_utf8(_PAYLOAD)
+
+
+def _xs_common_reference() -> str:
+    return xhs_sign._b64_encode_reference(xhs_sign._encode_utf8_reference(_PAYLOAD))
+
+
+def _xs_common_fast() -> str:
+    return xhs_sign.b64_encode(xhs_sign.encode_utf8_bytes(_PAYLOAD))
+
+
+CASES = [
+    ("mrc", lambda: xhs_sign._mrc_reference(_X_T + _X_S + _B1), lambda: xhs_sign.mrc(_X_T + _X_S + _B1)),
+    ("encode_utf8", lambda: xhs_sign._encode_utf8_reference(_PAYLOAD), lambda: xhs_sign.encode_utf8(_PAYLOAD)),
+    ("b64_encode", lambda: xhs_sign._b64_encode_reference(_PAYLOAD_BYTES), lambda: xhs_sign.b64_encode(_PAYLOAD_BYTES)),
+    ("x-s-common", _xs_common_reference, _xs_common_fast),
+]
+
+
+def _per_call_us(func, number: int) -> float:
+    # 取多轮中的最小值，降低调度抖动的影响
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="xhs_sign encoder microbenchmark")
+    parser.add_argument("--number", type=int, default=20000, help="每轮调用次数")
+    args = parser.parse_args()
+
+    print(f"payload length: {len(_PAYLOAD)} chars")
+    print(f"{'function':<14}{'reference(us)':>16}{'fast(us)':>12}{'speedup':>10}")
+    for name, reference, fast in CASES:
+        assert reference() == fast(), f"{name}: fast implementation differs from reference"
+        ref_us = _per_call_us(reference, args.number)
+        fast_us = _per_call_us(fast, args.number)
+        print(f"{name:<14}{ref_us:>16.2f}{fast_us:>12.2f}{ref_us / fast_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -45,5 +45,8 @@ class CacheFactory:
         elif cache_type == 'redis':
             from .redis_cache import RedisCache
             return RedisCache()
+        elif cache_type == 'sqlite':
+            from .sqlite_cache import SqliteCache
+            return SqliteCache(*args, **kwargs)
         else:
             raise ValueError(f'Unknown cache type: {cache_type}')
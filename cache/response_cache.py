@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/cache/response_cache.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 接口响应缓存，key 由 接口名 + 笔记ID + 分页游标 组成，各接口可配置不同的过期时间
+
+import copy
+from typing import Any, Dict, Optional
+
+from cache.abs_cache import AbstractCache
+from cache.cache_factory import CacheFactory
+from tools import utils
+
+
+class CacheMode:
+    """响应缓存模式"""
+
+    OFF = "off"  # 关闭
+    READ_WRITE = "read-write"  # 命中直接返回，未命中请求后写入
+    READ_ONLY = "read-only"  # 只读取已有缓存，不写入
+    REFRESH = "refresh"  # 不读取缓存，请求后覆盖写入
+
+    ALL = (OFF, READ_WRITE, READ_ONLY, REFRESH)
+
+
+class ResponseCache:
+    """
+    接口响应缓存
+
+    使用方法：
+        cache = ResponseCache(SqliteCache("data/cache/response_cache.db"), mode=CacheMode.READ_WRITE,
+                              ttls={"note_detail": 86400})
+        data = cache.get("note_detail", note_id)
+        if data is None:
+            data = await fetch()
+            cache.set("note_detail", note_id, data)
+    """
+
+    def __init__(
+        self,
+        cache: AbstractCache,
+        mode: str = CacheMode.READ_WRITE,
+        ttls: Optional[Dict[str, int]] = None,
+        default_ttl: int = 3600,
+        namespace: str = "resp",
+    ):
+        """
+        Args:
+            cache: 缓存后端（memory / redis / sqlite）
+            mode: 缓存模式，见 CacheMode
+            ttls: 各接口的过期时间（秒），未配置的接口使用 default_ttl，配置为 0 表示该接口不缓存
+            default_ttl: 默认过期时间（秒）
+            namespace: key 前缀，用于区分平台
+        """
+        if mode not in CacheMode.ALL:
+            raise ValueError(f"Unknown response cache mode: {mode}")
+        self._cache = cache
+        self.mode = mode
+        self._ttls = ttls or {}
+        self._default_ttl = default_ttl
+        self._namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @property
+    def readable(self) -> bool:
+        return self.mode in (CacheMode.READ_WRITE, CacheMode.READ_ONLY)
+
+    @property
+    def writable(self) -> bool:
+        return self.mode in (CacheMode.READ_WRITE, CacheMode.REFRESH)
+
+    def make_key(self, endpoint: str, note_id: str, cursor: str = "") -> str:
+        return f"{self._namespace}:{endpoint}:{note_id}:{cursor or ''}"
+
+    def _ttl(self, endpoint: str) -> int:
+        return self._ttls.get(endpoint, self._default_ttl)
+
+    def get(self, endpoint: str, note_id: str, cursor: str = "") -> Optional[Any]:
+        """
+        读取缓存的响应，模式不可读、接口不缓存或未命中时返回 None
+        """
+        if not self.readable or self._ttl(endpoint) <= 0:
+            return None
+        try:
+            value = self._cache.get(self.make_key(endpoint, note_id, cursor))
+        except Exception as e:
+            utils.logger.error(f"[ResponseCache.get] read cache error: {e}")
+            return None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # 内存缓存返回的是同一个对象，复制一份避免调用方修改缓存内容
+        return copy.deepcopy(value)
+
+    def set(self, endpoint: str, note_id: str, value: Any, cursor: str = "") -> None:
+        """
+        写入响应缓存，模式不可写或接口不缓存时忽略
+        """
+        ttl = self._ttl(endpoint)
+        if not self.writable or ttl <= 0 or value is None:
+            return
+        try:
+            self._cache.set(self.make_key(endpoint, note_id, cursor), value, ttl)
+            self.writes += 1
+        except Exception as e:
+            utils.logger.error(f"[ResponseCache.set] write cache error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses, "writes": self.writes}
+
+    def close(self) -> None:
+        close = getattr(self._cache, "close", None)
+        if callable(close):
+            close()
+
+
+def create_response_cache(
+    mode: str,
+    cache_type: str,
+    ttls: Optional[Dict[str, int]] = None,
+    namespace: str = "resp",
+    sqlite_path: str = "data/cache/response_cache.db",
+) -> Optional[ResponseCache]:
+    """
+    根据配置创建响应缓存，mode 为 off 时返回 None
+    Args:
+        mode: 缓存模式
+        cache_type: 缓存后端类型 memory / redis / sqlite
+        ttls: 各接口的过期时间（秒）
+        namespace: key 前缀
+        sqlite_path: sqlite 后端的数据库文件路径
+
+    Returns:
+        ResponseCache 或 None
+    """
+    if mode == CacheMode.OFF:
+        return None
+    if cache_type == "sqlite":
+        backend = CacheFactory.create_cache(cache_type, sqlite_path)
+    else:
+        backend = CacheFactory.create_cache(cache_type)
+    utils.logger.info(f"[create_response_cache] Response cache enabled, mode: {mode}, backend: {cache_type}")
+    return ResponseCache(backend, mode=mode, ttls=ttls, namespace=namespace)
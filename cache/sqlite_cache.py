@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/cache/sqlite_cache.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : SQLite 磁盘缓存，适合单机场景下跨进程/跨运行持久化缓存
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional
+
+from cache.abs_cache import AbstractCache
+
+
+class SqliteCache(AbstractCache):
+
+    def __init__(self, db_path: str = "data/cache/cache.db"):
+        """
+        初始化 SQLite 缓存
+        :param db_path: 数据库文件路径，目录不存在时自动创建
+        """
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expire_at REAL NOT NULL)"
+        )
+        self._purge_expired()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        从缓存中获取键的值, 并且反序列化
+        :param key:
+        :return:
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expire_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expire_at = row
+            if expire_at < time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+        return pickle.loads(value)
+
+    def set(self, key: str, value: Any, expire_time: int) -> None:
+        """
+        将键的值设置到缓存中, 并且序列化
+        :param key:
+        :param value:
+        :param expire_time: 过期时间（秒）
+        :return:
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expire_at) VALUES (?, ?, ?)",
+                (key, data, time.time() + expire_time),
+            )
+
+    def keys(self, pattern: str) -> List[str]:
+        """
+        获取所有符合pattern的key（与 redis 相同的通配符语义）
+        :param pattern: 匹配模式
+        :return:
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM cache WHERE key GLOB ? AND expire_at >= ?", (pattern, time.time())
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _purge_expired(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE expire_at < ?", (time.time(),))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == '__main__':
+    cache = SqliteCache("data/cache/demo_cache.db")
+    cache.set('name', '程序员阿江-Relakkes', 1)
+    print(cache.get('name'))
+    print(cache.keys("*"))
+    time.sleep(2)
+    print(cache.get('name'))  # None
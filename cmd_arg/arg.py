@@ -30,6 +30,7 @@ import typer
 from typing_extensions import Annotated
 
 import config
+from tools.time_util import parse_time_bound
 from tools.utils import str2bool
 
 
@@ -76,6 +77,15 @@ class SaveDataOptionEnum(str, Enum):
     EXCEL = "excel"
 
 
+class CacheModeEnum(str, Enum):
+    """响应缓存模式枚举"""
+
+    OFF = "off"
+    READ_WRITE = "read-write"
+    READ_ONLY = "read-only"
+    REFRESH = "refresh"
+
+
 class InitDbOptionEnum(str, Enum):
     """数据库初始化选项"""
 
@@ -198,6 +208,15 @@ async def parse_cmd(argv: Optional[Sequence[str]] = None):
                 show_default=True,
             ),
         ] = str(config.ENABLE_GET_SUB_COMMENTS),
+        incremental: Annotated[
+            str,
+            typer.Option(
+                "--incremental",
+                help="是否开启增量爬取（跳过上次运行后没有变化的笔记和已爬取的评论），支持 yes/true/t/y/1 或 no/false/f/n/0",
+                rich_help_panel="评论配置",
+                show_default=True,
+            ),
+        ] = str(config.ENABLE_INCREMENTAL_CRAWL),
         headless: Annotated[
             str,
             typer.Option(
@@ -225,6 +244,39 @@ async def parse_cmd(argv: Optional[Sequence[str]] = None):
                 rich_help_panel="存储配置",
             ),
         ] = None,
+        cache_mode: Annotated[
+            CacheModeEnum,
+            typer.Option(
+                "--cache_mode",
+                "--cache-mode",
+                help="接口响应缓存模式 (off=关闭 | read-write=读写 | read-only=只读 | refresh=忽略已有缓存并重新写入)",
+                rich_help_panel="存储配置",
+            ),
+        ] = _coerce_enum(CacheModeEnum, config.RESPONSE_CACHE_MODE, CacheModeEnum.OFF),
+        since: Annotated[
+            str,
+            typer.Option(
+                "--since",
+                help="只爬取该时间之后发布的笔记和评论，支持 2024-01-01、'2024-01-01 08:00:00'、30d（30 天前）",
+                rich_help_panel="基础配置",
+            ),
+        ] = config.CRAWL_SINCE,
+        until: Annotated[
+            str,
+            typer.Option(
+                "--until",
+                help="只爬取该时间之前发布的笔记和评论，格式同 --since",
+                rich_help_panel="基础配置",
+            ),
+        ] = config.CRAWL_UNTIL,
+        resume: Annotated[
+            str,
+            typer.Option(
+                "--resume",
+                help="从指定运行ID的断点继续爬取（运行ID见启动日志或 data/checkpoints 目录）",
+                rich_help_panel="运行配置",
+            ),
+        ] = config.RESUME_RUN_ID,
         cookies: Annotated[
             str,
             typer.Option(
@@ -254,7 +306,13 @@ async def parse_cmd(argv: Optional[Sequence[str]] = None):
 
         enable_comment = _to_bool(get_comment)
         enable_sub_comment = _to_bool(get_sub_comment)
+        enable_incremental = _to_bool(incremental)
         enable_headless = _to_bool(headless)
+        for option_name, time_value in (("--since", since), ("--until", until)):
+            try:
+                parse_time_bound(time_value)
+            except ValueError as exc:
+                raise typer.BadParameter(str(exc), param_hint=option_name) from exc
         init_db_value = init_db.value if init_db else None
 
         # Parse specified_id and creator_id into lists
@@ -269,9 +327,17 @@ async def parse_cmd(argv: Optional[Sequence[str]] = None):
         config.KEYWORDS = keywords
         config.ENABLE_GET_COMMENTS = enable_comment
         config.ENABLE_GET_SUB_COMMENTS = enable_sub_comment
+        config.ENABLE_INCREMENTAL_CRAWL = enable_incremental
         config.HEADLESS = enable_headless
         config.CDP_HEADLESS = enable_headless
         config.SAVE_DATA_OPTION = save_data_option.value
+        config.RESPONSE_CACHE_MODE = cache_mode.value
+        config.RESUME_RUN_ID = resume.strip()
+        if config.RESUME_RUN_ID:
+            # 续爬依赖断点日志，并继续记录本次进度
+            config.ENABLE_CHECKPOINT = True
+        config.CRAWL_SINCE = since.strip()
+        config.CRAWL_UNTIL = until.strip()
         config.COOKIES = cookies
 
         # Set platform-specific ID lists for detail/creator mode
@@ -307,9 +373,14 @@ async def parse_cmd(argv: Optional[Sequence[str]] = None):
             keywords=config.KEYWORDS,
             get_comment=config.ENABLE_GET_COMMENTS,
             get_sub_comment=config.ENABLE_GET_SUB_COMMENTS,
+            incremental=config.ENABLE_INCREMENTAL_CRAWL,
             headless=config.HEADLESS,
             save_data_option=config.SAVE_DATA_OPTION,
             init_db=init_db_value,
+            cache_mode=config.RESPONSE_CACHE_MODE,
+            since=config.CRAWL_SINCE,
+            until=config.CRAWL_UNTIL,
+            resume=config.RESUME_RUN_ID,
             cookies=config.COOKIES,
             specified_id=specified_id,
             creator_id=creator_id,
@@ -32,7 +32,37 @@ ENABLE_IP_PROXY = False
 IP_PROXY_POOL_COUNT = 2
 
 # 代理IP提供商名称
-IP_PROXY_PROVIDER_NAME = "kuaidaili"  # kuaidaili | wandouhttp
+IP_PROXY_PROVIDER_NAME = "kuaidaili"  # kuaidaili | wandouhttp | local
+
+# 本地代理（IP_PROXY_PROVIDER_NAME = "local"）：在 127.0.0.1 上启动进程内 HTTP 代理，用于离线测试和调优代理逻辑
+# 每个请求增加的延迟及其随机抖动（毫秒）
+LOCAL_PROXY_LATENCY_MS = 0
+LOCAL_PROXY_LATENCY_JITTER_MS = 0
+
+# 请求被代理直接断开的概率
+LOCAL_PROXY_FAILURE_RATE = 0.0
+
+# 代理有效期（秒），0 表示不过期
+LOCAL_PROXY_TTL_SEC = 0
+
+# 代理校验：候选代理在后台并发校验，校验通过的代理进入可用集合，取代理时直接按权重（成功率、延迟）抽取
+# 同时校验的代理数量
+IP_PROXY_VALIDATE_CONCURRENCY = 8
+
+# 单次校验超时时间（秒）
+IP_PROXY_VALIDATE_TIMEOUT_SEC = 10
+
+# 后台维护间隔（秒）：剔除过期代理，可用代理不足 IP_PROXY_POOL_COUNT 时从提供商补充
+IP_PROXY_MAINTAIN_INTERVAL_SEC = 30
+
+# 代理连续失败多少次后从可用集合中剔除
+IP_PROXY_EVICT_AFTER_FAILURES = 3
+
+# 代理提前刷新：后台任务预先校验好下一个代理，当前代理剩余有效期低于该值（秒）时原子切换，请求不等待代理提供商
+IP_PROXY_REFRESH_LEAD_SEC = 60
+
+# 后台刷新任务的检查间隔（秒）
+IP_PROXY_REFRESH_CHECK_INTERVAL_SEC = 5
 
 # 设置为True不会打开浏览器（无头浏览器）
 # 设置False会打开一个浏览器
@@ -85,9 +115,28 @@ CRAWLER_MAX_NOTES_COUNT = 20
 # 并发爬虫数量控制
 MAX_CONCURRENCY_NUM = 1
 
+# 搜索模式同时执行的关键词数量，多个关键词共享同一个请求限速（按权重轮流取令牌），总请求速率不变；
+# 默认为 1：关键词依次执行，关键词之间停顿 CROSS_KEYWORD_SLEEP_SEC 秒；大于 1 时不同关键词的数据在输出中交错
+KEYWORD_CONCURRENCY = 1
+
+# 并发关键词的请求权重，如 {"iPhone 16": 2}，未设置的关键词权重为 1
+KEYWORD_WEIGHTS = {}
+
 # 是否开启爬媒体模式（包含图片或视频资源），默认不开启爬媒体
 ENABLE_GET_MEIDAS = False
 
+# 媒体下载并发数：图片、视频由独立的下载 worker 流式写入磁盘，不阻塞笔记和评论的爬取
+MEDIA_DOWNLOAD_CONCURRENCY = 4
+
+# 等待下载的媒体文件数上限，超过时笔记处理等待下载队列腾出空位
+MEDIA_DOWNLOAD_QUEUE_SIZE = 100
+
+# 所有媒体下载共享的速率上限（字节/秒），0 表示不限速
+MEDIA_DOWNLOAD_MAX_BYTES_PER_SEC = 0
+
+# 单个文件最多尝试下载次数，重试时从已下载的位置续传（HTTP Range）
+MEDIA_DOWNLOAD_MAX_ATTEMPTS = 3
+
 # 是否开启爬评论模式, 默认开启爬评论
 ENABLE_GET_COMMENTS = True
 
@@ -98,6 +147,39 @@ CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES = 10
 # 老版本项目使用了 db, 则需参考 schema/tables.sql line 287 增加表字段
 ENABLE_GET_SUB_COMMENTS = False
 
+# 是否开启增量爬取模式：记录每篇笔记的水位线（最后更新时间、评论数、已爬取评论），
+# 再次运行时跳过没有变化的笔记，评论翻页遇到已爬取过的评论即停止
+ENABLE_INCREMENTAL_CRAWL = False
+
+# 是否开启跨关键词笔记去重：同一次运行中多个关键词搜到同一篇笔记时，
+# 只获取一次详情和评论，之后只补记来源关键词。
+# 注意开启后输出格式变化：这类笔记只有一行，source_keyword 为逗号拼接的多个关键词（关闭时每个关键词各一行）
+ENABLE_NOTE_DEDUP = False
+
+# 是否按互动量分配评论预算（搜索模式）：MAX_TOTAL_COMMENTS_COUNT 按每篇笔记的评论数、点赞数
+# 成比例分配，评论不足的笔记未用完的额度退回给后续笔记，单篇笔记的评论数不再固定为
+# CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES；关闭时先到先得
+ENABLE_COMMENT_BUDGET = False
+
+# 是否开启断点续爬（搜索模式）：爬取过程中把进度追加写入 CHECKPOINT_DIR/<平台>/<运行ID>.jsonl，
+# 进程中断后可用 --resume <运行ID> 从中断处继续，已入库的数据不会重复写入；
+# 默认关闭，指定 --resume 时自动开启
+ENABLE_CHECKPOINT = False
+
+# 爬取时间窗口：只爬取发布时间在 [CRAWL_SINCE, CRAWL_UNTIL] 内的笔记及该时间段内的评论，
+# 支持 "2024-01-01"、"2024-01-01 08:00:00"、"30d"（30 天前），为空表示不限制
+CRAWL_SINCE = ""
+CRAWL_UNTIL = ""
+
+# 断点日志目录
+CHECKPOINT_DIR = "data/checkpoints"
+
+# 要续爬的运行ID，为空表示开始新的运行（一般通过命令行 --resume 指定）
+RESUME_RUN_ID = ""
+
+# 当前运行ID，由程序在启动时设置
+CHECKPOINT_RUN_ID = ""
+
 # 词云配置
 ENABLE_GET_WORDCLOUD = False
 STOP_WORDS_FILE = "./docs/hit_stopwords.txt"
@@ -107,9 +189,82 @@ FONT_PATH = "./docs/STZHONGS.TTF"
 # Cache Types
 CACHE_TYPE_REDIS = "redis"
 CACHE_TYPE_MEMORY = "memory"
+CACHE_TYPE_SQLITE = "sqlite"
+
+# ==================== 响应缓存配置 ====================
+# 缓存笔记详情、评论分页等接口响应，重复运行同一关键词时避免重复请求
+# 缓存模式: off=关闭 | read-write=读写 | read-only=只读不写 | refresh=不读但写入（强制刷新缓存）
+RESPONSE_CACHE_MODE = "off"
+
+# 缓存后端: sqlite=本地磁盘（单机推荐）| redis | memory（仅当前进程有效）
+RESPONSE_CACHE_TYPE = CACHE_TYPE_SQLITE
+
+# sqlite 后端的数据库文件路径
+RESPONSE_CACHE_SQLITE_PATH = "data/cache/response_cache.db"
+
+# ==================== 自适应限速配置 ====================
+# 所有 API 请求共享一个令牌桶，按 AIMD 策略自动调整请求速率（取代各处固定的 sleep）
+# 初始速率（请求/秒）
+RATE_LIMIT_INITIAL_QPS = 1.0
+
+# 速率下限 / 上限（请求/秒）
+RATE_LIMIT_MIN_QPS = 0.2
+RATE_LIMIT_MAX_QPS = 3.0
+
+# 允许的突发请求数（令牌桶容量）
+RATE_LIMIT_BURST = 2
+
+# 连续多少次正常响应后提速一次，以及每次提速的幅度（请求/秒）
+RATE_LIMIT_RECOVER_AFTER = 20
+RATE_LIMIT_INCREASE_STEP = 0.1
+
+# 出现验证码或 IP 被封时速率乘以该系数，并暂停所有请求 RATE_LIMIT_BACKOFF_SEC 秒
+RATE_LIMIT_DECREASE_FACTOR = 0.5
+RATE_LIMIT_BACKOFF_SEC = 30
+
+# ==================== 重试与熔断配置 ====================
+# 请求失败按类型处理：网络错误等临时失败、限流（IP 被封）按指数退避 + 随机抖动重试；
+# 笔记状态异常等永久失败、签名失效/验证码等需要重新认证的失败不重试
+# 单个请求最多尝试次数（含首次）
+RETRY_MAX_ATTEMPTS = 3
+
+# 退避基础时间 / 上限（秒），第 n 次重试等待 [0, min(上限, 基础时间 * 2^(n-1))] 之间的随机时间
+RETRY_BASE_DELAY_SEC = 1.0
+RETRY_MAX_DELAY_SEC = 30.0
+
+# 限流失败的退避基础时间（秒）
+RETRY_THROTTLED_BASE_DELAY_SEC = 5.0
+
+# 本次运行的重试预算：重试次数不超过 RETRY_BUDGET_MIN + 请求总数 * RETRY_BUDGET_RATIO，
+# 大面积失败时不会因为重试把请求量放大数倍
+RETRY_BUDGET_RATIO = 0.2
+RETRY_BUDGET_MIN = 10
+
+# 熔断：同一接口（搜索、笔记详情、评论分页、子评论分页、用户笔记列表等）连续临时失败达到阈值后熔断，
+# 熔断期间该接口的请求直接失败，经过 CIRCUIT_BREAKER_RECOVERY_SEC 秒后放行一个探测请求，成功则恢复
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+CIRCUIT_BREAKER_RECOVERY_SEC = 30
+
+# ==================== HTTP 连接池配置 ====================
+# 是否启用 HTTP/2（需要安装 h2: pip install httpx[http2]，未安装时自动回退到 HTTP/1.1）
+ENABLE_HTTP2 = True
+
+# 单个连接池的最大连接数
+HTTP_MAX_CONNECTIONS = 100
+
+# 单个连接池保持 keep-alive 的最大空闲连接数
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+
+# ==================== 文件写入配置 ====================
+# csv / jsonl 存储每个文件只打开一次，数据先缓存在内存中，由后台任务批量写入（group commit）
+# 缓冲数据达到该大小（字符数）时立即写出
+FILE_WRITER_FLUSH_BYTES = 256 * 1024
+
+# 缓冲数据最长停留时间（秒），运行中读取输出文件最多落后这么久
+FILE_WRITER_FLUSH_INTERVAL_SEC = 1.0
 
-# 爬虫最大休眠时间(秒)
-CRAWLER_MAX_SLEEP_SEC = 2
+# fsync 策略：never 只交给操作系统缓存；commit 每次批量写入后 fsync（最安全，最慢）；close 关闭文件时 fsync 一次
+FILE_WRITER_FSYNC = "close"
 
 # 分析Agent配置
 ENABLE_ANALYSIS_AGENT = True
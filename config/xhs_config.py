@@ -35,3 +35,61 @@ XHS_CREATOR_ID_LIST = [
     "https://www.xiaohongshu.com/user/profile/5f58bd990000000001003753?xsec_token=ABYVg1evluJZZzpMX-VWzchxQ1qSNVW3r-jOEnKqMcgZw=&xsec_source=pc_search"
     # ........................
 ]
+
+# 签名批处理时间窗口(毫秒)，窗口内的并发签名请求合并为一次 playwright 调用
+XHS_SIGN_BATCH_WINDOW_MS = 5
+
+# 单批最多合并的签名请求数量
+XHS_SIGN_BATCH_MAX_SIZE = 16
+
+# 签名页面池大小，0 表示只使用爬虫主页面签名；
+# 大于 0 时在同一浏览器上下文中预热多个页面并行签名，建议不超过 MAX_CONCURRENCY_NUM
+XHS_SIGN_PAGE_POOL_SIZE = 0
+
+# 响应缓存各接口的过期时间(秒)，0 表示该接口不缓存；缓存模式见 base_config.RESPONSE_CACHE_MODE
+XHS_RESPONSE_CACHE_TTL = {
+    "note_detail": 24 * 3600,
+    "note_comments": 6 * 3600,
+    "note_sub_comments": 6 * 3600,
+}
+
+# 增量爬取状态库路径（ENABLE_INCREMENTAL_CRAWL 开启时使用）
+XHS_INCREMENTAL_STATE_DB_PATH = "data/xhs/state/note_watermarks.db"
+
+# 增量爬取时每篇笔记最多记录的已爬取一级评论ID数量
+XHS_INCREMENTAL_SEEN_COMMENT_IDS_CAP = 500
+
+# 一级评论翻页的预取页数：当前页入库、展开子评论期间最多提前请求的后续页数，0 表示顺序翻页
+XHS_COMMENT_PAGE_LOOKAHEAD = 1
+
+# 二级评论并发展开：同时展开的一级评论数量
+XHS_SUB_COMMENT_CONCURRENCY = 3
+
+# 单个一级评论下二级评论最多翻页数，0 表示不限制
+XHS_SUB_COMMENT_MAX_PAGES_PER_ROOT = 10
+
+# 单篇笔记最多获取的二级评论数量（不含随一级评论返回的二级评论），0 表示不限制
+XHS_MAX_SUB_COMMENTS_PER_NOTE = 200
+
+# 搜索模式流水线：各阶段之间队列的最大长度，队列满时上游阶段暂停（背压）
+XHS_PIPELINE_QUEUE_SIZE = 20
+
+# 搜索模式流水线：并发获取笔记详情的数量
+XHS_PIPELINE_DETAIL_CONCURRENCY = 2
+
+# 搜索模式流水线：并发获取评论的笔记数量
+XHS_PIPELINE_COMMENT_CONCURRENCY = 2
+
+# 跨关键词笔记去重的历史记录文件（布隆过滤器），为空表示只在本次运行内去重；
+# 设置后以往运行已爬取过的笔记会被直接跳过
+XHS_NOTE_DEDUP_HISTORY_PATH = ""
+
+# 历史记录布隆过滤器的容量与误判率（误判会导致少量新笔记被当作已爬取而跳过）
+XHS_NOTE_DEDUP_BLOOM_CAPACITY = 1_000_000
+XHS_NOTE_DEDUP_BLOOM_ERROR_RATE = 0.001
+
+# 评论预算调度：预算池有余量时单篇笔记至少分配的评论数
+XHS_COMMENT_BUDGET_MIN_PER_NOTE = 2
+
+# 评论预算调度：点赞数折算为权重的系数（评论数系数为 1）
+XHS_COMMENT_BUDGET_LIKE_WEIGHT = 0.1
@@ -30,6 +30,7 @@ import config
 from database import db
 from base.base_crawler import AbstractCrawler
 from media_platform.xhs import XiaoHongShuCrawler
+from store.store_registry import store_registry
 from tools.async_file_writer import AsyncFileWriter
 from var import crawler_type_var
 
@@ -51,17 +52,43 @@ class CrawlerFactory:
 crawler: Optional[AbstractCrawler] = None
 
 
-def _flush_excel_if_needed() -> None:
-    if config.SAVE_DATA_OPTION != "excel":
-        return
-
-    try:
-        from store.excel_store_base import ExcelStoreBase
-
-        ExcelStoreBase.flush_all()
-        print("[Main] Excel files saved successfully")
-    except Exception as e:
-        print(f"[Main] Error flushing Excel data: {e}")
+def _restore_checkpoint_run() -> bool:
+    """
+    续爬时恢复原运行的关键词与输出文件批次；新运行时生成运行ID
+    Returns:
+        是否为续爬
+    """
+    from tools.checkpoint import new_run_id, read_run_info
+    from var import request_keyword_var, request_start_time_var
+
+    if not config.RESUME_RUN_ID:
+        config.CHECKPOINT_RUN_ID = new_run_id()
+        return False
+    run_info = read_run_info(config.RESUME_RUN_ID)
+    if run_info is None:
+        raise ValueError(f"checkpoint of run {config.RESUME_RUN_ID!r} not found")
+    config.CHECKPOINT_RUN_ID = config.RESUME_RUN_ID
+    # 关键词扩展的结果可能每次不同，续爬必须使用原运行的关键词列表
+    config.KEYWORDS = run_info.get("keywords", config.KEYWORDS)
+    request_start_time_var.set(run_info.get("start_time", ""))
+    request_keyword_var.set(run_info.get("request_keyword", ""))
+    return True
+
+
+def _record_checkpoint_run() -> None:
+    from tools.checkpoint import CheckpointJournal, checkpoint_path
+    from var import request_keyword_var, request_start_time_var
+
+    journal = CheckpointJournal(checkpoint_path(config.CHECKPOINT_RUN_ID))
+    journal.append(
+        "run",
+        platform=config.PLATFORM,
+        crawler_type=config.CRAWLER_TYPE,
+        keywords=config.KEYWORDS,
+        start_time=request_start_time_var.get(),
+        request_keyword=request_keyword_var.get(),
+    )
+    journal.close()
 
 
 async def _generate_wordcloud_if_needed() -> None:
@@ -204,7 +231,7 @@ async def main() -> None:
     # 初始化任务计划
     try:
         from tools.utils import utils as _u
-        import json as _json
+        from tools import jsoncodec as _json
         _u.logger.info('[EVENT] ' + _json.dumps({
             "stage":"plan",
             "target_pages": config.CRAWLER_MAX_NOTES_COUNT if hasattr(config, 'CRAWLER_MAX_NOTES_COUNT') else None,
@@ -217,33 +244,53 @@ async def main() -> None:
 
     try:
         from tools.utils import utils as _u
-        import json as _json
+        from tools import jsoncodec as _json
         _u.logger.info('[EVENT] ' + _json.dumps({"stage":"expand_keywords","status":"start"}))
     except Exception:
         pass
-    await _expand_keywords_if_needed()
+    resumed = False
+    if config.ENABLE_CHECKPOINT:
+        try:
+            resumed = _restore_checkpoint_run()
+        except ValueError as e:
+            print(f"[Main] 无法续爬: {e}")
+            return
+    if not resumed:
+        await _expand_keywords_if_needed()
+    if config.ENABLE_CHECKPOINT:
+        if not resumed:
+            _record_checkpoint_run()
+        try:
+            from tools.utils import utils as _u
+            from tools import jsoncodec as _json
+            _u.logger.info('[EVENT] ' + _json.dumps({"stage":"checkpoint","run_id":config.CHECKPOINT_RUN_ID,"resumed":resumed}))
+        except Exception:
+            pass
     try:
         from tools.utils import utils as _u
-        import json as _json
+        from tools import jsoncodec as _json
         _u.logger.info('[EVENT] ' + _json.dumps({"stage":"expand_keywords","status":"end","count": len([i.strip() for i in config.KEYWORDS.split(',') if i.strip()])}))
     except Exception:
         pass
     crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
+    # 本次运行的存储实例只创建一次，结束时统一 flush/close
+    store_registry.open()
     try:
         from tools.utils import utils as _u
-        import json as _json
+        from tools import jsoncodec as _json
         _u.logger.info('[EVENT] ' + _json.dumps({"stage":"crawl","type":"notes","status":"start"}))
     except Exception:
         pass
     await crawler.start()
     try:
         from tools.utils import utils as _u
-        import json as _json
+        from tools import jsoncodec as _json
         _u.logger.info('[EVENT] ' + _json.dumps({"stage":"crawl","type":"notes","status":"end"}))
     except Exception:
         pass
 
-    _flush_excel_if_needed()
+    # 写出所有存储的数据（Excel 在此保存文件），之后的词云和报告会读取这些文件
+    await store_registry.flush()
 
     # Generate wordcloud after crawling is complete
     # Only for JSON save mode
@@ -253,7 +300,7 @@ async def main() -> None:
             from tools.analysis_agent import generate_feedback_report
             try:
                 from tools.utils import utils as _u
-                import json as _json
+                from tools import jsoncodec as _json
                 _u.logger.info('[EVENT] ' + _json.dumps({"stage":"report","status":"start"}))
             except Exception:
                 pass
@@ -275,6 +322,13 @@ async def main() -> None:
 async def async_cleanup() -> None:
     global crawler
     if crawler:
+        xhs_client = getattr(crawler, "xhs_client", None)
+        if xhs_client:
+            try:
+                await xhs_client.close()
+            except Exception as e:
+                print(f"[Main] 关闭HTTP连接池时出错: {e}")
+
         if getattr(crawler, "cdp_manager", None):
             try:
                 await crawler.cdp_manager.cleanup(force=True)
@@ -291,6 +345,11 @@ async def async_cleanup() -> None:
                 if "closed" not in error_msg and "disconnected" not in error_msg:
                     print(f"[Main] 关闭浏览器上下文时出错: {e}")
 
+    try:
+        await store_registry.close()
+    except Exception as e:
+        print(f"[Main] 关闭存储时出错: {e}")
+
     if config.SAVE_DATA_OPTION in ("db", "sqlite"):
         pass
         # await db.close()
@@ -18,27 +18,64 @@
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
 import asyncio
-import json
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
-from urllib.parse import urlencode
+import time
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlencode, urlparse
 
 import httpx
 from playwright.async_api import BrowserContext, Page
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 import config
 from base.base_crawler import AbstractApiClient
+from cache.response_cache import ResponseCache, create_response_cache
+from model.m_xiaohongshu import NoteWatermark
 from proxy.proxy_mixin import ProxyRefreshMixin
-from tools import utils
+from tools import jsoncodec, utils
+from tools.async_pager import iter_pages_pipelined
+from tools.httpx_client_pool import HttpxClientPool
+from tools.rate_limiter import AdaptiveRateController, WeightedFairGate
+from tools.retry_policy import RetryBudget, RetryPolicy
+from tools.single_flight import SingleFlight
+from var import source_keyword_var
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
 
-from .exception import DataFetchError, IPBlockError
+from .exception import (
+    CircuitOpenError,
+    DataFetchError,
+    IPBlockError,
+    NoteAbnormalError,
+    SignError,
+    VerificationError,
+    classify_failure,
+)
 from .field import SearchNoteType, SearchSortType
 from .help import get_search_id
 from .extractor import XiaoHongShuExtractor
-from .playwright_sign import sign_with_playwright
+from .sign_context import XhsSignContext
+from .sign_page_pool import SignPagePool
+from .sign_service import PlaywrightSignService
+from .time_window import NoteTimeWindow
+
+# 接口路径 -> 熔断器名称，未列出的接口按路径各自使用一个熔断器
+_ENDPOINTS = {
+    "/api/sns/web/v1/search/notes": "search",
+    "/api/sns/web/v1/feed": "feed",
+    "/api/sns/web/v2/comment/page": "comment_page",
+    "/api/sns/web/v2/comment/sub/page": "sub_comment_page",
+    "/api/sns/web/v1/user_posted": "user_posted",
+}
+
+
+def _endpoint_of(url: str) -> str:
+    path = urlparse(url).path
+    if path.startswith("/explore/"):
+        return "note_html"
+    if path.startswith("/user/profile/"):
+        return "user_profile"
+    return _ENDPOINTS.get(path, path)
 
 
 class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
@@ -52,6 +89,9 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         playwright_page: Page,
         cookie_dict: Dict[str, str],
         proxy_ip_pool: Optional["ProxyIpPool"] = None,
+        sign_page_pool: Optional[SignPagePool] = None,
+        rate_controller: Optional[AdaptiveRateController] = None,
+        response_cache: Optional[ResponseCache] = None,
     ):
         self.proxy = proxy
         self.timeout = timeout
@@ -62,12 +102,82 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         self.IP_ERROR_CODE = 300012
         self.NOTE_ABNORMAL_STR = "笔记状态异常，请稍后查看"
         self.NOTE_ABNORMAL_CODE = -510001
+        self.SIGN_ERROR_CODE = 300015
         self.playwright_page = playwright_page
         self.cookie_dict = cookie_dict
+        # 签名上下文：缓存 a1/b1，cookies 更新或签名出错时失效
+        self._sign_context = XhsSignContext(cookie_dict)
+        # 批量签名服务：并发的签名请求合并为一次 playwright 往返
+        self._sign_service = PlaywrightSignService(
+            playwright_page,
+            batch_window_ms=config.XHS_SIGN_BATCH_WINDOW_MS,
+            max_batch_size=config.XHS_SIGN_BATCH_MAX_SIZE,
+            sign_context=self._sign_context,
+            page_pool=sign_page_pool,
+        )
         self._extractor = XiaoHongShuExtractor()
+        # 长连接池：每个代理URL一个 keep-alive 的 AsyncClient
+        self._client_pool = HttpxClientPool(
+            timeout=timeout,
+            http2=config.ENABLE_HTTP2,
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        )
+        # 自适应限速器：所有 API 请求共享，取代固定的 sleep 间隔
+        self._rate_controller = rate_controller or AdaptiveRateController(
+            initial_rate=config.RATE_LIMIT_INITIAL_QPS,
+            min_rate=config.RATE_LIMIT_MIN_QPS,
+            max_rate=config.RATE_LIMIT_MAX_QPS,
+            burst=config.RATE_LIMIT_BURST,
+            increase_step=config.RATE_LIMIT_INCREASE_STEP,
+            recover_after=config.RATE_LIMIT_RECOVER_AFTER,
+            decrease_factor=config.RATE_LIMIT_DECREASE_FACTOR,
+            backoff_seconds=config.RATE_LIMIT_BACKOFF_SEC,
+        )
+        self._rate_gate = WeightedFairGate(self._rate_controller, config.KEYWORD_WEIGHTS)
+        # 响应缓存：笔记详情、评论分页，RESPONSE_CACHE_MODE 为 off 时为 None
+        self._response_cache = response_cache or create_response_cache(
+            mode=config.RESPONSE_CACHE_MODE,
+            cache_type=config.RESPONSE_CACHE_TYPE,
+            ttls=config.XHS_RESPONSE_CACHE_TTL,
+            namespace="xhs",
+            sqlite_path=config.RESPONSE_CACHE_SQLITE_PATH,
+        )
+        # 请求合并：同一笔记详情/评论页的并发请求只发一次
+        self._single_flight = SingleFlight()
+        # 重试策略：按失败类型决定是否重试，运行级重试预算，每个接口一个熔断器
+        self._retry_policy = RetryPolicy(
+            classify=classify_failure,
+            max_attempts=config.RETRY_MAX_ATTEMPTS,
+            base_delay=config.RETRY_BASE_DELAY_SEC,
+            max_delay=config.RETRY_MAX_DELAY_SEC,
+            throttled_base_delay=config.RETRY_THROTTLED_BASE_DELAY_SEC,
+            budget=RetryBudget(config.RETRY_BUDGET_RATIO, config.RETRY_BUDGET_MIN),
+            failure_threshold=config.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            recovery_seconds=config.CIRCUIT_BREAKER_RECOVERY_SEC,
+            open_error=CircuitOpenError,
+        )
         # 初始化代理池（来自 ProxyRefreshMixin）
         self.init_proxy_pool(proxy_ip_pool)
 
+    def _on_proxy_changed(self, old_proxy: Optional[str], new_proxy: Optional[str]) -> None:
+        """代理切换时同步创建新代理的连接池并下线旧代理的连接池（宽限期内进行中的请求可以正常结束）"""
+        self._client_pool.get_client(new_proxy)
+        self._client_pool.retire(old_proxy)
+
+    async def close(self) -> None:
+        """关闭所有 HTTP 连接池、限速放行任务及响应缓存"""
+        utils.logger.info(f"[XiaoHongShuClient.close] Sign context stats: {self._sign_context.stats()}")
+        utils.logger.info(f"[XiaoHongShuClient.close] Rate controller stats: {self._rate_controller.stats()}")
+        utils.logger.info(f"[XiaoHongShuClient.close] Requests per keyword: {self._rate_gate.stats()}")
+        utils.logger.info(f"[XiaoHongShuClient.close] Single flight stats: {self._single_flight.stats()}")
+        utils.logger.info(f"[XiaoHongShuClient.close] Retry policy stats: {self._retry_policy.stats()}")
+        if self._response_cache is not None:
+            utils.logger.info(f"[XiaoHongShuClient.close] Response cache stats: {self._response_cache.stats()}")
+            self._response_cache.close()
+        await self._rate_gate.close()
+        await self._client_pool.close()
+
     async def _pre_headers(self, url: str, params: Optional[Dict] = None, payload: Optional[Dict] = None) -> Dict:
         """请求头参数签名（使用 playwright 注入方式）
 
@@ -79,8 +189,6 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         Returns:
             Dict: 请求头参数签名
         """
-        a1_value = self.cookie_dict.get("a1", "")
-
         # 确定请求数据、方法和 URI
         if params is not None:
             data = params
@@ -91,12 +199,11 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         else:
             raise ValueError("params or payload is required")
 
-        # 使用 playwright 注入方式生成签名
-        signs = await sign_with_playwright(
-            page=self.playwright_page,
+        # 使用 playwright 注入方式生成签名（批量签名服务）
+        signs = await self._sign_service.sign(
             uri=url,
             data=data,
-            a1=a1_value,
+            a1=self._sign_context.a1,
             method=method,
         )
 
@@ -106,13 +213,12 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
             "x-S-Common": signs["x-s-common"],
             "X-B3-Traceid": signs["x-b3-traceid"],
         }
-        self.headers.update(headers)
-        return self.headers
+        # 并发签名时每个请求使用独立的请求头副本，避免签名被其他请求覆盖
+        return {**self.headers, **headers}
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
     async def request(self, method, url, **kwargs) -> Union[str, Any]:
         """
-        封装httpx的公共请求方法，对请求响应做一些处理
+        封装httpx的公共请求方法，对请求响应做一些处理，失败时按重试策略重试
         Args:
             method: 请求方法
             url: 请求的URL
@@ -121,32 +227,90 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         Returns:
 
         """
+        return_response = kwargs.pop("return_response", False)
+        return await self._retry_policy.call(
+            _endpoint_of(url), lambda: self._request_once(method, url, return_response, **kwargs)
+        )
+
+    async def _request_once(self, method, url, return_response: bool = False, **kwargs) -> Union[str, Any]:
+        """发送一次请求并解析响应，失败时抛出对应类型的异常"""
         # 每次请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
 
-        # return response.text
-        return_response = kwargs.pop("return_response", False)
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
+        # 统一限速，出现验证码/IP 被封后在此处退避；并发的多个关键词之间按权重轮流取令牌
+        await self._rate_gate.acquire(source_keyword_var.get())
+        client = self._client_pool.get_client(self.proxy)
+        start = time.perf_counter()
+        try:
             response = await client.request(method, url, timeout=self.timeout, **kwargs)
+        except httpx.TransportError as e:
+            self._report_proxy_result(error=f"{e.__class__.__name__}: {e}")
+            raise
+        latency = time.perf_counter() - start
 
         if response.status_code in (471, 461):
             verify_type = response.headers.get("Verifytype", "")
             verify_uuid = response.headers.get("Verifyuuid", "")
             msg = f"出现验证码，请求失败，Verifytype: {verify_type}，Verifyuuid: {verify_uuid}, Response: {response}"
             utils.logger.error(msg)
-            raise DataFetchError(msg)
+            self._rate_controller.on_throttled(f"verify {response.status_code}")
+            self._report_proxy_result(error=f"verify {response.status_code}")
+            raise VerificationError(msg)
+
+        if response.status_code >= 500:
+            raise DataFetchError(f"server error, status: {response.status_code}, url: {url}")
 
         if return_response:
+            self._rate_controller.on_success()
+            self._report_proxy_result(latency=latency)
             return response.text
-        data: Dict = response.json()
+        data: Dict = jsoncodec.loads(response.content)
         if data["success"]:
+            self._rate_controller.on_success()
+            self._report_proxy_result(latency=latency)
             return data.get("data", data.get("success", {}))
         elif data["code"] == self.IP_ERROR_CODE:
+            self._rate_controller.on_throttled("ip block")
+            self._report_proxy_result(error="ip block")
             raise IPBlockError(self.IP_ERROR_STR)
+        elif data["code"] == self.SIGN_ERROR_CODE:
+            # 签名被拒绝，缓存的签名上下文可能已失效
+            self._sign_context.invalidate("sign error response")
+            raise SignError(data.get("msg", None) or f"{response.text}")
+        elif data["code"] == self.NOTE_ABNORMAL_CODE:
+            raise NoteAbnormalError(data.get("msg", None) or self.NOTE_ABNORMAL_STR)
         else:
             err_msg = data.get("msg", None) or f"{response.text}"
             raise DataFetchError(err_msg)
 
+    async def _cached_fetch(self, endpoint: str, note_id: str, cursor: str, fetch: Callable) -> Any:
+        """
+        带响应缓存与请求合并的请求，只缓存非空响应
+        Args:
+            endpoint: 接口名，对应 XHS_RESPONSE_CACHE_TTL 的 key
+            note_id: 笔记ID（子评论接口为 笔记ID/根评论ID）
+            cursor: 分页游标
+            fetch: 未命中时调用的协程函数
+
+        Returns:
+            接口响应
+        """
+        # 相同的请求正在进行中时直接共享其结果
+        return await self._single_flight.do(
+            (endpoint, note_id, cursor), lambda: self._fetch_through_cache(endpoint, note_id, cursor, fetch)
+        )
+
+    async def _fetch_through_cache(self, endpoint: str, note_id: str, cursor: str, fetch: Callable) -> Any:
+        if self._response_cache is None:
+            return await fetch()
+        cached = self._response_cache.get(endpoint, note_id, cursor)
+        if cached is not None:
+            return cached
+        res = await fetch()
+        if res:
+            self._response_cache.set(endpoint, note_id, res, cursor)
+        return res
+
     async def get(self, uri: str, params: Optional[Dict] = None) -> Dict:
         """
         GET请求，对请求头签名
@@ -157,12 +321,18 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         Returns:
 
         """
-        headers = await self._pre_headers(uri, params)
         full_url = f"{self._host}{uri}"
-
-        return await self.request(
-            method="GET", url=full_url, headers=headers, params=params
-        )
+        headers = await self._pre_headers(uri, params)
+        try:
+            return await self.request(
+                method="GET", url=full_url, headers=headers, params=params
+            )
+        except SignError:
+            # 签名上下文已失效，重新签名后重试一次
+            headers = await self._pre_headers(uri, params)
+            return await self.request(
+                method="GET", url=full_url, headers=headers, params=params
+            )
 
     async def post(self, uri: str, data: dict, **kwargs) -> Dict:
         """
@@ -174,38 +344,56 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         Returns:
 
         """
+        json_str = jsoncodec.dumps_compact(data)
         headers = await self._pre_headers(uri, payload=data)
-        json_str = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
-        return await self.request(
-            method="POST",
-            url=f"{self._host}{uri}",
-            data=json_str,
-            headers=headers,
-            **kwargs,
-        )
+        try:
+            return await self.request(
+                method="POST",
+                url=f"{self._host}{uri}",
+                data=json_str,
+                headers=headers,
+                **kwargs,
+            )
+        except SignError:
+            # 签名上下文已失效，重新签名后重试一次
+            headers = await self._pre_headers(uri, payload=data)
+            return await self.request(
+                method="POST",
+                url=f"{self._host}{uri}",
+                data=json_str,
+                headers=headers,
+                **kwargs,
+            )
+
+    async def get_media_client(self) -> httpx.AsyncClient:
+        """
+        媒体下载使用的长连接客户端（与 API 请求共用连接池和代理），下载前检测代理是否过期
+        """
+        await self._refresh_proxy_if_expired()
+        return self._client_pool.get_client(self.proxy)
 
     async def get_note_media(self, url: str) -> Union[bytes, None]:
         # 请求前检测代理是否过期
         await self._refresh_proxy_if_expired()
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            try:
-                response = await client.request("GET", url, timeout=self.timeout)
-                response.raise_for_status()
-                if not response.reason_phrase == "OK":
-                    utils.logger.error(
-                        f"[XiaoHongShuClient.get_note_media] request {url} err, res:{response.text}"
-                    )
-                    return None
-                else:
-                    return response.content
-            except (
-                httpx.HTTPError
-            ) as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+        client = self._client_pool.get_client(self.proxy)
+        try:
+            response = await client.request("GET", url, timeout=self.timeout)
+            response.raise_for_status()
+            if response.status_code != 200:
                 utils.logger.error(
-                    f"[XiaoHongShuClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}"
-                )  # 保留原始异常类型名称，以便开发者调试
+                    f"[XiaoHongShuClient.get_note_media] request {url} err, res:{response.text}"
+                )
                 return None
+            else:
+                return response.content
+        except (
+            httpx.HTTPError
+        ) as exc:  # some wrong when call httpx.request method, such as connection error, client error, server error or response status code is not 2xx
+            utils.logger.error(
+                f"[XiaoHongShuClient.get_aweme_media] {exc.__class__.__name__} for {exc.request.url} - {exc}"
+            )  # 保留原始异常类型名称，以便开发者调试
+            return None
 
     async def pong(self) -> bool:
         """
@@ -239,6 +427,8 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         cookie_str, cookie_dict = utils.convert_cookies(await browser_context.cookies())
         self.headers["Cookie"] = cookie_str
         self.cookie_dict = cookie_dict
+        # cookies 变化（含登录完成）后刷新签名上下文
+        self._sign_context.update_cookies(cookie_dict)
 
     async def get_note_by_keyword(
         self,
@@ -299,15 +489,18 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
             "xsec_token": xsec_token,
         }
         uri = "/api/sns/web/v1/feed"
-        res = await self.post(uri, data)
-        if res and res.get("items"):
-            res_dict: Dict = res["items"][0]["note_card"]
-            return res_dict
-        # 爬取频繁了可能会出现有的笔记能有结果有的没有
-        utils.logger.error(
-            f"[XiaoHongShuClient.get_note_by_id] get note id:{note_id} empty and res:{res}"
-        )
-        return dict()
+
+        async def fetch_note_card() -> Dict:
+            feed_res = await self.post(uri, data)
+            if feed_res and feed_res.get("items"):
+                return feed_res["items"][0]["note_card"]
+            # 爬取频繁了可能会出现有的笔记能有结果有的没有
+            utils.logger.error(
+                f"[XiaoHongShuClient.get_note_by_id] get note id:{note_id} empty and res:{feed_res}"
+            )
+            return dict()
+
+        return await self._cached_fetch("note_detail", note_id, "", fetch_note_card)
 
     async def get_note_comments(
         self,
@@ -333,7 +526,9 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
             "image_formats": "jpg,webp,avif",
             "xsec_token": xsec_token,
         }
-        return await self.get(uri, params)
+        return await self._cached_fetch(
+            "note_comments", note_id, cursor, lambda: self.get(uri, params)
+        )
 
     async def get_note_sub_comments(
         self,
@@ -365,7 +560,9 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
             "top_comment_id": "",
             "xsec_token": xsec_token,
         }
-        return await self.get(uri, params)
+        return await self._cached_fetch(
+            "note_sub_comments", f"{note_id}/{root_comment_id}", f"{num}:{cursor}", lambda: self.get(uri, params)
+        )
 
     async def get_note_all_comments(
         self,
@@ -374,52 +571,100 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         crawl_interval: float = 1.0,
         callback: Optional[Callable] = None,
         max_count: int = 10,
+        watermark: Optional[NoteWatermark] = None,
+        start_cursor: str = "",
+        on_page_done: Optional[Callable[[str], Awaitable[None]]] = None,
+        time_window: Optional[NoteTimeWindow] = None,
     ) -> List[Dict]:
         """
         获取指定笔记下的所有一级评论，该方法会一直查找一个帖子下的所有评论信息
         Args:
             note_id: 笔记ID
             xsec_token: 验证token
-            crawl_interval: 爬取一次笔记的延迟单位（秒）
+            crawl_interval: 已废弃，请求间隔由自适应限速器统一控制，保留参数兼容旧调用
             callback: 一次笔记爬取结束后
             max_count: 一次笔记爬取的最大评论数量
+            watermark: 增量爬取水位线，设置后跳过已爬取过的评论，某一页没有新评论时停止翻页
+            start_cursor: 起始分页游标，断点续爬时从上次中断的页面继续
+            on_page_done: 一页评论（含其二级评论）回调完成后调用，参数为下一页的游标
+            time_window: 爬取时间窗口，只保留窗口内的评论，评论按时间倒序时整页早于窗口起点即停止翻页
         Returns:
 
         """
         result = []
-        comments_has_more = True
-        comments_cursor = ""
-        while comments_has_more and len(result) < max_count:
-            comments_res = await self.get_note_comments(
-                note_id=note_id, xsec_token=xsec_token, cursor=comments_cursor
-            )
-            comments_has_more = comments_res.get("has_more", False)
-            comments_cursor = comments_res.get("cursor", "")
-            if "comments" not in comments_res:
+        if max_count <= 0:
+            return result
+        seen_comment_ids = set(watermark.seen_comment_ids) if watermark else set()
+        fetched_count = 0
+        # 单篇笔记二级评论总量上限，0 表示不限制
+        sub_comments_left: Optional[int] = config.XHS_MAX_SUB_COMMENTS_PER_NOTE or None
+        cutoff = time_window.comment_cutoff() if time_window is not None else None
+
+        async def fetch_page(cursor: str) -> Tuple[Dict, Optional[List[Dict]]]:
+            page_res = await self.get_note_comments(note_id=note_id, xsec_token=xsec_token, cursor=cursor)
+            page_comments = (page_res or {}).get("comments")
+            if page_comments is not None and watermark is not None:
+                page_comments = [c for c in page_comments if c.get("id") not in seen_comment_ids]
+            return page_res, page_comments
+
+        def next_cursor(page: Tuple[Dict, Optional[List[Dict]]]) -> Optional[str]:
+            # 在后台翻页任务中执行：根据已请求到的一级评论数量决定是否继续翻页
+            nonlocal fetched_count
+            page_res, page_comments = page
+            if page_comments is None or (watermark is not None and not page_comments):
+                return None
+            fetched_count += len(page_comments)
+            if fetched_count >= max_count or not page_res.get("has_more", False):
+                return None
+            if cutoff is not None and cutoff.should_stop(page_res.get("comments") or [], has_more=True):
                 utils.logger.info(
-                    f"[XiaoHongShuClient.get_note_all_comments] No 'comments' key found in response: {comments_res}"
+                    f"[XiaoHongShuClient.get_note_all_comments] Comments older than time window, stop paging, note_id: {note_id}"
                 )
-                break
-            comments = comments_res["comments"]
-            if len(result) + len(comments) > max_count:
-                comments = comments[: max_count - len(result)]
-            if callback:
-                await callback(note_id, comments)
-            await asyncio.sleep(crawl_interval)
-            result.extend(comments)
-            try:
-                from tools.utils import utils as _u
-                import json as _json
-                _u.logger.info('[EVENT] ' + _json.dumps({"stage":"crawl","type":"comments","note_id": note_id, "count": len(comments)}))
-            except Exception:
-                pass
-            sub_comments = await self.get_comments_all_sub_comments(
-                comments=comments,
-                xsec_token=xsec_token,
-                crawl_interval=crawl_interval,
-                callback=callback,
-            )
-            result.extend(sub_comments)
+                return None
+            return page_res.get("cursor", "")
+
+        # 当前页入库、展开子评论的同时，后台已在请求后续页面
+        pages = iter_pages_pipelined(
+            fetch_page, next_cursor, first_cursor=start_cursor, lookahead=config.XHS_COMMENT_PAGE_LOOKAHEAD
+        )
+        async with aclosing(pages):
+            async for comments_res, comments in pages:
+                if len(result) >= max_count:
+                    break
+                if comments is None:
+                    utils.logger.info(
+                        f"[XiaoHongShuClient.get_note_all_comments] No 'comments' key found in response: {comments_res}"
+                    )
+                    break
+                if watermark is not None and not comments:
+                    utils.logger.info(
+                        f"[XiaoHongShuClient.get_note_all_comments] Reached already crawled comments, note_id: {note_id}"
+                    )
+                    break
+                if cutoff is not None:
+                    comments = cutoff.filter(comments)
+                if len(result) + len(comments) > max_count:
+                    comments = comments[: max_count - len(result)]
+                if callback:
+                    await callback(note_id, comments)
+                result.extend(comments)
+                try:
+                    from tools.utils import utils as _u
+                    _u.logger.info('[EVENT] ' + jsoncodec.dumps({"stage":"crawl","type":"comments","note_id": note_id, "count": len(comments)}))
+                except Exception:
+                    pass
+                sub_comments = await self.get_comments_all_sub_comments(
+                    comments=comments,
+                    xsec_token=xsec_token,
+                    crawl_interval=crawl_interval,
+                    callback=callback,
+                    max_count=sub_comments_left,
+                )
+                if sub_comments_left is not None:
+                    sub_comments_left -= len(sub_comments)
+                result.extend(sub_comments)
+                if on_page_done:
+                    await on_page_done(comments_res.get("cursor", ""))
         return result
 
     async def get_comments_all_sub_comments(
@@ -428,14 +673,17 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         xsec_token: str,
         crawl_interval: float = 1.0,
         callback: Optional[Callable] = None,
+        max_count: Optional[int] = None,
     ) -> List[Dict]:
         """
-        获取指定一级评论下的所有二级评论, 该方法会一直查找一级评论下的所有二级评论信息
+        获取指定一级评论下的所有二级评论，多个一级评论并发展开（并发数 XHS_SUB_COMMENT_CONCURRENCY），
+        单个一级评论最多翻 XHS_SUB_COMMENT_MAX_PAGES_PER_ROOT 页
         Args:
             comments: 评论列表
             xsec_token: 验证token
-            crawl_interval: 爬取一次评论的延迟单位（秒）
+            crawl_interval: 已废弃，请求间隔由自适应限速器统一控制，保留参数兼容旧调用
             callback: 一次评论爬取结束后
+            max_count: 本次最多获取的二级评论数量，None 表示不限制
 
         Returns:
 
@@ -446,34 +694,47 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
             )
             return []
 
-        result = []
+        result: List[Dict] = []
+        roots: List[Dict] = []
         for comment in comments:
-            note_id = comment.get("note_id")
             sub_comments = comment.get("sub_comments")
             if sub_comments and callback:
-                await callback(note_id, sub_comments)
+                await callback(comment.get("note_id"), sub_comments)
+            if comment.get("sub_comment_has_more"):
+                roots.append(comment)
+        if not roots or (max_count is not None and max_count <= 0):
+            return result
+
+        semaphore = asyncio.Semaphore(max(1, config.XHS_SUB_COMMENT_CONCURRENCY))
+        max_pages = config.XHS_SUB_COMMENT_MAX_PAGES_PER_ROOT
 
-            sub_comment_has_more = comment.get("sub_comment_has_more")
-            if not sub_comment_has_more:
-                continue
+        def remaining() -> Optional[int]:
+            return None if max_count is None else max_count - len(result)
 
+        async def expand_root(comment: Dict) -> None:
+            note_id = comment.get("note_id")
             root_comment_id = comment.get("id")
             sub_comment_cursor = comment.get("sub_comment_cursor")
-
-            while sub_comment_has_more:
-                comments_res = await self.get_note_sub_comments(
-                    note_id=note_id,
-                    root_comment_id=root_comment_id,
-                    xsec_token=xsec_token,
-                    num=10,
-                    cursor=sub_comment_cursor,
-                )
-
-                if comments_res is None:
+            sub_comment_has_more = True
+            pages = 0
+            while sub_comment_has_more and (max_pages <= 0 or pages < max_pages):
+                left = remaining()
+                if left is not None and left <= 0:
+                    break
+                async with semaphore:
+                    comments_res = await self.get_note_sub_comments(
+                        note_id=note_id,
+                        root_comment_id=root_comment_id,
+                        xsec_token=xsec_token,
+                        num=10,
+                        cursor=sub_comment_cursor,
+                    )
+                pages += 1
+                if not comments_res:
                     utils.logger.info(
                         f"[XiaoHongShuClient.get_comments_all_sub_comments] No response found for note_id: {note_id}"
                     )
-                    continue
+                    break
                 sub_comment_has_more = comments_res.get("has_more", False)
                 sub_comment_cursor = comments_res.get("cursor", "")
                 if "comments" not in comments_res:
@@ -481,17 +742,28 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
                         f"[XiaoHongShuClient.get_comments_all_sub_comments] No 'comments' key found in response: {comments_res}"
                     )
                     break
-                comments = comments_res["comments"]
+                sub_comments = comments_res["comments"]
+                left = remaining()
+                if left is not None:
+                    sub_comments = sub_comments[: max(0, left)]
+                if not sub_comments:
+                    break
+                # 先计入结果再回调，避免并发的其他一级评论超出总量限制
+                result.extend(sub_comments)
                 if callback:
-                    await callback(note_id, comments)
-                await asyncio.sleep(crawl_interval)
-                result.extend(comments)
+                    await callback(note_id, sub_comments)
                 try:
                     from tools.utils import utils as _u
-                    import json as _json
-                    _u.logger.info('[EVENT] ' + _json.dumps({"stage":"crawl","type":"sub_comments","note_id": note_id, "root_comment_id": root_comment_id, "count": len(comments)}))
+                    _u.logger.info('[EVENT] ' + jsoncodec.dumps({"stage":"crawl","type":"sub_comments","note_id": note_id, "root_comment_id": root_comment_id, "count": len(sub_comments)}))
                 except Exception:
                     pass
+
+        outcomes = await asyncio.gather(*[expand_root(comment) for comment in roots], return_exceptions=True)
+        for comment, outcome in zip(roots, outcomes):
+            if isinstance(outcome, Exception):
+                utils.logger.error(
+                    f"[XiaoHongShuClient.get_comments_all_sub_comments] Expand root comment {comment.get('id')} failed: {outcome}"
+                )
         return result
 
     async def get_creator_info(
@@ -561,7 +833,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         获取指定用户下的所有发过的帖子，该方法会一直查找一个用户下的所有帖子信息
         Args:
             user_id: 用户ID
-            crawl_interval: 爬取一次的延迟单位（秒）
+            crawl_interval: 已废弃，请求间隔由自适应限速器统一控制，保留参数兼容旧调用
             callback: 一次分页爬取结束后的更新回调函数
             xsec_token: 验证token
             xsec_source: 渠道来源
@@ -604,7 +876,6 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
                 await callback(notes_to_add)
 
             result.extend(notes_to_add)
-            await asyncio.sleep(crawl_interval)
 
         utils.logger.info(
             f"[XiaoHongShuClient.get_all_notes_by_creator] Finished getting notes for user {user_id}, total: {len(result)}"
@@ -624,7 +895,6 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         data = {"original_url": f"{self._domain}/discovery/item/{note_id}"}
         return await self.post(uri, data=data, return_response=True)
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
     async def get_note_by_id_from_html(
         self,
         note_id: str,
@@ -633,7 +903,7 @@ class XiaoHongShuClient(AbstractApiClient, ProxyRefreshMixin):
         enable_cookie: bool = False,
     ) -> Optional[Dict]:
         """
-        通过解析网页版的笔记详情页HTML，获取笔记详情, 该接口可能会出现失败的情况，这里尝试重试3次
+        通过解析网页版的笔记详情页HTML，获取笔记详情, 该接口可能会出现失败的情况，失败时按重试策略重试
         copy from https://github.com/ReaJason/xhs/blob/eb1c5a0213f6fbb592f0a2897ee552847c69ea2d/xhs/core.py#L217-L259
         thanks for ReaJason
         Args:
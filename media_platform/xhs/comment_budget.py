@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/media_platform/xhs/comment_budget.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 评论预算调度：MAX_TOTAL_COMMENTS_COUNT 不再先到先得，而是在看到整页搜索结果后
+# 按笔记的互动量（评论数、点赞数）成比例分配，没用完的额度退回预算池供后续笔记使用
+
+from typing import Any, Dict, Optional
+
+from tools import utils
+
+from .watermark_store import parse_count
+
+
+class _Candidate:
+    __slots__ = ("weight", "comment_count", "allocated", "used", "state")
+
+    def __init__(self, weight: float, comment_count: Optional[int]):
+        self.weight = weight
+        self.comment_count = comment_count
+        self.allocated = 0
+        self.used = 0
+        self.state = "pending"  # pending -> allocated -> finished / discarded
+
+
+class CommentBudgetScheduler:
+    """
+    评论预算调度器
+
+    - register: 搜索结果页中的每篇候选笔记先登记互动量
+    - allocate: 开始爬取某篇笔记的评论时，按其权重占"尚未分配的笔记权重 + 预计后续笔记权重"
+      的比例，从剩余预算池中分配额度
+    - finish: 笔记评论爬取结束，未用完的额度退回预算池
+    - discard: 笔记不再爬取评论（详情获取失败、重复笔记等），其权重不再参与分配
+    - release_expected: 搜索结果被过滤或关键词提前结束时，减少为后续笔记预留的数量
+
+    所有方法都是同步的，在同一个事件循环中调用天然是原子的，不需要额外加锁
+    """
+
+    def __init__(
+        self,
+        total_budget: int,
+        per_note_cap: int,
+        expected_notes: int = 0,
+        min_per_note: int = 1,
+        like_weight: float = 0.1,
+    ):
+        """
+        Args:
+            total_budget: 评论总预算
+            per_note_cap: 单篇笔记最多分配的评论数
+            expected_notes: 本次运行预计的候选笔记总数，用于给还没搜到的后续页面预留预算
+            min_per_note: 预算池有余量时单篇笔记至少分配的评论数
+            like_weight: 点赞数折算为权重的系数（评论数系数为 1）
+        """
+        self.total_budget = max(0, total_budget)
+        self.per_note_cap = max(0, per_note_cap)
+        self.expected_notes = max(0, expected_notes)
+        self.min_per_note = max(0, min_per_note)
+        self.like_weight = like_weight
+        self._pool = self.total_budget
+        self._candidates: Dict[str, _Candidate] = {}
+        self._registered = 0
+        self._registered_weight = 0.0
+        self._pending_weight = 0.0
+        self.returned = 0
+
+    def register(self, note_id: str, interact_info: Optional[Dict[str, Any]]) -> bool:
+        """
+        登记候选笔记
+        Args:
+            note_id: 笔记ID
+            interact_info: 搜索结果中的 note_card.interact_info
+
+        Returns:
+            是否为新登记的笔记（已登记过的笔记返回 False）
+        """
+        if not note_id or note_id in self._candidates:
+            return False
+        interact_info = interact_info or {}
+        comment_count = parse_count(interact_info.get("comment_count"))
+        liked_count = parse_count(interact_info.get("liked_count")) or 0
+        weight = 1.0 + (comment_count or 0) + self.like_weight * liked_count
+        self._candidates[note_id] = _Candidate(weight, comment_count)
+        self._registered += 1
+        self._registered_weight += weight
+        self._pending_weight += weight
+        return True
+
+    def _future_weight(self) -> float:
+        unseen = self.expected_notes - self._registered
+        if unseen <= 0 or not self._registered:
+            return 0.0
+        return unseen * self._registered_weight / self._registered
+
+    def allocate(self, note_id: str) -> int:
+        """
+        为笔记分配评论额度，未登记的笔记按平均权重计算
+        Returns:
+            本篇笔记可爬取的评论数，0 表示不爬取
+        """
+        candidate = self._candidates.get(note_id)
+        if candidate is None:
+            self.register(note_id, None)
+            candidate = self._candidates[note_id]
+        if candidate.state != "pending":
+            return 0
+        self._pending_weight -= candidate.weight
+        candidate.state = "allocated"
+
+        quota = 0
+        if self._pool > 0 and candidate.comment_count != 0:
+            total_weight = candidate.weight + self._pending_weight + self._future_weight()
+            share = self._pool * candidate.weight / total_weight
+            quota = max(self.min_per_note, round(share))
+            quota = min(quota, self.per_note_cap, self._pool)
+            if candidate.comment_count is not None:
+                quota = min(quota, candidate.comment_count)
+        candidate.allocated = quota
+        self._pool -= quota
+        utils.logger.info(
+            f"[CommentBudgetScheduler.allocate] note_id: {note_id}, weight: {candidate.weight:.1f}, "
+            f"quota: {quota}, pool left: {self._pool}"
+        )
+        return quota
+
+    def finish(self, note_id: str, used: int) -> None:
+        """笔记评论爬取结束，退回未用完的额度（评论数不足、提前停止翻页等）"""
+        candidate = self._candidates.get(note_id)
+        if candidate is None or candidate.state != "allocated":
+            return
+        candidate.state = "finished"
+        candidate.used = used
+        unused = max(0, candidate.allocated - used)
+        self._pool += unused
+        self.returned += unused
+
+    def release_expected(self, count: int) -> None:
+        """
+        预计的候选笔记中有 count 篇不会再登记（被过滤、续爬跳过或关键词没有更多结果），
+        不再为它们预留预算，后续分配的笔记按实际候选数量分到剩余预算
+        """
+        if count > 0:
+            self.expected_notes = max(0, self.expected_notes - count)
+
+    def discard(self, note_id: str) -> None:
+        """笔记不会再爬取评论，其权重不再参与后续分配"""
+        candidate = self._candidates.get(note_id)
+        if candidate is None or candidate.state != "pending":
+            return
+        candidate.state = "discarded"
+        self._pending_weight -= candidate.weight
+
+    @property
+    def pool(self) -> int:
+        return self._pool
+
+    def stats(self) -> Dict[str, Any]:
+        allocated = [c for c in self._candidates.values() if c.state in ("allocated", "finished")]
+        return {
+            "total_budget": self.total_budget,
+            "pool_left": self._pool,
+            "notes": len(allocated),
+            "allocated": sum(c.allocated for c in allocated),
+            "used": sum(c.used for c in allocated),
+            "returned": self.returned,
+        }
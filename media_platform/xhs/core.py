@@ -21,7 +21,8 @@ import asyncio
 import os
 import random
 from asyncio import Task
-from typing import Dict, List, Optional
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
 
 from playwright.async_api import (
     BrowserContext,
@@ -30,7 +31,6 @@ from playwright.async_api import (
     Playwright,
     async_playwright,
 )
-from tenacity import RetryError
 
 import config
 from base.base_crawler import AbstractCrawler
@@ -39,13 +39,21 @@ from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import xhs as xhs_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.checkpoint import CheckpointJournal, checkpoint_path
+from tools.media_downloader import MediaDownloader
 from var import crawler_type_var, source_keyword_var
 
 from .client import XiaoHongShuClient
-from .exception import DataFetchError
-from .field import SearchSortType
-from .help import parse_note_info_from_note_url, parse_creator_info_from_url, get_search_id
+from .exception import DataFetchError, IPBlockError, NoteAbnormalError
+from .help import parse_note_info_from_note_url, parse_creator_info_from_url
+from .comment_budget import CommentBudgetScheduler
 from .login import XiaoHongShuLogin
+from .note_dedup import NoteDedup
+from .search_checkpoint import SearchCheckpoint
+from .time_window import NoteTimeWindow
+from .search_pipeline import SearchPipeline
+from .sign_page_pool import SignPagePool
+from .watermark_store import NoteWatermarkStore
 
 
 class XiaoHongShuCrawler(AbstractCrawler):
@@ -60,6 +68,14 @@ class XiaoHongShuCrawler(AbstractCrawler):
         self.user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
         self.cdp_manager = None
         self.ip_proxy_pool = None  # 代理IP池，用于代理自动刷新
+        self.sign_page_pool: Optional[SignPagePool] = None  # 多页面签名池，XHS_SIGN_PAGE_POOL_SIZE > 0 时启用
+        self.watermark_store: Optional[NoteWatermarkStore] = None  # 增量爬取水位线，ENABLE_INCREMENTAL_CRAWL 时启用
+        self._pending_watermarks: Dict[str, Dict] = {}  # 已获取详情、等待评论爬取完成后更新水位线的笔记
+        self.note_dedup: Optional[NoteDedup] = None  # 跨关键词笔记去重，ENABLE_NOTE_DEDUP 时启用
+        self.comment_budget: Optional[CommentBudgetScheduler] = None  # 搜索模式下按互动量分配评论预算
+        self.checkpoint: Optional[SearchCheckpoint] = None  # 搜索模式断点续爬，ENABLE_CHECKPOINT 时启用
+        self.time_window: Optional[NoteTimeWindow] = None  # 爬取时间窗口，设置 CRAWL_SINCE/CRAWL_UNTIL 时启用
+        self.media_downloader: Optional[MediaDownloader] = None  # 媒体下载器，ENABLE_GET_MEIDAS 时启用
         self.total_comments_collected = 0
         self.max_total_comments = getattr(config, "MAX_TOTAL_COMMENTS_COUNT", 100)
         self.stop_requested = False
@@ -110,6 +126,15 @@ class XiaoHongShuCrawler(AbstractCrawler):
                     utils.logger.error(f"[XiaoHongShuCrawler.start] Retry navigation failed: {e2}")
                     raise
 
+            if config.XHS_SIGN_PAGE_POOL_SIZE > 0:
+                self.sign_page_pool = SignPagePool(
+                    self.browser_context,
+                    size=config.XHS_SIGN_PAGE_POOL_SIZE,
+                    index_url=self.index_url,
+                    fallback_page=self.context_page,
+                )
+                await self.sign_page_pool.start()
+
             # Create a client to interact with the xiaohongshu website.
             self.xhs_client = await self.create_xhs_client(httpx_proxy_format)
             if not await self.xhs_client.pong():
@@ -125,6 +150,29 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 await self.xhs_client.update_cookies(browser_context=self.browser_context)
                 utils.logger.info("[XiaoHongShuCrawler.start] Cookies updated after login")
 
+            if config.ENABLE_INCREMENTAL_CRAWL:
+                self.watermark_store = NoteWatermarkStore(
+                    config.XHS_INCREMENTAL_STATE_DB_PATH,
+                    max_seen_ids=config.XHS_INCREMENTAL_SEEN_COMMENT_IDS_CAP,
+                )
+            if config.ENABLE_NOTE_DEDUP:
+                self.note_dedup = NoteDedup(
+                    config.XHS_NOTE_DEDUP_HISTORY_PATH or None,
+                    capacity=config.XHS_NOTE_DEDUP_BLOOM_CAPACITY,
+                    error_rate=config.XHS_NOTE_DEDUP_BLOOM_ERROR_RATE,
+                )
+
+            self.time_window = NoteTimeWindow.from_config()
+            if config.ENABLE_GET_MEIDAS:
+                self.media_downloader = MediaDownloader(
+                    self.xhs_client.get_media_client,
+                    concurrency=config.MEDIA_DOWNLOAD_CONCURRENCY,
+                    queue_size=config.MEDIA_DOWNLOAD_QUEUE_SIZE,
+                    max_bytes_per_sec=config.MEDIA_DOWNLOAD_MAX_BYTES_PER_SEC,
+                    max_attempts=config.MEDIA_DOWNLOAD_MAX_ATTEMPTS,
+                )
+                self.media_downloader.start()
+
             crawler_type_var.set(config.CRAWLER_TYPE)
             if config.CRAWLER_TYPE == "search":
                 # Search for notes and retrieve their comment information.
@@ -138,76 +186,69 @@ class XiaoHongShuCrawler(AbstractCrawler):
             else:
                 pass
 
+            if self.media_downloader is not None:
+                # 笔记已全部处理完，等待队列中剩余的媒体下载结束
+                await self.media_downloader.join()
+
             utils.logger.info("[XiaoHongShuCrawler.start] Xhs Crawler finished ...")
 
     async def search(self) -> None:
-        """Search for notes and retrieve their comment information."""
+        """Search for notes and retrieve their comment information.
+
+        每个关键词通过 SearchPipeline 流式处理：翻页、详情、评论各阶段并行推进，
+        阶段之间用有界队列背压，整体请求速率仍由 rate_controller 统一控制
+        """
         utils.logger.info("[XiaoHongShuCrawler.search] Begin search xiaohongshu keywords")
         xhs_limit_count = 20  # xhs limit page fixed value
         if config.CRAWLER_MAX_NOTES_COUNT < xhs_limit_count:
             config.CRAWLER_MAX_NOTES_COUNT = xhs_limit_count
-        start_page = config.START_PAGE
-        for keyword in config.KEYWORDS.split(","):
+        keywords = config.KEYWORDS.split(",")
+        if config.ENABLE_CHECKPOINT and config.CHECKPOINT_RUN_ID:
+            journal_path = checkpoint_path(config.CHECKPOINT_RUN_ID)
+            self.checkpoint = SearchCheckpoint(CheckpointJournal(journal_path), CheckpointJournal.replay(journal_path))
+            self.total_comments_collected = self.checkpoint.comments_collected
+        if config.ENABLE_COMMENT_BUDGET and config.ENABLE_GET_COMMENTS:
+            self.comment_budget = CommentBudgetScheduler(
+                total_budget=self.max_total_comments - self.total_comments_collected,
+                per_note_cap=getattr(config, "CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES", 10),
+                expected_notes=config.CRAWLER_MAX_NOTES_COUNT * len(keywords),
+                min_per_note=config.XHS_COMMENT_BUDGET_MIN_PER_NOTE,
+                like_weight=config.XHS_COMMENT_BUDGET_LIKE_WEIGHT,
+            )
+        # 同时执行 KEYWORD_CONCURRENCY 个关键词，共享同一个限速器（按关键词加权轮流取令牌）
+        keyword_concurrency = max(1, min(config.KEYWORD_CONCURRENCY, len(keywords)))
+        pending_keywords: Deque[Tuple[int, str]] = deque(enumerate(keywords))
+        await asyncio.gather(
+            *[self._search_keyword_worker(pending_keywords, keyword_concurrency) for _ in range(keyword_concurrency)]
+        )
+        if self.comment_budget is not None:
+            utils.logger.info(f"[XiaoHongShuCrawler.search] Comment budget stats: {self.comment_budget.stats()}")
+        if self.time_window is not None:
+            utils.logger.info(f"[XiaoHongShuCrawler.search] Time window stats: {self.time_window.stats()}")
+
+    async def _search_keyword_worker(self, pending_keywords: Deque[Tuple[int, str]], keyword_concurrency: int) -> None:
+        """
+        依次从队列中取关键词执行搜索流水线；每个 worker 运行在独立的 task 中，
+        设置的 source_keyword 只影响本 worker 发出的请求和写入的数据
+        """
+        while pending_keywords and not self.stop_requested:
+            kw_index, keyword = pending_keywords.popleft()
+            if self.checkpoint is not None and kw_index in self.checkpoint.done_keywords:
+                utils.logger.info(f"[XiaoHongShuCrawler.search] Keyword {keyword} finished in checkpoint, skip")
+                continue
             source_keyword_var.set(keyword)
             utils.logger.info(f"[XiaoHongShuCrawler.search] Current search keyword: {keyword}")
-            page = 1
-            search_id = get_search_id()
-            while (page - start_page + 1) * xhs_limit_count <= config.CRAWLER_MAX_NOTES_COUNT:
-                if self.stop_requested:
-                    break
-                if page < start_page:
-                    utils.logger.info(f"[XiaoHongShuCrawler.search] Skip page {page}")
-                    page += 1
-                    continue
-
-                try:
-                    utils.logger.info(f"[XiaoHongShuCrawler.search] search xhs keyword: {keyword}, page: {page}")
-                    note_ids: List[str] = []
-                    xsec_tokens: List[str] = []
-                    notes_res = await self.xhs_client.get_note_by_keyword(
-                        keyword=keyword,
-                        search_id=search_id,
-                        page=page,
-                        sort=(SearchSortType(config.SORT_TYPE) if config.SORT_TYPE != "" else SearchSortType.GENERAL),
-                    )
-                    utils.logger.info(f"[XiaoHongShuCrawler.search] Search notes res:{notes_res}")
-                    if not notes_res or not notes_res.get("has_more", False):
-                        utils.logger.info("No more content!")
-                        break
-                    semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
-                    task_list = [
-                        self.get_note_detail_async_task(
-                            note_id=post_item.get("id"),
-                            xsec_source=post_item.get("xsec_source"),
-                            xsec_token=post_item.get("xsec_token"),
-                            semaphore=semaphore,
-                        ) for post_item in notes_res.get("items", {}) if post_item.get("model_type") not in ("rec_query", "hot_query")
-                    ]
-                    note_details = await asyncio.gather(*task_list)
-                    for note_detail in note_details:
-                        if note_detail:
-                            await xhs_store.update_xhs_note(note_detail)
-                            await self.get_notice_media(note_detail)
-                            note_ids.append(note_detail.get("note_id"))
-                            xsec_tokens.append(note_detail.get("xsec_token"))
-                    page += 1
-                    utils.logger.info(f"[XiaoHongShuCrawler.search] Note details: {note_details}")
-                    await self.batch_get_note_comments(note_ids, xsec_tokens)
-                    if self.stop_requested:
-                        break
-
-                    # Sleep after each page navigation
-                    sleep_sec = max(1, config.CRAWLER_MAX_SLEEP_SEC + random.uniform(-0.5, 0.5))
-                    await asyncio.sleep(sleep_sec)
-                    utils.logger.info(f"[XiaoHongShuCrawler.search] Sleeping for {sleep_sec} seconds after page {page-1}")
-                except DataFetchError:
-                    utils.logger.error("[XiaoHongShuCrawler.search] Get note detail error")
-                    break
+            pipeline = SearchPipeline(self, keyword, kw_index, concurrency_share=keyword_concurrency)
+            await pipeline.run()
             if self.stop_requested:
-                break
-            sleep_kw = max(5, getattr(config, "CROSS_KEYWORD_SLEEP_SEC", 15) + random.uniform(-1, 1))
-            await asyncio.sleep(sleep_kw)
-            utils.logger.info(f"[XiaoHongShuCrawler.search] Sleeping for {sleep_kw} seconds after keyword {keyword}")
+                return
+            if self.checkpoint is not None and pipeline.search_completed:
+                self.checkpoint.record_keyword_done(kw_index)
+            if keyword_concurrency == 1 and pending_keywords:
+                # 关键词串行执行时保留关键词之间的停顿
+                sleep_kw = max(5, getattr(config, "CROSS_KEYWORD_SLEEP_SEC", 15) + random.uniform(-1, 1))
+                utils.logger.info(f"[XiaoHongShuCrawler.search] Sleeping for {sleep_kw} seconds after keyword {keyword}")
+                await asyncio.sleep(sleep_kw)
 
     async def get_creators_and_notes(self) -> None:
         """Get creator's notes and retrieve their comment information."""
@@ -231,12 +272,9 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 utils.logger.error(f"[XiaoHongShuCrawler.get_creators_and_notes] Failed to parse creator URL: {e}")
                 continue
 
-            # Use fixed crawling interval
-            crawl_interval = config.CRAWLER_MAX_SLEEP_SEC
             # Get all note information of the creator
             all_notes_list = await self.xhs_client.get_all_notes_by_creator(
                 user_id=user_id,
-                crawl_interval=crawl_interval,
                 callback=self.fetch_creator_notes_detail,
                 xsec_token=creator_info.xsec_token,
                 xsec_source=creator_info.xsec_source,
@@ -323,8 +361,11 @@ class XiaoHongShuCrawler(AbstractCrawler):
             try:
                 try:
                     note_detail = await self.xhs_client.get_note_by_id(note_id, xsec_source, xsec_token)
-                except RetryError:
-                    pass
+                except NoteAbnormalError:
+                    raise
+                except (DataFetchError, IPBlockError) as ex:
+                    # 详情接口重试失败或已熔断，改为解析网页版详情页
+                    utils.logger.warning(f"[XiaoHongShuCrawler.get_note_detail_async_task] Get note detail api error: {ex}, fallback to html")
 
                 if not note_detail:
                     note_detail = await self.xhs_client.get_note_by_id_from_html(note_id, xsec_source, xsec_token,
@@ -333,14 +374,20 @@ class XiaoHongShuCrawler(AbstractCrawler):
                         return None
 
                 note_detail.update({"xsec_token": xsec_token, "xsec_source": xsec_source})
-
-                sleep_sec = max(1, config.CRAWLER_MAX_SLEEP_SEC + random.uniform(-0.5, 0.5))
-                await asyncio.sleep(sleep_sec)
-                utils.logger.info(f"[get_note_detail_async_task] Sleeping for {sleep_sec} seconds after fetching note {note_id}")
-
+                if self.watermark_store is not None:
+                    interact_info = note_detail.get("interact_info") or {}
+                    if self.watermark_store.is_unchanged(
+                        self.watermark_store.get(note_id),
+                        interact_info.get("comment_count"),
+                        note_detail.get("last_update_time"),
+                    ):
+                        self.watermark_store.skipped_notes += 1
+                        utils.logger.info(f"[get_note_detail_async_task] Note {note_id} unchanged since last run, skip")
+                        return None
+                    self._pending_watermarks[note_id] = note_detail
                 return note_detail
 
-            except DataFetchError as ex:
+            except (DataFetchError, IPBlockError) as ex:
                 utils.logger.error(f"[XiaoHongShuCrawler.get_note_detail_async_task] Get note detail error: {ex}")
                 return None
             except KeyError as ex:
@@ -351,6 +398,8 @@ class XiaoHongShuCrawler(AbstractCrawler):
         """Batch get note comments"""
         if not config.ENABLE_GET_COMMENTS:
             utils.logger.info(f"[XiaoHongShuCrawler.batch_get_note_comments] Crawling comment mode is not enabled")
+            for note_id in note_list:
+                self._commit_watermark(note_id)
             return
         if self.stop_requested or self.comments_limit_reached:
             return
@@ -368,56 +417,133 @@ class XiaoHongShuCrawler(AbstractCrawler):
             task_list.append(task)
         await asyncio.gather(*task_list)
 
-    async def get_comments(self, note_id: str, xsec_token: str, semaphore: asyncio.Semaphore):
-        """Get note comments with keyword filtering and quantity limitation"""
+    async def get_comments(
+        self,
+        note_id: str,
+        xsec_token: str,
+        semaphore: asyncio.Semaphore,
+        callback: Optional[Callable] = None,
+        resume: Optional[Tuple[str, int]] = None,
+        on_page_done: Optional[Callable] = None,
+        commit_watermark: bool = True,
+    ) -> Optional[List[Dict]]:
+        """Get note comments with keyword filtering and quantity limitation
+
+        Args:
+            note_id:
+            xsec_token:
+            semaphore:
+            callback: 每批评论的回调，默认 _on_comments_batch（计入总量限制并入库）
+            resume: 断点续爬时的 (起始游标, 该笔记已入库评论数)
+            on_page_done: 每页评论处理完后的回调，参数为下一页游标
+            commit_watermark: 是否在此更新增量水位线；callback 只是把评论交给后续入库任务时传 False，
+                由调用方在评论入库后自行调用 _commit_watermark
+
+        Returns:
+            爬取到的评论，提前返回时为 None
+        """
         async with semaphore:
             if self.stop_requested or self.comments_limit_reached:
                 return
             utils.logger.info(f"[XiaoHongShuCrawler.get_comments] Begin get note id comments {note_id}")
-            crawl_interval = max(1, config.CRAWLER_MAX_SLEEP_SEC + random.uniform(-0.5, 0.5))
+            start_cursor, collected = resume or ("", 0)
             remaining = max(0, self.max_total_comments - self.total_comments_collected)
             per_note_limit = getattr(config, "CRAWLER_MAX_COMMENTS_COUNT_SINGLENOTES", 10)
             max_count = max(0, min(per_note_limit, remaining))
             if max_count <= 0:
                 self.comments_limit_reached = True
-                if config.SAVE_DATA_OPTION == "excel":
-                    try:
-                        from store.excel_store_base import ExcelStoreBase
-                        ExcelStoreBase.flush_all()
-                    except Exception:
-                        pass
                 return
-            await self.xhs_client.get_note_all_comments(
-                note_id=note_id,
-                xsec_token=xsec_token,
-                crawl_interval=crawl_interval,
-                callback=self._on_comments_batch,
-                max_count=max_count,
-            )
-
-            await asyncio.sleep(crawl_interval)
-            utils.logger.info(f"[XiaoHongShuCrawler.get_comments] Sleeping for {crawl_interval} seconds after fetching comments for note {note_id}")
-            if self.stop_requested or self.comments_limit_reached:
+            max_count = min(max_count, per_note_limit - collected)
+            if max_count <= 0:
                 return
-
-    async def _on_comments_batch(self, note_id: str, comments: List[Dict]):
-        if self.stop_requested or self.comments_limit_reached:
+            watermark = None
+            if self.watermark_store is not None:
+                if note_id not in self._pending_watermarks:
+                    # 增量模式下只爬取详情有变化的笔记的评论
+                    if self.comment_budget is not None:
+                        self.comment_budget.discard(note_id)
+                    return
+                watermark = self.watermark_store.get(note_id)
+            if self.comment_budget is not None:
+                # 按互动量分配的额度；不更新水位线，预算不足时下次运行还会爬取这篇笔记的评论
+                max_count = min(max_count, self.comment_budget.allocate(note_id))
+                if max_count <= 0:
+                    return
+            comments: List[Dict] = []
+            try:
+                comments = await self.xhs_client.get_note_all_comments(
+                    note_id=note_id,
+                    xsec_token=xsec_token,
+                    callback=callback or self._on_comments_batch,
+                    max_count=max_count,
+                    watermark=watermark,
+                    start_cursor=start_cursor,
+                    on_page_done=on_page_done,
+                    time_window=self.time_window,
+                )
+            finally:
+                if self.comment_budget is not None:
+                    self.comment_budget.finish(note_id, len(comments))
+            if commit_watermark:
+                self._commit_watermark(note_id, comments)
+            return comments
+
+    async def retag_seen_note(self, note_id: str) -> None:
+        """本次运行已入库的笔记在新的关键词下再次出现时，只更新其来源关键词，不再请求详情和评论"""
+        note_detail = self.note_dedup.get_detail(note_id)
+        if note_detail is None:
+            # 首次获取仍在进行中，入库时会带上全部关键词
+            return
+        self.note_dedup.retagged += 1
+        note_detail["source_keyword"] = self.note_dedup.source_keyword(note_id)
+        utils.logger.info(
+            f"[XiaoHongShuCrawler.retag_seen_note] Note {note_id} already crawled, source keywords: {note_detail['source_keyword']}"
+        )
+        await xhs_store.update_xhs_note(note_detail)
+
+    def _is_search_item_unchanged(self, post_item: Dict) -> bool:
+        """增量模式下根据搜索结果中的评论数判断笔记是否没有变化，可省去详情请求"""
+        if self.watermark_store is None:
+            return False
+        interact_info = (post_item.get("note_card") or {}).get("interact_info") or {}
+        if "comment_count" not in interact_info:
+            return False
+        note_id = post_item.get("id")
+        if not self.watermark_store.is_unchanged(self.watermark_store.get(note_id), interact_info.get("comment_count")):
+            return False
+        self.watermark_store.skipped_notes += 1
+        utils.logger.info(f"[XiaoHongShuCrawler.search] Note {note_id} unchanged since last run, skip")
+        return True
+
+    def _commit_watermark(self, note_id: str, comments: Optional[List[Dict]] = None) -> None:
+        """笔记（及评论）入库后更新增量水位线，等数据落盘后才写入，避免进程被杀死时水位线跑到数据前面"""
+        if self.watermark_store is None:
+            return
+        note_detail = self._pending_watermarks.pop(note_id, None)
+        if note_detail is None:
             return
+        watermark_store = self.watermark_store
+        xhs_store.call_after_stored(lambda: watermark_store.commit(note_id, note_detail, comments))
+
+    def _reserve_comment_quota(self, comments: List[Dict]) -> List[Dict]:
+        """按评论总量限制截取本批评论并计数，返回需要入库的评论"""
+        if self.stop_requested or self.comments_limit_reached or not comments:
+            return []
         remaining = max(0, self.max_total_comments - self.total_comments_collected)
-        if remaining <= 0 or not comments:
+        if remaining <= 0:
             self.comments_limit_reached = True
-            return
+            return []
         sliced = comments[:remaining]
-        await xhs_store.batch_update_xhs_note_comments(note_id, sliced)
         self.total_comments_collected += len(sliced)
         if self.total_comments_collected >= self.max_total_comments:
             self.comments_limit_reached = True
-            if config.SAVE_DATA_OPTION == "excel":
-                try:
-                    from store.excel_store_base import ExcelStoreBase
-                    ExcelStoreBase.flush_all()
-                except Exception:
-                    pass
+        return sliced
+
+    async def _on_comments_batch(self, note_id: str, comments: List[Dict]):
+        sliced = self._reserve_comment_quota(comments)
+        if not sliced:
+            return
+        await xhs_store.batch_update_xhs_note_comments(note_id, sliced)
 
     async def create_xhs_client(self, httpx_proxy: Optional[str]) -> XiaoHongShuClient:
         """Create xhs client"""
@@ -446,6 +572,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
             playwright_page=self.context_page,
             cookie_dict=cookie_dict,
             proxy_ip_pool=self.ip_proxy_pool,  # 传递代理池用于自动刷新
+            sign_page_pool=self.sign_page_pool,
         )
         return xhs_client_obj
 
@@ -511,7 +638,30 @@ class XiaoHongShuCrawler(AbstractCrawler):
             return await self.launch_browser(chromium, playwright_proxy, user_agent, headless)
 
     async def close(self):
-        """Close browser context"""
+        """Close http connection pools and browser context"""
+        if self.media_downloader:
+            await self.media_downloader.close()
+            self.media_downloader = None
+        # 先停止代理池的后台刷新，避免关闭连接池后再切换代理
+        if self.ip_proxy_pool:
+            await self.ip_proxy_pool.close()
+        if getattr(self, "xhs_client", None):
+            await self.xhs_client.close()
+        if self.sign_page_pool:
+            await self.sign_page_pool.close()
+            self.sign_page_pool = None
+        if self.watermark_store or self.note_dedup or self.checkpoint:
+            # 缓冲数据写出后才会写入水位线、去重历史和断点日志
+            await xhs_store.flush_stored()
+        if self.watermark_store:
+            self.watermark_store.close()
+            self.watermark_store = None
+        if self.note_dedup:
+            self.note_dedup.close()
+            self.note_dedup = None
+        if self.checkpoint:
+            self.checkpoint.close()
+            self.checkpoint = None
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -542,20 +692,17 @@ class XiaoHongShuCrawler(AbstractCrawler):
             if img.get("url_default") != "":
                 img.update({"url": img.get("url_default")})
 
-        if not image_list:
+        if not image_list or self.media_downloader is None:
             return
         picNum = 0
         for pic in image_list:
             url = pic.get("url")
             if not url:
                 continue
-            content = await self.xhs_client.get_note_media(url)
-            await asyncio.sleep(random.random())
-            if content is None:
-                continue
             extension_file_name = f"{picNum}.jpg"
             picNum += 1
-            await xhs_store.update_xhs_note_image(note_id, content, extension_file_name)
+            # 只提交下载任务，由下载器的 worker 流式写入磁盘
+            await self.media_downloader.submit(url, xhs_store.get_note_image_path(note_id, extension_file_name))
 
     async def get_notice_video(self, note_item: Dict):
         """
@@ -569,14 +716,10 @@ class XiaoHongShuCrawler(AbstractCrawler):
 
         videos = xhs_store.get_video_url_arr(note_item)
 
-        if not videos:
+        if not videos or self.media_downloader is None:
             return
         videoNum = 0
         for url in videos:
-            content = await self.xhs_client.get_note_media(url)
-            await asyncio.sleep(random.random())
-            if content is None:
-                continue
             extension_file_name = f"{videoNum}.mp4"
             videoNum += 1
-            await xhs_store.update_xhs_note_video(note_id, content, extension_file_name)
+            await self.media_downloader.submit(url, xhs_store.get_note_video_path(note_id, extension_file_name))
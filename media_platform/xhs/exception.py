@@ -18,7 +18,11 @@
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
 
-from httpx import RequestError
+from json import JSONDecodeError
+
+from httpx import RequestError, TransportError
+
+from tools.retry_policy import BreakerOpenError, FailureClass
 
 
 class DataFetchError(RequestError):
@@ -27,3 +31,41 @@ class DataFetchError(RequestError):
 
 class IPBlockError(RequestError):
     """fetch so fast that the server block us ip"""
+
+
+class SignError(DataFetchError):
+    """the request signature is rejected by the server"""
+
+
+class NoteAbnormalError(DataFetchError):
+    """the note is deleted, hidden or under review, retrying does not help"""
+
+
+class VerificationError(DataFetchError):
+    """the server asks for captcha verification (461/471)"""
+
+
+class CircuitOpenError(DataFetchError, BreakerOpenError):
+    """the endpoint circuit breaker is open, the request is not sent"""
+
+
+def classify_failure(exc: BaseException) -> FailureClass:
+    """
+    请求失败分类，决定重试策略：
+    - 签名被拒、验证码：认证失效，不重试
+    - 笔记状态异常：永久失败，不重试
+    - IP 被封：限流，长退避后重试
+    - 网络错误、超时、响应无法解析、其他业务错误：临时失败，退避后重试
+    - 熔断（请求未发出）、其他异常（代码错误等）：无法分类，不重试，不影响熔断器状态
+    """
+    if isinstance(exc, (SignError, VerificationError)):
+        return FailureClass.AUTH_EXPIRED
+    if isinstance(exc, NoteAbnormalError):
+        return FailureClass.PERMANENT
+    if isinstance(exc, CircuitOpenError):
+        return FailureClass.UNKNOWN
+    if isinstance(exc, IPBlockError):
+        return FailureClass.THROTTLED
+    if isinstance(exc, (DataFetchError, TransportError, JSONDecodeError)):
+        return FailureClass.TRANSIENT
+    return FailureClass.UNKNOWN
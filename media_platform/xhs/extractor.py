@@ -19,10 +19,88 @@
 
 import json
 import re
-from typing import Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import humps
 
+_STATE_MARKER = "window.__INITIAL_STATE__="
+_SCRIPT_END = "</script>"
+
+# 字符串字面量整体匹配（跳过其中的内容），只替换字符串之外的 JS undefined
+_UNDEFINED_PATTERN = re.compile(r'("[^"\\]*(?:\\.[^"\\]*)*")|\bundefined\b')
+
+_WHITESPACE = re.compile(r"\s*")
+
+# 按解码错误位置逐个替换 undefined 的最大次数
+_MAX_UNDEFINED_PATCHES = 16
+
+# strict=False：页面中的字符串可能包含未转义的控制字符
+_DECODER = json.JSONDecoder(strict=False)
+
+
+def _locate_state(html: str) -> Optional[Tuple[int, int]]:
+    """
+    定位 __INITIAL_STATE__ 在页面中的起止位置，只扫描一次，不复制页面内容
+
+    Returns:
+        (start, end)，state 为 html[start:end]；未找到时返回 None
+    """
+    start = html.find(_STATE_MARKER)
+    if start < 0:
+        return None
+    start += len(_STATE_MARKER)
+    end = html.find(_SCRIPT_END, start)
+    if end < 0:
+        return None
+    return start, end
+
+
+def _replace_undefined(text: str, replacement: str) -> str:
+    """把字符串之外的 undefined 替换为 replacement，字符串内容保持不变"""
+    if "undefined" not in text:
+        return text
+    return _UNDEFINED_PATTERN.sub(lambda m: m.group(1) or replacement, text)
+
+
+def _decode_subtree(html: str, bounds: Tuple[int, int], key: str, undefined: str) -> Any:
+    """
+    只解析 state 中 key 对应的子树：按位置找到 "key": 后直接从值的起点解码，
+    不解析 state 的其余部分
+
+    JSON 字符串中的引号必然被转义，所以 '"key":' 不会误匹配到字符串内容里
+
+    Args:
+        html: 页面html
+        bounds: _locate_state 返回的 state 位置
+        key: 子树的 key
+        undefined: JS undefined 的替换值（JSON 文本）
+
+    Returns:
+        子树对象，未找到 key 时返回 None
+    """
+    start, end = bounds
+    token = f'"{key}":'
+    pos = html.find(token, start, end)
+    if pos < 0:
+        return None
+    pos = _WHITESPACE.match(html, pos + len(token)).end()
+    try:
+        return _DECODER.raw_decode(html, pos)[0]
+    except json.JSONDecodeError as e:
+        if not html.startswith("undefined", e.pos):
+            raise
+    # 子树中含有 JS undefined：解码器报错的位置就是 undefined 所在的值位置（一定在字符串之外），
+    # 逐个替换后重新解码；数量过多时改为整段替换
+    text = html[pos:end]
+    for _ in range(_MAX_UNDEFINED_PATCHES):
+        try:
+            return _DECODER.raw_decode(text)[0]
+        except json.JSONDecodeError as e:
+            if not text.startswith("undefined", e.pos):
+                raise
+            text = text[:e.pos] + undefined + text[e.pos + len("undefined"):]
+    return _DECODER.raw_decode(_replace_undefined(text, undefined))[0]
+
 
 class XiaoHongShuExtractor:
     def __init__(self):
@@ -31,6 +109,8 @@ class XiaoHongShuExtractor:
     def extract_note_detail_from_html(self, note_id: str, html: str) -> Optional[Dict]:
         """从html中提取笔记详情
 
+        只解析 note.noteDetailMap 子树，并只对目标笔记做 decamelize
+
         Args:
             html (str): html字符串
 
@@ -41,29 +121,29 @@ class XiaoHongShuExtractor:
             # 这种情况要么是出了验证码了，要么是笔记不存在
             return None
 
-        state = re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[
-            0
-        ].replace("undefined", '""')
-        if state != "{}":
-            note_dict = humps.decamelize(json.loads(state))
-            return note_dict["note"]["note_detail_map"][note_id]["note"]
-        return None
+        bounds = _locate_state(html)
+        if bounds is None:
+            return None
+        note_detail_map = _decode_subtree(html, bounds, "noteDetailMap", '""')
+        if not isinstance(note_detail_map, dict):
+            return None
+        note_detail = note_detail_map.get(note_id)
+        if not note_detail:
+            return None
+        return humps.decamelize(note_detail).get("note")
 
     def extract_creator_info_from_html(self, html: str) -> Optional[Dict]:
         """从html中提取用户信息
 
+        只解析 user.userPageData 子树
+
         Args:
             html (str): html字符串
 
         Returns:
             Dict: 用户信息字典
         """
-        match = re.search(
-            r"<script>window.__INITIAL_STATE__=(.+)<\/script>", html, re.M
-        )
-        if match is None:
-            return None
-        info = json.loads(match.group(1).replace(":undefined", ":null"), strict=False)
-        if info is None:
+        bounds = _locate_state(html)
+        if bounds is None:
             return None
-        return info.get("user").get("userPageData")
+        return _decode_subtree(html, bounds, "userPageData", "null")
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/media_platform/xhs/note_dedup.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 跨关键词笔记去重：关键词扩展后同一篇热门笔记会在多个关键词下出现，
+# 本次运行已获取过的笔记不再重复请求详情和评论，只补记新的来源关键词
+
+from typing import Dict, List, Optional
+
+from tools import utils
+from tools.bloom_filter import BloomFilter
+
+
+class NoteDedup:
+    """
+    笔记去重
+
+    - 本次运行：记录已领取的笔记ID、来源关键词以及已入库的详情
+    - 历史（可选）：history_path 不为空时，用布隆过滤器记录以往运行已入库的笔记ID，
+      再次出现时直接跳过；存在 error_rate 左右的误判（新笔记被当作已爬取）
+    """
+
+    def __init__(
+        self,
+        history_path: Optional[str] = None,
+        capacity: int = 1_000_000,
+        error_rate: float = 0.001,
+    ):
+        self._history_path = history_path
+        self._history: Optional[BloomFilter] = None
+        if history_path:
+            self._history = BloomFilter.load(history_path, capacity, error_rate)
+        self._keywords: Dict[str, List[str]] = {}
+        self._details: Dict[str, Dict] = {}
+        self.retagged = 0
+        self.history_skipped = 0
+
+    def claim(self, note_id: str, keyword: str) -> bool:
+        """
+        领取笔记
+        Returns:
+            True 表示首次出现，由调用方获取详情；
+            False 表示本次运行已领取过（已记下新的关键词）或历史运行中已爬取过
+        """
+        keywords = self._keywords.get(note_id)
+        if keywords is None:
+            if self._history is not None and note_id in self._history:
+                self.history_skipped += 1
+                utils.logger.info(f"[NoteDedup.claim] Note {note_id} crawled in previous runs, skip")
+                return False
+            self._keywords[note_id] = [keyword]
+            return True
+        if keyword not in keywords:
+            keywords.append(keyword)
+        return False
+
+    def release(self, note_id: str) -> None:
+        """详情获取失败时释放领取，之后其他关键词下再出现时重新获取"""
+        if note_id not in self._details:
+            self._keywords.pop(note_id, None)
+
+    def source_keyword(self, note_id: str) -> str:
+        """笔记在本次运行中出现过的全部关键词，逗号分隔"""
+        return ",".join(self._keywords.get(note_id, []))
+
+    def record(self, note_id: str, note_detail: Dict) -> None:
+        """记录已提交入库的笔记详情"""
+        self._details[note_id] = note_detail
+
+    def mark_stored(self, note_id: str) -> None:
+        """笔记数据已落盘，记入历史"""
+        if self._history is not None:
+            self._history.add(note_id)
+
+    def get_detail(self, note_id: str) -> Optional[Dict]:
+        return self._details.get(note_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "notes": len(self._keywords),
+            "retagged": self.retagged,
+            "history_skipped": self.history_skipped,
+            "history_size": len(self._history) if self._history is not None else 0,
+        }
+
+    def close(self) -> None:
+        if self._history is not None and self._history_path:
+            self._history.save(self._history_path)
+        utils.logger.info(f"[NoteDedup.close] Note dedup stats: {self.stats()}")
@@ -21,12 +21,14 @@
 import hashlib
 import json
 import time
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse, quote
 
 from playwright.async_api import Page
 
-from .xhs_sign import b64_encode, encode_utf8, get_trace_id, mrc
+from tools import jsoncodec
+
+from .xhs_sign import b64_encode, encode_utf8_bytes, get_trace_id, mrc
 
 
 def _build_sign_string(uri: str, data: Optional[Union[Dict, str]] = None, method: str = "POST") -> str:
@@ -45,7 +47,7 @@ def _build_sign_string(uri: str, data: Optional[Union[Dict, str]] = None, method
         c = uri
         if data is not None:
             if isinstance(data, dict):
-                c += json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+                c += jsoncodec.dumps_compact(data)
             elif isinstance(data, str):
                 c += data
         return c
@@ -88,7 +90,7 @@ def _build_xs_payload(x3_value: str, data_type: str = "object") -> str:
         "x3": x3_value,
         "x4": data_type,
     }
-    return "XYS_" + b64_encode(encode_utf8(json.dumps(s, separators=(",", ":"))))
+    return "XYS_" + b64_encode(encode_utf8_bytes(json.dumps(s, separators=(",", ":"))))
 
 
 def _build_xs_common(a1: str, b1: str, x_s: str, x_t: str) -> str:
@@ -109,14 +111,82 @@ def _build_xs_common(a1: str, b1: str, x_s: str, x_t: str) -> str:
         "x10": 154,
         "x11": "normal",
     }
-    return b64_encode(encode_utf8(json.dumps(payload, separators=(",", ":"))))
+    return b64_encode(encode_utf8_bytes(json.dumps(payload, separators=(",", ":"))))
+
+
+# 一次 evaluate 内（按需）读取 b1 并对一批待签名字符串调用 window.mnsv2
+_BATCH_SIGN_JS = """
+([items, readB1]) => {
+    let b1 = null;
+    if (readB1) {
+        try {
+            b1 = window.localStorage.getItem("b1") || "";
+        } catch (e) {
+            b1 = "";
+        }
+    }
+    const signs = items.map(([signStr, md5Str]) => {
+        try {
+            return window.mnsv2(signStr, md5Str) || "";
+        } catch (e) {
+            return "";
+        }
+    });
+    return { b1: b1, signs: signs };
+}
+"""
+
+
+def build_sign_headers(x3_value: str, data: Optional[Union[Dict, str]], a1: str, b1: str) -> Dict[str, Any]:
+    """根据 mnsv2 的返回值组装完整的签名结果
+
+    Args:
+        x3_value: window.mnsv2 返回的签名串
+        data: 请求数据
+        a1: cookie 中的 a1 值
+        b1: localStorage 中的 b1 值
+
+    Returns:
+        包含 x-s, x-t, x-s-common, x-b3-traceid 的字典
+    """
+    data_type = "object" if isinstance(data, (dict, list)) else "string"
+    x_s = _build_xs_payload(x3_value, data_type)
+    x_t = str(int(time.time() * 1000))
+    return {
+        "x-s": x_s,
+        "x-t": x_t,
+        "x-s-common": _build_xs_common(a1, b1, x_s, x_t),
+        "x-b3-traceid": get_trace_id(),
+    }
+
+
+async def batch_call_mnsv2(
+    page: Page,
+    items: List[Tuple[str, str]],
+    read_b1: bool = True,
+) -> Tuple[Optional[str], List[str]]:
+    """
+    一次 playwright 往返完成一批签名
+
+    Args:
+        page: playwright Page 对象
+        items: [(sign_str, md5_str), ...]
+        read_b1: 是否顺带读取 localStorage 中的 b1（已缓存时无需读取）
+
+    Returns:
+        (b1, 与 items 一一对应的 mnsv2 签名列表)，未读取 b1 时为 None，失败时签名为空字符串
+    """
+    result = await page.evaluate(_BATCH_SIGN_JS, [[list(item) for item in items], read_b1])
+    signs = result.get("signs") or []
+    if len(signs) != len(items):
+        signs = list(signs) + [""] * (len(items) - len(signs))
+    return result.get("b1"), signs
 
 
 async def get_b1_from_localstorage(page: Page) -> str:
-    """从 localStorage 获取 b1 值"""
+    """从 localStorage 获取 b1 值（只读取 b1，不拷贝整个 localStorage）"""
     try:
-        local_storage = await page.evaluate("() => window.localStorage")
-        return local_storage.get("b1", "")
+        return await page.evaluate("() => window.localStorage.getItem('b1') || ''")
     except Exception:
         return ""
 
@@ -189,15 +259,9 @@ async def sign_with_playwright(
         包含 x-s, x-t, x-s-common, x-b3-traceid 的字典
     """
     b1 = await get_b1_from_localstorage(page)
-    x_s = await sign_xs_with_playwright(page, uri, data, method)
-    x_t = str(int(time.time() * 1000))
-
-    return {
-        "x-s": x_s,
-        "x-t": x_t,
-        "x-s-common": _build_xs_common(a1, b1, x_s, x_t),
-        "x-b3-traceid": get_trace_id(),
-    }
+    sign_str = _build_sign_string(uri, data, method)
+    x3_value = await call_mnsv2(page, sign_str, _md5_hex(sign_str))
+    return build_sign_headers(x3_value, data, a1, b1)
 
 
 async def pre_headers_with_playwright(
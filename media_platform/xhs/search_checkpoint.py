@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/media_platform/xhs/search_checkpoint.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 搜索模式的断点状态：记录关键词进度、已请求的搜索页（含 search_id）、
+# 已入库的笔记、每篇笔记的评论游标与已入库评论数；续爬时跳过已完成的工作
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from tools import utils
+from tools.checkpoint import CheckpointJournal
+
+
+class SearchCheckpoint:
+    """
+    日志记录类型：
+        keyword_done  {kw}                          关键词的全部搜索页都已处理完
+        page          {kw, page, search_id, notes}  搜索页已请求，notes 为该页需要处理的笔记ID
+        note_stored   {note_id}                     笔记详情已入库
+        comments      {note_id, ids}                一批评论已入库
+        comment_page  {note_id, cursor}             一页评论（含二级评论）已全部入库，cursor 为下一页游标
+        note_done     {note_id}                     笔记的评论已全部处理完
+    """
+
+    def __init__(self, journal: CheckpointJournal, records: Optional[List[Dict[str, Any]]] = None):
+        self.journal = journal
+        self.done_keywords: Set[int] = set()
+        # kw -> page -> (search_id, note_ids)
+        self._pages: Dict[int, Dict[int, Tuple[str, List[str]]]] = {}
+        self.stored_notes: Set[str] = set()
+        self.done_notes: Set[str] = set()
+        # note_id -> 下一页游标
+        self._comment_cursors: Dict[str, str] = {}
+        # note_id -> 已入库评论数
+        self._comment_counts: Dict[str, int] = {}
+        # note_id -> 当前页（最后一次 comment_page 之后）已入库的评论ID，续爬重新请求该页时跳过
+        self._page_comment_ids: Dict[str, Set[str]] = {}
+        for record in records or []:
+            self._apply(record)
+        if records:
+            utils.logger.info(
+                f"[SearchCheckpoint] Resume from {journal.path}, keywords done: {sorted(self.done_keywords)}, "
+                f"notes done: {len(self.done_notes)}, comments stored: {self.comments_collected}"
+            )
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        record_type = record.get("type")
+        if record_type == "keyword_done":
+            self.done_keywords.add(record["kw"])
+        elif record_type == "page":
+            self._pages.setdefault(record["kw"], {})[record["page"]] = (record["search_id"], record["notes"])
+        elif record_type == "note_stored":
+            self.stored_notes.add(record["note_id"])
+        elif record_type == "comments":
+            note_id = record["note_id"]
+            self._comment_counts[note_id] = self._comment_counts.get(note_id, 0) + len(record["ids"])
+            self._page_comment_ids.setdefault(note_id, set()).update(record["ids"])
+        elif record_type == "comment_page":
+            self._comment_cursors[record["note_id"]] = record["cursor"]
+            self._page_comment_ids.pop(record["note_id"], None)
+        elif record_type == "note_done":
+            self.done_notes.add(record["note_id"])
+
+    def resume_page(self, kw: int) -> Optional[Tuple[int, str]]:
+        """
+        关键词需要从哪一页继续：第一个还有笔记未完成的已请求页；
+        已请求页都完成时为最后一页的下一页
+        Returns:
+            (page, search_id)，该关键词还没有请求过任何页面时返回 None
+        """
+        pages = self._pages.get(kw)
+        if not pages:
+            return None
+        for page in sorted(pages):
+            search_id, note_ids = pages[page]
+            if any(note_id not in self.done_notes for note_id in note_ids):
+                return page, search_id
+        last_page = max(pages)
+        return last_page + 1, pages[last_page][0]
+
+    def comment_progress(self, note_id: str) -> Tuple[str, int]:
+        """笔记评论的续爬游标与已入库评论数"""
+        return self._comment_cursors.get(note_id, ""), self._comment_counts.get(note_id, 0)
+
+    def is_comment_stored(self, note_id: str, comment_id: str) -> bool:
+        """评论是否在中断时所在的那一页中已经入库"""
+        return comment_id in self._page_comment_ids.get(note_id, ())
+
+    @property
+    def comments_collected(self) -> int:
+        return sum(self._comment_counts.values())
+
+    def record_page(self, kw: int, page: int, search_id: str, note_ids: List[str]) -> None:
+        self._record("page", kw=kw, page=page, search_id=search_id, notes=note_ids)
+
+    def record_note_stored(self, note_id: str) -> None:
+        self._record("note_stored", note_id=note_id)
+
+    def record_comments(self, note_id: str, comment_ids: List[str]) -> None:
+        self._record("comments", note_id=note_id, ids=comment_ids)
+
+    def record_comment_page(self, note_id: str, cursor: str) -> None:
+        self._record("comment_page", note_id=note_id, cursor=cursor)
+
+    def record_note_done(self, note_id: str) -> None:
+        self._record("note_done", note_id=note_id)
+
+    def record_keyword_done(self, kw: int) -> None:
+        self._record("keyword_done", kw=kw)
+
+    def _record(self, record_type: str, **fields: Any) -> None:
+        self._apply({"type": record_type, **fields})
+        self.journal.append(record_type, **fields)
+
+    def close(self) -> None:
+        self.journal.close()
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/media_platform/xhs/search_pipeline.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 搜索模式流水线：搜索翻页 → 笔记详情 → 笔记入库 → 评论 → 评论入库，
+# 各阶段之间用有界队列连接（背压），每个阶段有独立的并发数，
+# 下一页搜索结果在上一页的评论仍在下载时就开始请求
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import config
+from store import xhs as xhs_store
+from tools import utils
+
+from .exception import DataFetchError
+from .field import SearchSortType
+from .help import get_search_id
+
+if TYPE_CHECKING:
+    from .core import XiaoHongShuCrawler
+
+# 队列结束标记
+_STOP = object()
+
+# 小红书搜索接口每页固定返回的笔记数
+_SEARCH_PAGE_SIZE = 20
+
+# 评论入库队列中的记录类型：评论数据、评论翻页进度、笔记评论处理完成
+_COMMENTS = "comments"
+_PROGRESS = "progress"
+_NOTE_DONE = "note_done"
+
+
+class SearchPipeline:
+    """
+    单个关键词的搜索流水线
+
+    使用方法：
+        await SearchPipeline(crawler, keyword).run()
+
+    开启断点续爬（crawler.checkpoint）时，评论翻页进度和笔记完成状态与评论数据经同一个队列
+    按顺序交给评论入库阶段，确保只有已写入的数据才会记入断点日志
+    """
+
+    def __init__(self, crawler: "XiaoHongShuCrawler", keyword: str, kw_index: int = 0, concurrency_share: int = 1):
+        """
+        Args:
+            crawler: 爬虫实例
+            keyword: 搜索关键词
+            kw_index: 关键词序号，用于断点日志
+            concurrency_share: 同时执行的关键词数，各阶段并发数按此均分，总并发数不变
+        """
+        self.crawler = crawler
+        self.keyword = keyword
+        self.kw_index = kw_index
+        queue_size = max(1, config.XHS_PIPELINE_QUEUE_SIZE)
+        self.detail_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.note_store_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.comment_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.comment_store_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        concurrency_share = max(1, concurrency_share)
+        self.detail_concurrency = max(1, config.XHS_PIPELINE_DETAIL_CONCURRENCY // concurrency_share)
+        self.comment_concurrency = max(1, config.XHS_PIPELINE_COMMENT_CONCURRENCY // concurrency_share)
+        self.pages = 0
+        self.notes = 0
+        # 搜索翻页是否正常结束（到达页数上限或没有更多结果），而不是因为出错或停止而中断
+        self.search_completed = False
+        # 已从评论预算的预留数量中结算（登记或退回）的搜索结果数
+        self.budget_slots = 0
+
+    async def run(self) -> None:
+        tasks: List[asyncio.Task] = []
+        try:
+            search_task = asyncio.create_task(self._search_stage())
+            detail_tasks = [asyncio.create_task(self._detail_stage()) for _ in range(self.detail_concurrency)]
+            note_store_task = asyncio.create_task(self._note_store_stage())
+            comment_semaphore = asyncio.Semaphore(self.comment_concurrency)
+            comment_tasks = [
+                asyncio.create_task(self._comment_stage(comment_semaphore)) for _ in range(self.comment_concurrency)
+            ]
+            comment_store_task = asyncio.create_task(self._comment_store_stage())
+            tasks = [search_task, *detail_tasks, note_store_task, *comment_tasks, comment_store_task]
+
+            # 上游阶段结束后向下游发送结束标记，逐级收尾
+            await search_task
+            await self._close_stage(self.detail_queue, detail_tasks)
+            await self._close_stage(self.note_store_queue, [note_store_task])
+            await self._close_stage(self.comment_queue, comment_tasks)
+            await self._close_stage(self.comment_store_queue, [comment_store_task])
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        utils.logger.info(
+            f"[SearchPipeline.run] Keyword {self.keyword} finished, pages: {self.pages}, notes: {self.notes}"
+        )
+
+    @staticmethod
+    async def _close_stage(queue: asyncio.Queue, workers: List[asyncio.Task]) -> None:
+        for _ in workers:
+            await queue.put(_STOP)
+        await asyncio.gather(*workers)
+
+    @staticmethod
+    async def _consume(queue: asyncio.Queue, handle: Callable[[Any], Awaitable[None]], stage: str) -> None:
+        """从队列中取数据处理直到收到结束标记，单条数据处理失败不影响后续数据"""
+        while True:
+            item = await queue.get()
+            if item is _STOP:
+                return
+            try:
+                await handle(item)
+            except Exception as e:
+                utils.logger.error(f"[SearchPipeline.{stage}] handle item error: {e}")
+
+    def _note_done(self, note_id: str) -> None:
+        """笔记不再需要处理（已完成、跳过或放弃），此前提交的数据落盘后记入断点日志"""
+        checkpoint = self.crawler.checkpoint
+        if checkpoint is not None and not self.crawler.stop_requested:
+            xhs_store.call_after_stored(lambda: checkpoint.record_note_done(note_id))
+
+    async def _search_stage(self) -> None:
+        crawler = self.crawler
+        checkpoint = crawler.checkpoint
+        start_page = config.START_PAGE
+        page = max(1, start_page)
+        search_id = get_search_id()
+        resume = checkpoint.resume_page(self.kw_index) if checkpoint is not None else None
+        if resume is not None:
+            page, search_id = resume
+            utils.logger.info(f"[SearchPipeline._search_stage] Resume keyword {self.keyword} from page {page}")
+        sort = SearchSortType(config.SORT_TYPE) if config.SORT_TYPE != "" else SearchSortType.GENERAL
+        # 本关键词在评论预算中预留了 CRAWLER_MAX_NOTES_COUNT 篇候选笔记，搜索结束时退回没有翻到的部分
+        try:
+            await self._search_pages(page, start_page, search_id, sort)
+        finally:
+            if crawler.comment_budget is not None:
+                crawler.comment_budget.release_expected(config.CRAWLER_MAX_NOTES_COUNT - self.budget_slots)
+
+    async def _search_pages(self, page: int, start_page: int, search_id: str, sort: SearchSortType) -> None:
+        crawler = self.crawler
+        checkpoint = crawler.checkpoint
+        while (page - start_page + 1) * _SEARCH_PAGE_SIZE <= config.CRAWLER_MAX_NOTES_COUNT:
+            if crawler.stop_requested:
+                return
+            try:
+                utils.logger.info(f"[SearchPipeline._search_stage] search xhs keyword: {self.keyword}, page: {page}")
+                notes_res = await crawler.xhs_client.get_note_by_keyword(
+                    keyword=self.keyword,
+                    search_id=search_id,
+                    page=page,
+                    sort=sort,
+                )
+            except DataFetchError:
+                utils.logger.error("[SearchPipeline._search_stage] Get search page error")
+                return
+            utils.logger.info(f"[SearchPipeline._search_stage] Search notes res:{notes_res}")
+            if not notes_res or not notes_res.get("has_more", False):
+                utils.logger.info("No more content!")
+                break
+            self.pages += 1
+            time_window = crawler.time_window
+            post_items = [
+                post_item for post_item in notes_res.get("items", {})
+                if post_item.get("model_type") not in ("rec_query", "hot_query")
+                and not (time_window is not None and time_window.skip_search_item(post_item))
+                and not crawler._is_search_item_unchanged(post_item)
+            ]
+            if checkpoint is not None:
+                checkpoint.record_page(self.kw_index, page, search_id, [p.get("id") for p in post_items])
+                post_items = [p for p in post_items if not await self._resume_item(p)]
+            if crawler.comment_budget is not None:
+                # 整页候选笔记先登记互动量，再开始分配评论预算
+                registered = 0
+                for post_item in post_items:
+                    registered += crawler.comment_budget.register(
+                        post_item.get("id"), (post_item.get("note_card") or {}).get("interact_info")
+                    )
+                # 被过滤、续爬跳过或已在其他关键词下登记的结果，立即退回为它们预留的预算
+                page_items = len(notes_res.get("items") or [])
+                crawler.comment_budget.release_expected(page_items - registered)
+                self.budget_slots += page_items
+            for post_item in post_items:
+                # 队列满时在此等待，下游处理不过来就暂停翻页
+                await self.detail_queue.put(post_item)
+            page += 1
+        self.search_completed = True
+
+    async def _resume_item(self, post_item: Dict) -> bool:
+        """
+        续爬时处理断点中已有进度的笔记：已完成的跳过，详情已入库的直接继续爬评论
+        Returns:
+            是否已处理（不需要再获取详情）
+        """
+        crawler = self.crawler
+        checkpoint = crawler.checkpoint
+        note_id = post_item.get("id")
+        if note_id not in checkpoint.done_notes and note_id not in checkpoint.stored_notes:
+            return False
+        if crawler.note_dedup is not None:
+            crawler.note_dedup.claim(note_id, self.keyword)
+        if note_id in checkpoint.done_notes or not config.ENABLE_GET_COMMENTS:
+            self._note_done(note_id)
+            return True
+        if crawler.watermark_store is not None:
+            # 详情不会再请求，用搜索结果中的互动数据更新水位线
+            crawler._pending_watermarks.setdefault(note_id, post_item.get("note_card") or {})
+        await self.comment_queue.put((note_id, post_item.get("xsec_token")))
+        return True
+
+    async def _detail_stage(self) -> None:
+        semaphore = asyncio.Semaphore(1)
+
+        async def handle(post_item: Dict) -> None:
+            crawler = self.crawler
+            if crawler.stop_requested:
+                return
+            note_id = post_item.get("id")
+            dedup = crawler.note_dedup
+            if dedup is not None and not dedup.claim(note_id, self.keyword):
+                self._discard_budget(note_id)
+                await crawler.retag_seen_note(note_id)
+                self._note_done(note_id)
+                return
+            note_detail = await crawler.get_note_detail_async_task(
+                note_id=note_id,
+                xsec_source=post_item.get("xsec_source"),
+                xsec_token=post_item.get("xsec_token"),
+                semaphore=semaphore,
+            )
+            if note_detail and crawler.time_window is not None and crawler.time_window.skip_note(note_detail):
+                # 不在时间窗口内的笔记不入库，其他关键词下再出现时也不再获取
+                self._discard_budget(note_id)
+                self._note_done(note_id)
+                return
+            if note_detail:
+                await self.note_store_queue.put(note_detail)
+                return
+            self._discard_budget(note_id)
+            if dedup is not None:
+                dedup.release(note_id)
+            self._note_done(note_id)
+
+        await self._consume(self.detail_queue, handle, "_detail_stage")
+
+    def _discard_budget(self, note_id: str) -> None:
+        if self.crawler.comment_budget is not None:
+            self.crawler.comment_budget.discard(note_id)
+
+    async def _note_store_stage(self) -> None:
+        async def handle(note_detail: Dict) -> None:
+            crawler = self.crawler
+            note_id = note_detail.get("note_id")
+            dedup = crawler.note_dedup
+            if dedup is not None:
+                note_detail["source_keyword"] = dedup.source_keyword(note_id)
+                dedup.record(note_id, note_detail)
+            await xhs_store.update_xhs_note(note_detail)
+            if dedup is not None:
+                xhs_store.call_after_stored(lambda: dedup.mark_stored(note_id))
+            checkpoint = crawler.checkpoint
+            if checkpoint is not None:
+                xhs_store.call_after_stored(lambda: checkpoint.record_note_stored(note_id))
+            await crawler.get_notice_media(note_detail)
+            self.notes += 1
+            if config.ENABLE_GET_COMMENTS:
+                await self.comment_queue.put((note_id, note_detail.get("xsec_token")))
+            else:
+                crawler._commit_watermark(note_id)
+                self._note_done(note_id)
+
+        await self._consume(self.note_store_queue, handle, "_note_store_stage")
+
+    async def _comment_stage(self, semaphore: asyncio.Semaphore) -> None:
+        async def on_comments(note_id: str, comments: List[Dict]) -> None:
+            checkpoint = self.crawler.checkpoint
+            if checkpoint is not None:
+                # 续爬时重新请求的中断页中，已入库的评论不再重复入库
+                comments = [c for c in comments if not checkpoint.is_comment_stored(note_id, c.get("id"))]
+            sliced = self.crawler._reserve_comment_quota(comments)
+            if sliced:
+                await self.comment_store_queue.put((_COMMENTS, note_id, sliced))
+
+        async def handle(item: Tuple[str, str]) -> None:
+            note_id, xsec_token = item
+            crawler = self.crawler
+            if crawler.stop_requested:
+                return
+            if not crawler.comments_limit_reached:
+                resume: Optional[Tuple[str, int]] = None
+                on_page_done = None
+                if crawler.checkpoint is not None:
+                    resume = crawler.checkpoint.comment_progress(note_id)
+
+                    async def on_page_done(cursor: str) -> None:
+                        await self.comment_store_queue.put((_PROGRESS, note_id, cursor))
+
+                comments = await crawler.get_comments(
+                    note_id=note_id,
+                    xsec_token=xsec_token,
+                    semaphore=semaphore,
+                    callback=on_comments,
+                    resume=resume,
+                    on_page_done=on_page_done,
+                    commit_watermark=False,
+                )
+            # 评论入库任务处理完此前的评论后再更新水位线、记入断点日志
+            if (crawler.checkpoint is not None or crawler.watermark_store is not None) and not crawler.stop_requested:
+                await self.comment_store_queue.put((_NOTE_DONE, note_id, comments))
+
+        await self._consume(self.comment_queue, handle, "_comment_stage")
+
+    async def _comment_store_stage(self) -> None:
+        checkpoint = self.crawler.checkpoint
+
+        async def handle(item: Tuple[str, str, Any]) -> None:
+            kind, note_id, payload = item
+            if kind == _PROGRESS:
+                xhs_store.call_after_stored(lambda: checkpoint.record_comment_page(note_id, payload))
+            elif kind == _NOTE_DONE:
+                self.crawler._commit_watermark(note_id, payload)
+                self._note_done(note_id)
+            else:
+                await xhs_store.batch_update_xhs_note_comments(note_id, payload)
+                if checkpoint is not None:
+                    comment_ids = [c.get("id") for c in payload]
+                    xhs_store.call_after_stored(lambda: checkpoint.record_comments(note_id, comment_ids))
+
+        await self._consume(self.comment_store_queue, handle, "_comment_store_stage")
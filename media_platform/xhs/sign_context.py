@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/media_platform/xhs/sign_context.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 签名上下文缓存：缓存签名所需的 a1（cookie）与 b1（localStorage），
+# 只在 cookies 更新、登录完成或出现签名相关错误时失效
+
+from typing import Dict, Optional
+
+from tools import utils
+
+
+class XhsSignContext:
+    """
+    签名上下文
+
+    - a1: 来自 cookie，update_cookies 时刷新
+    - b1: 来自页面 localStorage，首次签名时读取，失效后在下一次签名时重新读取
+    """
+
+    def __init__(self, cookie_dict: Optional[Dict[str, str]] = None):
+        self._a1: str = (cookie_dict or {}).get("a1", "")
+        self._b1: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def a1(self) -> str:
+        return self._a1
+
+    def get_b1(self) -> Optional[str]:
+        """
+        获取缓存的 b1，未缓存时返回 None 并计为一次 miss
+        """
+        if self._b1 is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._b1
+
+    def set_b1(self, b1: str) -> None:
+        self._b1 = b1 or ""
+
+    def update_cookies(self, cookie_dict: Dict[str, str]) -> None:
+        """
+        cookies 更新（包括登录完成后）时刷新 a1，并让 b1 重新读取
+        """
+        self._a1 = cookie_dict.get("a1", "")
+        self.invalidate("cookies updated")
+
+    def invalidate(self, reason: str = "") -> None:
+        """
+        使缓存的 b1 失效
+        Args:
+            reason: 失效原因，仅用于日志
+        """
+        self._b1 = None
+        self.invalidations += 1
+        utils.logger.info(f"[XhsSignContext.invalidate] Sign context invalidated, reason: {reason}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
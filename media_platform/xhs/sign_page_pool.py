@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/media_platform/xhs/sign_page_pool.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 签名页面池：在同一个浏览器上下文中预热多个小红书页面用于签名，
+# 签名请求分配给当前最空闲的页面，崩溃或跳转离开的页面会被自动替换
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional, Set
+
+from playwright.async_api import BrowserContext, Page
+
+from tools import utils
+
+# 页面预热完成的判断条件：window.mnsv2 已加载
+_MNSV2_READY_JS = "() => typeof window.mnsv2 === 'function'"
+
+
+class SignPage:
+    """签名页面及其运行统计"""
+
+    def __init__(self, index: int, page: Page):
+        self.index = index
+        self.page = page
+        self.inflight = 0
+        self.total = 0
+        self.failures = 0
+        self.healthy = True
+        self.latencies: Deque[float] = deque(maxlen=200)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.total += 1
+        self.latencies.append(latency)
+        if not ok:
+            self.failures += 1
+
+    def stats(self) -> Dict:
+        samples = sorted(self.latencies)
+        if samples:
+            avg_ms = sum(samples) / len(samples) * 1000
+            p95_ms = samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000
+        else:
+            avg_ms = p95_ms = 0.0
+        return {
+            "index": self.index,
+            "healthy": self.healthy,
+            "inflight": self.inflight,
+            "total": self.total,
+            "failures": self.failures,
+            "avg_latency_ms": round(avg_ms, 2),
+            "p95_latency_ms": round(p95_ms, 2),
+        }
+
+
+class SignPagePool:
+    """
+    签名页面池
+
+    使用方法：
+        pool = SignPagePool(browser_context, size=4, index_url="https://www.xiaohongshu.com")
+        await pool.start()
+        async with pool.acquire() as page:
+            await page.evaluate(...)
+    """
+
+    def __init__(
+        self,
+        browser_context: BrowserContext,
+        size: int,
+        index_url: str,
+        fallback_page: Optional[Page] = None,
+        warmup_timeout_ms: int = 30000,
+        replace_retry_delay: float = 1.0,
+        replace_retry_max_delay: float = 60.0,
+    ):
+        """
+        Args:
+            browser_context: 浏览器上下文，签名页面在此上下文中创建（共享 cookies/localStorage）
+            size: 签名页面数量
+            index_url: 预热时打开的页面地址
+            fallback_page: 所有签名页面都不可用时使用的页面（通常为爬虫主页面）
+            warmup_timeout_ms: 单个页面预热超时时间（毫秒）
+            replace_retry_delay: 替换页面失败后的首次重试等待时间（秒），之后每次翻倍
+            replace_retry_max_delay: 替换页面重试等待时间上限（秒）
+        """
+        self.browser_context = browser_context
+        self.size = max(1, size)
+        self.index_url = index_url
+        self.fallback_page = fallback_page
+        self.warmup_timeout_ms = warmup_timeout_ms
+        self.replace_retry_delay = max(0.0, replace_retry_delay)
+        self.replace_retry_max_delay = max(self.replace_retry_delay, replace_retry_max_delay)
+        self._pages: List[SignPage] = []
+        self._replace_tasks: Set[asyncio.Task] = set()
+        self._closed = False
+        self.replacements = 0
+
+    async def start(self) -> None:
+        """并发创建并预热所有签名页面"""
+        pages = await asyncio.gather(
+            *[self._new_warm_page() for _ in range(self.size)], return_exceptions=True
+        )
+        for page in pages:
+            if isinstance(page, Exception):
+                utils.logger.error(f"[SignPagePool.start] Warm up sign page failed: {page}")
+                continue
+            self._pages.append(SignPage(len(self._pages), page))
+        utils.logger.info(f"[SignPagePool.start] Sign page pool ready, pages: {len(self._pages)}/{self.size}")
+
+    async def _new_warm_page(self) -> Page:
+        page = await self.browser_context.new_page()
+        try:
+            await page.goto(self.index_url, wait_until="domcontentloaded", timeout=self.warmup_timeout_ms)
+            await page.wait_for_function(_MNSV2_READY_JS, timeout=self.warmup_timeout_ms)
+        except Exception:
+            await page.close()
+            raise
+        return page
+
+    def _is_usable(self, sign_page: SignPage) -> bool:
+        """页面已关闭（崩溃）或跳转离开小红书站点时不可用"""
+        if not sign_page.healthy:
+            return False
+        page = sign_page.page
+        if page.is_closed() or not page.url.startswith(self.index_url):
+            sign_page.healthy = False
+            self._schedule_replace(sign_page)
+            return False
+        return True
+
+    def _pick(self) -> Optional[SignPage]:
+        candidates = [p for p in self._pages if self._is_usable(p)]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda p: p.inflight)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Page]:
+        """
+        获取当前最空闲的签名页面，退出上下文时记录本次签名耗时；
+        签名过程中出现异常的页面会被替换
+        """
+        sign_page = self._pick()
+        if sign_page is None:
+            if self.fallback_page is None:
+                raise RuntimeError("[SignPagePool.acquire] no usable sign page")
+            yield self.fallback_page
+            return
+
+        sign_page.inflight += 1
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield sign_page.page
+            ok = True
+        finally:
+            sign_page.inflight -= 1
+            sign_page.record(time.perf_counter() - start, ok)
+            if not ok:
+                self.mark_unhealthy(sign_page.page)
+
+    def mark_unhealthy(self, page: Page) -> None:
+        """将页面标记为不可用并在后台替换（如签名结果异常时调用）"""
+        for sign_page in self._pages:
+            if sign_page.page is page and sign_page.healthy:
+                sign_page.healthy = False
+                self._schedule_replace(sign_page)
+
+    def _schedule_replace(self, sign_page: SignPage) -> None:
+        if self._closed:
+            return
+        task = asyncio.create_task(self._replace(sign_page))
+        self._replace_tasks.add(task)
+        task.add_done_callback(self._replace_tasks.discard)
+
+    async def _replace(self, sign_page: SignPage) -> None:
+        """替换不可用的页面，失败（如网络短暂中断）时退避重试直到成功或页面池关闭"""
+        utils.logger.info(f"[SignPagePool._replace] Replacing sign page {sign_page.index}")
+        old_page = sign_page.page
+        delay = self.replace_retry_delay
+        while True:
+            try:
+                new_page = await self._new_warm_page()
+                break
+            except Exception as e:
+                utils.logger.error(
+                    f"[SignPagePool._replace] Replace sign page {sign_page.index} failed: {e}, retry in {delay:.1f}s"
+                )
+            await asyncio.sleep(delay)
+            delay = min(self.replace_retry_max_delay, delay * 2)
+            if self._closed:
+                return
+        if self._closed:
+            await new_page.close()
+            return
+        sign_page.page = new_page
+        sign_page.healthy = True
+        self.replacements += 1
+        if not old_page.is_closed():
+            try:
+                await old_page.close()
+            except Exception:
+                pass
+
+    def stats(self) -> List[Dict]:
+        """各签名页面的负载与延迟统计"""
+        return [p.stats() for p in self._pages]
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in list(self._replace_tasks):
+            task.cancel()
+        if self._replace_tasks:
+            await asyncio.gather(*self._replace_tasks, return_exceptions=True)
+        utils.logger.info(f"[SignPagePool.close] Sign page stats: {self.stats()}, replacements: {self.replacements}")
+        for sign_page in self._pages:
+            if not sign_page.page.is_closed():
+                try:
+                    await sign_page.page.close()
+                except Exception:
+                    pass
+        self._pages.clear()
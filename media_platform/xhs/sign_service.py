@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/media_platform/xhs/sign_service.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 批量签名服务：在一个很短的时间窗口内收集并发的签名请求，
+# 通过一次 page.evaluate 对整批请求调用 window.mnsv2，结果分发回各自的 future
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from playwright.async_api import Page
+
+from tools import utils
+
+from .exception import SignError
+from .playwright_sign import _build_sign_string, _md5_hex, batch_call_mnsv2, build_sign_headers
+from .sign_context import XhsSignContext
+from .sign_page_pool import SignPagePool
+
+# (sign_str, md5_str, need_b1, future)
+_PendingSign = Tuple[str, str, bool, "asyncio.Future[Tuple[str, Optional[str]]]"]
+
+
+class PlaywrightSignService:
+    """
+    批量签名服务
+
+    并发场景下（MAX_CONCURRENCY_NUM > 1）多个签名请求会在 batch_window_ms 内合并，
+    只占用一次 playwright 往返；单个请求最多只会多等待一个时间窗口。
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        batch_window_ms: float = 5,
+        max_batch_size: int = 16,
+        sign_context: Optional[XhsSignContext] = None,
+        page_pool: Optional[SignPagePool] = None,
+    ):
+        """
+        Args:
+            page: playwright Page 对象（必须已打开小红书页面）
+            batch_window_ms: 收集签名请求的时间窗口（毫秒）
+            max_batch_size: 单批最大签名数量，达到后立即发送
+            sign_context: 签名上下文缓存（a1/b1），为空时新建
+            page_pool: 签名页面池，设置后每一批签名分配给最空闲的页面，否则全部使用 page
+        """
+        self.page = page
+        self.page_pool = page_pool
+        self.sign_context = sign_context or XhsSignContext()
+        self._batch_window = max(0.0, batch_window_ms) / 1000
+        self._max_batch_size = max(1, max_batch_size)
+        self._pending: List[_PendingSign] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+
+    async def sign(
+        self,
+        uri: str,
+        data: Optional[Union[Dict, str]] = None,
+        a1: Optional[str] = None,
+        method: str = "POST",
+    ) -> Dict[str, Any]:
+        """
+        生成完整的签名请求头
+
+        Args:
+            uri: API 路径
+            data: 请求数据（GET 的 params 或 POST 的 payload）
+            a1: cookie 中的 a1 值，为空时使用签名上下文中缓存的 a1
+            method: 请求方法 (GET 或 POST)
+
+        Returns:
+            包含 x-s, x-t, x-s-common, x-b3-traceid 的字典
+
+        Raises:
+            SignError: 所在批次的 page.evaluate 失败
+        """
+        sign_str = _build_sign_string(uri, data, method)
+        cached_b1 = self.sign_context.get_b1()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._enqueue((sign_str, _md5_hex(sign_str), cached_b1 is None, future))
+        x3_value, batch_b1 = await future
+        b1 = cached_b1 if cached_b1 is not None else (batch_b1 or "")
+        if a1 is None:
+            a1 = self.sign_context.a1
+        return build_sign_headers(x3_value, data, a1, b1)
+
+    def _enqueue(self, item: _PendingSign) -> None:
+        self._pending.append(item)
+        if len(self._pending) >= self._max_batch_size:
+            self._flush_now()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self._batch_window, self._flush_now)
+
+    def _flush_now(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._sign_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _sign_batch(self, batch: List[_PendingSign]) -> None:
+        read_b1 = any(need_b1 for _, _, need_b1, _ in batch)
+        items = [(s, m) for s, m, _, _ in batch]
+        try:
+            if self.page_pool is None:
+                b1, signs = await batch_call_mnsv2(self.page, items, read_b1=read_b1)
+            else:
+                async with self.page_pool.acquire() as page:
+                    b1, signs = await batch_call_mnsv2(page, items, read_b1=read_b1)
+                    if not any(signs):
+                        # window.mnsv2 不可用（如页面跳转到了验证页），替换该页面
+                        self.page_pool.mark_unhealthy(page)
+            if b1 is not None:
+                self.sign_context.set_b1(b1)
+        except Exception as e:
+            utils.logger.error(f"[PlaywrightSignService._sign_batch] batch sign failed, size: {len(batch)}, err: {e}")
+            # 整批签名失败，批内所有请求都失败，不再带着空签名发出请求
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(SignError(f"batch sign failed: {e}"))
+            return
+        for (_, _, _, future), x3_value in zip(batch, signs):
+            if not future.done():
+                future.set_result((x3_value, b1))
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/media_platform/xhs/time_window.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 爬取时间窗口（--since/--until）：搜索结果阶段丢弃发布时间不在窗口内的笔记，
+# 评论按时间倒序返回时，整页评论都早于窗口起点即停止翻页，并统计因此省下的请求数
+
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import config
+from tools import utils
+from tools.time_util import get_time_str_from_unix_time, parse_time_bound
+
+_RELATIVE_RE = re.compile(r"^(\d+)\s*(分钟|小时|天)前")
+_DAY_OFFSETS = {"今天": 0, "昨天": 1, "前天": 2}
+_CLOCK_RE = re.compile(r"(\d{1,2}):(\d{2})")
+_FULL_DATE_RE = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})")
+_SHORT_DATE_RE = re.compile(r"^(\d{1,2})-(\d{1,2})")
+
+
+def parse_publish_time_text(text: str, now: Optional[datetime] = None) -> Optional[int]:
+    """
+    解析搜索结果中笔记的发布时间文案 ==> 13 位时间戳
+    支持：刚刚、N分钟前、N小时前、N天前、今天/昨天/前天 HH:MM、MM-DD、YYYY-MM-DD（后面可带 IP 属地）
+    Returns:
+        无法识别时返回 None
+    """
+    text = (text or "").strip()
+    if not text:
+        return None
+    now = now or datetime.now()
+    if text.startswith("刚刚"):
+        return int(now.timestamp() * 1000)
+    match = _RELATIVE_RE.match(text)
+    if match:
+        value, unit = int(match.group(1)), match.group(2)
+        delta = {"分钟": timedelta(minutes=value), "小时": timedelta(hours=value), "天": timedelta(days=value)}[unit]
+        return int((now - delta).timestamp() * 1000)
+    for prefix, days in _DAY_OFFSETS.items():
+        if text.startswith(prefix):
+            dt = now - timedelta(days=days)
+            clock = _CLOCK_RE.search(text)
+            if clock:
+                dt = dt.replace(hour=int(clock.group(1)), minute=int(clock.group(2)), second=0, microsecond=0)
+            return int(dt.timestamp() * 1000)
+    try:
+        match = _FULL_DATE_RE.match(text)
+        if match:
+            return int(datetime(*map(int, match.groups())).timestamp() * 1000)
+        match = _SHORT_DATE_RE.match(text)
+        if match:
+            # 今年的笔记只显示月-日
+            return int(datetime(now.year, int(match.group(1)), int(match.group(2))).timestamp() * 1000)
+    except ValueError:
+        return None
+    return None
+
+
+def search_item_publish_time(post_item: Dict) -> Optional[int]:
+    """搜索结果中笔记卡片角标上的发布时间"""
+    note_card = post_item.get("note_card") or {}
+    for tag in note_card.get("corner_tag_info") or []:
+        if tag.get("type") == "publish_time":
+            return parse_publish_time_text(tag.get("text", ""))
+    return None
+
+
+def _to_ms(value: Any) -> Optional[int]:
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    if value <= 0:
+        return None
+    # 秒级时间戳转为毫秒
+    return value * 1000 if value < 10 ** 12 else value
+
+
+class CommentCutoff:
+    """
+    单篇笔记评论翻页的时间截断
+
+    只有已请求到的评论 create_time 一直是非递增（按时间倒序）时才认为可以安全截断：
+    此时整页评论都早于窗口起点，后续页面只会更早
+    """
+
+    def __init__(self, window: "NoteTimeWindow"):
+        self._window = window
+        self._ordered = True
+        self._last_time: Optional[int] = None
+
+    def filter(self, comments: List[Dict]) -> List[Dict]:
+        """去掉不在时间窗口内的评论，没有 create_time 的评论保留"""
+        result = []
+        for comment in comments:
+            create_time = _to_ms(comment.get("create_time"))
+            if create_time is None or self._window.contains(create_time):
+                result.append(comment)
+        return result
+
+    def should_stop(self, comments: List[Dict], has_more: bool) -> bool:
+        """根据本页（未过滤的）评论判断是否停止翻页"""
+        if self._window.since is None or not comments:
+            return False
+        times = [t for t in (_to_ms(c.get("create_time")) for c in comments) if t is not None]
+        if not times:
+            return False
+        for create_time in times:
+            if self._last_time is not None and create_time > self._last_time:
+                self._ordered = False
+            self._last_time = create_time
+        if not self._ordered or max(times) >= self._window.since:
+            return False
+        if has_more:
+            self._window.saved_requests += 1
+            self._window.cut_comment_pages += 1
+        return True
+
+
+class NoteTimeWindow:
+    """
+    笔记/评论时间窗口 [since, until]，两端为 13 位时间戳，None 表示不限制
+    """
+
+    def __init__(self, since: Optional[int] = None, until: Optional[int] = None):
+        self.since = since
+        self.until = until
+        self.dropped_notes = 0
+        self.cut_comment_pages = 0
+        self.saved_requests = 0
+
+    @classmethod
+    def from_config(cls) -> Optional["NoteTimeWindow"]:
+        """根据 CRAWL_SINCE/CRAWL_UNTIL 创建，两者都为空时返回 None"""
+        since = parse_time_bound(config.CRAWL_SINCE)
+        until = parse_time_bound(config.CRAWL_UNTIL, end_of_day=True)
+        if since is None and until is None:
+            return None
+        return cls(since, until)
+
+    def contains(self, ts_ms: int) -> bool:
+        if self.since is not None and ts_ms < self.since:
+            return False
+        if self.until is not None and ts_ms > self.until:
+            return False
+        return True
+
+    def _drop(self, note_id: str, publish_time: int, saved: int) -> bool:
+        self.dropped_notes += 1
+        self.saved_requests += saved
+        utils.logger.info(
+            f"[NoteTimeWindow] Note {note_id} published at {get_time_str_from_unix_time(publish_time)} "
+            f"is out of time window, skip"
+        )
+        return True
+
+    def skip_search_item(self, post_item: Dict) -> bool:
+        """搜索结果阶段：发布时间可识别且不在窗口内时丢弃，省下详情请求以及至少一次评论请求"""
+        publish_time = search_item_publish_time(post_item)
+        if publish_time is None or self.contains(publish_time):
+            return False
+        return self._drop(post_item.get("id"), publish_time, 1 + int(config.ENABLE_GET_COMMENTS))
+
+    def skip_note(self, note_detail: Dict) -> bool:
+        """详情阶段：搜索结果中没有发布时间的笔记按详情中的 time 判断，省下至少一次评论请求"""
+        publish_time = _to_ms(note_detail.get("time"))
+        if publish_time is None or self.contains(publish_time):
+            return False
+        return self._drop(note_detail.get("note_id"), publish_time, int(config.ENABLE_GET_COMMENTS))
+
+    def comment_cutoff(self) -> CommentCutoff:
+        return CommentCutoff(self)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "dropped_notes": self.dropped_notes,
+            "cut_comment_pages": self.cut_comment_pages,
+            "saved_requests": self.saved_requests,
+        }
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/media_platform/xhs/watermark_store.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 增量爬取状态存储：在本地 SQLite 中记录每篇笔记的水位线
+# （最后更新时间、评论数、最新评论时间、已爬取的评论ID），下次运行时跳过没有变化的笔记
+
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from model.m_xiaohongshu import NoteWatermark
+from tools import utils
+
+_COUNT_RE = re.compile(r"^([\d.]+)\s*([万wW千kK]?)\+?$")
+_COUNT_UNITS = {"万": 10000, "w": 10000, "W": 10000, "千": 1000, "k": 1000, "K": 1000, "": 1}
+
+
+def parse_count(value: Any) -> Optional[int]:
+    """
+    解析小红书接口返回的计数，如 "12"、"1.2万"、"10+"
+    Returns:
+        计数，无法解析时返回 None
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _COUNT_RE.match(str(value).strip())
+    if not match:
+        return None
+    try:
+        return int(float(match.group(1)) * _COUNT_UNITS[match.group(2)])
+    except ValueError:
+        return None
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class NoteWatermarkStore:
+    """
+    笔记水位线存储
+
+    使用方法：
+        store = NoteWatermarkStore("data/xhs/state/note_watermarks.db")
+        watermark = store.get(note_id)
+        if store.is_unchanged(watermark, note_detail):
+            ...  # 跳过该笔记
+        store.commit(note_id, note_detail, comments)
+    """
+
+    def __init__(self, db_path: str, max_seen_ids: int = 500):
+        """
+        Args:
+            db_path: 数据库文件路径，目录不存在时自动创建
+            max_seen_ids: 每篇笔记最多保留的已爬取评论ID数量（保留最新的）
+        """
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.max_seen_ids = max(0, max_seen_ids)
+        self._conn = sqlite3.connect(db_path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS note_watermark ("
+            "note_id TEXT PRIMARY KEY, last_update_time INTEGER NOT NULL, comment_count INTEGER NOT NULL, "
+            "newest_comment_time INTEGER NOT NULL, seen_comment_ids TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.skipped_notes = 0
+
+    def get(self, note_id: str) -> Optional[NoteWatermark]:
+        row = self._conn.execute(
+            "SELECT last_update_time, comment_count, newest_comment_time, seen_comment_ids "
+            "FROM note_watermark WHERE note_id = ?",
+            (note_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return NoteWatermark(
+            note_id=note_id,
+            last_update_time=row[0],
+            comment_count=row[1],
+            newest_comment_time=row[2],
+            seen_comment_ids=json.loads(row[3]),
+        )
+
+    def save(self, watermark: NoteWatermark) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO note_watermark "
+            "(note_id, last_update_time, comment_count, newest_comment_time, seen_comment_ids, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                watermark.note_id,
+                watermark.last_update_time,
+                watermark.comment_count,
+                watermark.newest_comment_time,
+                json.dumps(watermark.seen_comment_ids[: self.max_seen_ids]),
+                time.time(),
+            ),
+        )
+
+    def is_unchanged(
+        self,
+        watermark: Optional[NoteWatermark],
+        comment_count: Any,
+        last_update_time: Any = None,
+    ) -> bool:
+        """
+        判断笔记自上次爬取以来是否没有变化
+        Args:
+            watermark: 上次记录的水位线
+            comment_count: 当前评论数（接口原始值）
+            last_update_time: 当前最后更新时间，None 表示未知（如搜索结果中没有该字段）
+
+        Returns:
+            bool: 评论数（及已知的最后更新时间）都没有变化时返回 True
+        """
+        if watermark is None:
+            return False
+        count = parse_count(comment_count)
+        if count is None or count != watermark.comment_count:
+            return False
+        if last_update_time is not None and _to_int(last_update_time) != watermark.last_update_time:
+            return False
+        return True
+
+    def commit(self, note_id: str, note_detail: Dict, comments: Optional[Iterable[Dict]] = None) -> NoteWatermark:
+        """
+        笔记（及其评论）爬取完成后更新水位线
+        Args:
+            note_id: 笔记ID
+            note_detail: 笔记详情
+            comments: 本次爬取到的评论，只有一级评论会记入已爬取ID
+
+        Returns:
+            更新后的水位线
+        """
+        old = self.get(note_id)
+        interact_info = note_detail.get("interact_info") or {}
+        roots: List[Dict] = [c for c in (comments or []) if c.get("id") and not c.get("target_comment")]
+        roots.sort(key=lambda c: _to_int(c.get("create_time")), reverse=True)
+        seen_ids = [c["id"] for c in roots]
+        newest_comment_time = _to_int(roots[0].get("create_time")) if roots else 0
+        if old is not None:
+            known = set(seen_ids)
+            seen_ids.extend(i for i in old.seen_comment_ids if i not in known)
+            newest_comment_time = max(newest_comment_time, old.newest_comment_time)
+        watermark = NoteWatermark(
+            note_id=note_id,
+            last_update_time=_to_int(note_detail.get("last_update_time")),
+            comment_count=parse_count(interact_info.get("comment_count")) or 0,
+            newest_comment_time=newest_comment_time,
+            seen_comment_ids=seen_ids[: self.max_seen_ids],
+        )
+        self.save(watermark)
+        return watermark
+
+    def close(self) -> None:
+        utils.logger.info(f"[NoteWatermarkStore.close] Incremental crawl skipped notes: {self.skipped_notes}")
+        self._conn.close()
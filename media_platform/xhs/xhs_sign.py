@@ -19,8 +19,11 @@
 # 小红书签名算法核心函数
 # 用于 playwright 注入方式生成签名
 
+import base64
 import ctypes
 import random
+import zlib
+from typing import Union
 from urllib.parse import quote
 
 # 自定义 Base64 字符表
@@ -83,12 +86,62 @@ def _right_shift_unsigned(num: int, bit: int = 0) -> int:
     return (val + (MAX32INT + 1)) % (2 * (MAX32INT + 1)) - MAX32INT - 1
 
 
+# ---------------------------------------------------------------------------
+# 快速实现：借助 zlib / base64 标准库（C 实现）完成计算，结果与下方的参考实现逐位一致，
+# 由 test/test_xhs_sign.py 的黄金向量保证
+# ---------------------------------------------------------------------------
+
+_MRC_PREFIX_LEN = 57
+_MRC_XOR = 3988292384
+
+# 标准 Base64 字符表 -> 小红书字符表，填充符 "=" 不变
+_B64_TRANSLATE = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/",
+    "".join(BASE64_CHARS),
+)
+
+
 def mrc(e: str) -> int:
     """CRC32 变体，用于 x-s-common 的 x9 字段"""
+    head = e[:_MRC_PREFIX_LEN]
+    try:
+        data = head.encode("latin-1")
+    except UnicodeEncodeError:
+        # 码点超过 255 时原算法会越界，交给参考实现保持相同的行为
+        return _mrc_reference(e)
+    if not data:
+        # 空串时寄存器保持初始值 -1
+        return _MRC_XOR
+    # zlib.crc32 = 寄存器 ^ 0xFFFFFFFF，还原出与参考实现相同的寄存器值
+    register = zlib.crc32(data) ^ 0xFFFFFFFF
+    return register ^ -1 ^ _MRC_XOR
+
+
+def encode_utf8_bytes(s: str) -> bytes:
+    """将字符串编码为 UTF-8 字节"""
+    return s.encode("utf-8")
+
+
+def encode_utf8(s: str) -> list:
+    """将字符串编码为 UTF-8 字节列表"""
+    return list(s.encode("utf-8"))
+
+
+def b64_encode(data: Union[bytes, bytearray, list]) -> str:
+    """自定义 Base64 编码，data 可以是字节串或字节列表"""
+    return base64.b64encode(bytes(data)).decode("ascii").translate(_B64_TRANSLATE)
+
+
+# ---------------------------------------------------------------------------
+# 参考实现：逐字节移植自 JS 的原始版本，仅用于校验与基准测试
+# ---------------------------------------------------------------------------
+
+
+def _mrc_reference(e: str) -> int:
     o = -1
-    for n in range(min(57, len(e))):
+    for n in range(min(_MRC_PREFIX_LEN, len(e))):
         o = CRC32_TABLE[(o & 255) ^ ord(e[n])] ^ _right_shift_unsigned(o, 8)
-    return o ^ -1 ^ 3988292384
+    return o ^ -1 ^ _MRC_XOR
 
 
 def _triplet_to_base64(e: int) -> str:
@@ -110,8 +163,7 @@ def _encode_chunk(data: list, start: int, end: int) -> str:
     return "".join(result)
 
 
-def encode_utf8(s: str) -> list:
-    """将字符串编码为 UTF-8 字节列表"""
+def _encode_utf8_reference(s: str) -> list:
     encoded = quote(s, safe="~()*!.'")
     result = []
     i = 0
@@ -125,8 +177,7 @@ def encode_utf8(s: str) -> list:
     return result
 
 
-def b64_encode(data: list) -> str:
-    """自定义 Base64 编码"""
+def _b64_encode_reference(data: list) -> str:
     length = len(data)
     remainder = length % 3
     chunks = []
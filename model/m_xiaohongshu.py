@@ -20,6 +20,7 @@
 
 # -*- coding: utf-8 -*-
 
+from typing import List
 
 from pydantic import BaseModel, Field
 
@@ -35,3 +36,12 @@ class CreatorUrlInfo(BaseModel):
     user_id: str = Field(title="user id (creator id)")
     xsec_token: str = Field(default="", title="xsec token")
     xsec_source: str = Field(default="", title="xsec source")
+
+
+class NoteWatermark(BaseModel):
+    """小红书笔记增量爬取水位线"""
+    note_id: str = Field(title="note id")
+    last_update_time: int = Field(default=0, title="笔记最后更新时间(毫秒)")
+    comment_count: int = Field(default=0, title="笔记评论数")
+    newest_comment_time: int = Field(default=0, title="已爬取的最新一级评论时间(毫秒)")
+    seen_comment_ids: List[str] = Field(default_factory=list, title="已爬取的一级评论ID，按时间倒序")
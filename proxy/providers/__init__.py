@@ -24,4 +24,5 @@
 # @Desc    :
 from .jishu_http_proxy import new_jisu_http_proxy
 from .kuaidl_proxy import new_kuai_daili_proxy
+from .local_proxy import new_local_proxy
 from .wandou_http_proxy import new_wandou_http_proxy
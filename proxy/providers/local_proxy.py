@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/proxy/providers/local_proxy.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 本地代理实现：在 127.0.0.1 上启动进程内的 HTTP 代理（CONNECT 隧道 + 普通 HTTP 转发），
+#            延迟、失败率和有效期可配置，用于离线测试和调优代理相关代码，不需要付费代理服务
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import config
+from proxy import IpInfoModel, ProxyProvider
+from tools import utils
+
+_LOOPBACK = "127.0.0.1"
+_PIPE_CHUNK = 64 * 1024
+# 转发请求时不传给上游的逐跳请求头
+_HOP_HEADERS = {"proxy-connection", "proxy-authorization", "keep-alive"}
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """读取请求/响应头（到空行为止），连接关闭时返回 None"""
+    try:
+        return await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        return None
+
+
+def _parse_head(head: bytes) -> Tuple[str, List[Tuple[str, str]]]:
+    lines = head.decode("latin-1").split("\r\n")
+    headers = []
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, _, value = line.partition(":")
+        headers.append((name.strip(), value.strip()))
+    return lines[0], headers
+
+
+def _header(headers: List[Tuple[str, str]], name: str) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while data := await reader.read(_PIPE_CHUNK):
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        try:
+            if writer.can_write_eof():
+                writer.write_eof()
+        except (OSError, RuntimeError):
+            pass
+
+
+def _close_writer(writer: Optional[asyncio.StreamWriter]) -> None:
+    if writer is not None and not writer.is_closing():
+        writer.close()
+
+
+class LocalProxyServer:
+    """
+    单个本地 HTTP 代理
+
+    - CONNECT 请求建立 TCP 隧道（https 目标）
+    - 绝对 URI 的普通请求按请求逐个转发（http 目标），上游连接在同一客户端连接内复用；
+      上游响应需要带 Content-Length，否则读到上游关闭连接为止
+    - 每个请求（隧道只在建立时）先等待 latency ± latency_jitter 秒，再以 failure_rate 的概率直接断开连接
+    - 过期后新的请求一律断开连接，模拟代理商回收 IP
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        expired_time_ts: Optional[int] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.latency = max(0.0, latency)
+        self.latency_jitter = max(0.0, latency_jitter)
+        self.failure_rate = min(1.0, max(0.0, failure_rate))
+        self.expired_time_ts = expired_time_ts
+        self.port = 0
+        self.requests = 0
+        self.failures = 0
+        self.tunnels = 0
+        self._rng = rng or random.Random()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._handlers: Set[asyncio.Task] = set()
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, _LOOPBACK, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    def is_expired(self) -> bool:
+        return self.expired_time_ts is not None and time.time() >= self.expired_time_ts
+
+    async def close(self) -> None:
+        """停止监听并断开所有连接（包括进行中的隧道）"""
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._writers):
+            _close_writer(writer)
+        # 连接关闭后处理协程读到 EOF 自行退出
+        if self._handlers:
+            _, pending = await asyncio.wait(self._handlers, timeout=1)
+            for task in pending:
+                task.cancel()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _delay(self) -> None:
+        delay = self.latency
+        if self.latency_jitter:
+            delay += self._rng.uniform(-self.latency_jitter, self.latency_jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        self._writers.add(writer)
+        upstream: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        upstream_addr: Optional[Tuple[str, int]] = None
+        try:
+            while True:
+                head = await _read_head(reader)
+                if head is None or self.is_expired():
+                    return
+                await self._delay()
+                self.requests += 1
+                if self._rng.random() < self.failure_rate:
+                    self.failures += 1
+                    return
+                request_line, headers = _parse_head(head)
+                method, target, version = request_line.split(" ", 2)
+
+                if method.upper() == "CONNECT":
+                    host, _, port = target.rpartition(":")
+                    up_reader, up_writer = await asyncio.open_connection(host, int(port))
+                    self._writers.add(up_writer)
+                    writer.write(b"HTTP/1.1 200 Connection established\r\n\r\n")
+                    await writer.drain()
+                    self.tunnels += 1
+                    try:
+                        await asyncio.gather(_pipe(reader, up_writer), _pipe(up_reader, writer))
+                    finally:
+                        self._writers.discard(up_writer)
+                        _close_writer(up_writer)
+                    return
+
+                body = b""
+                content_length = _header(headers, "content-length")
+                if content_length:
+                    body = await reader.readexactly(int(content_length))
+                url = urlsplit(target)
+                addr = (url.hostname or _LOOPBACK, url.port or 80)
+                if upstream is None or upstream_addr != addr or upstream[1].is_closing():
+                    if upstream is not None:
+                        _close_writer(upstream[1])
+                    upstream = await asyncio.open_connection(*addr)
+                    upstream_addr = addr
+                path = url.path or "/"
+                if url.query:
+                    path = f"{path}?{url.query}"
+                lines = [f"{method} {path} {version}"]
+                lines += [f"{k}: {v}" for k, v in headers if k.lower() not in _HOP_HEADERS]
+                upstream[1].write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+                await upstream[1].drain()
+
+                response_head = await _read_head(upstream[0])
+                if response_head is None:
+                    return
+                _, response_headers = _parse_head(response_head)
+                response_length = _header(response_headers, "content-length")
+                if response_length is not None:
+                    response_body = await upstream[0].readexactly(int(response_length))
+                else:
+                    response_body = await upstream[0].read()
+                writer.write(response_head + response_body)
+                await writer.drain()
+                if response_length is None or (_header(response_headers, "connection") or "").lower() == "close":
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError, OSError, ValueError):
+            pass
+        finally:
+            if upstream is not None:
+                _close_writer(upstream[1])
+            self._writers.discard(writer)
+            self._handlers.discard(task)
+            _close_writer(writer)
+
+
+class LocalProxyProvider(ProxyProvider):
+    """
+    本地代理提供商：每次提取都在 127.0.0.1 上新启动 num 个代理，已过期的代理在下次提取时停止
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        ttl_seconds: Optional[int] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            latency: 代理为每个请求增加的延迟（秒）
+            latency_jitter: 延迟的随机抖动范围（秒）
+            failure_rate: 请求被代理直接断开的概率
+            ttl_seconds: 代理有效期（秒），为空表示不过期
+            seed: 随机种子，便于复现
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.failure_rate = failure_rate
+        self.ttl_seconds = ttl_seconds
+        self._rng = random.Random(seed)
+        self._servers: Dict[int, LocalProxyServer] = {}
+        self.started = 0
+        self.stopped = 0
+        # 已停止代理的累计请求统计
+        self._stopped_counts = {"requests": 0, "failures": 0, "tunnels": 0}
+
+    async def get_proxy(self, num: int) -> List[IpInfoModel]:
+        """
+        :param num: 提取的 IP 数量
+        :return:
+        """
+        for port, server in list(self._servers.items()):
+            if server.is_expired():
+                await self.stop_proxy(port)
+        ip_infos = []
+        for _ in range(num):
+            expired_time_ts = int(time.time()) + self.ttl_seconds if self.ttl_seconds else None
+            server = LocalProxyServer(
+                latency=self.latency,
+                latency_jitter=self.latency_jitter,
+                failure_rate=self.failure_rate,
+                expired_time_ts=expired_time_ts,
+                rng=random.Random(self._rng.random()),
+            )
+            port = await server.start()
+            self._servers[port] = server
+            self.started += 1
+            ip_infos.append(
+                IpInfoModel(
+                    ip=_LOOPBACK,
+                    port=port,
+                    user="",
+                    password="",
+                    protocol="http://",
+                    expired_time_ts=expired_time_ts,
+                )
+            )
+        utils.logger.info(f"[LocalProxyProvider.get_proxy] Started {num} local proxies, running: {len(self._servers)}")
+        return ip_infos
+
+    async def stop_proxy(self, port: int) -> None:
+        """
+        停止某个本地代理，进行中的连接同时断开，可用来模拟代理突然失效
+        :param port: 代理端口
+        """
+        server = self._servers.pop(port, None)
+        if server is None:
+            return
+        await server.close()
+        self.stopped += 1
+        self._stopped_counts["requests"] += server.requests
+        self._stopped_counts["failures"] += server.failures
+        self._stopped_counts["tunnels"] += server.tunnels
+
+    def stats(self) -> Dict:
+        servers = list(self._servers.values())
+        return {
+            "started": self.started,
+            "stopped": self.stopped,
+            "running": len(servers),
+            "requests": self._stopped_counts["requests"] + sum(s.requests for s in servers),
+            "failures": self._stopped_counts["failures"] + sum(s.failures for s in servers),
+            "tunnels": self._stopped_counts["tunnels"] + sum(s.tunnels for s in servers),
+        }
+
+    async def close(self) -> None:
+        for port in list(self._servers):
+            await self.stop_proxy(port)
+
+
+def new_local_proxy() -> LocalProxyProvider:
+    """
+    构造本地代理实例，参数来自 config 中的 LOCAL_PROXY_* 配置
+    Returns:
+
+    """
+    return LocalProxyProvider(
+        latency=config.LOCAL_PROXY_LATENCY_MS / 1000,
+        latency_jitter=config.LOCAL_PROXY_LATENCY_JITTER_MS / 1000,
+        failure_rate=config.LOCAL_PROXY_FAILURE_RATE,
+        ttl_seconds=config.LOCAL_PROXY_TTL_SEC or None,
+    )
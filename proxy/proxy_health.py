@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 代理健康度统计与按权重 O(1) 抽样
+
+import random
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from .types import IpInfoModel
+
+
+def proxy_key(proxy: IpInfoModel) -> str:
+    return f"{proxy.ip}:{proxy.port}"
+
+
+def proxy_url(proxy: IpInfoModel) -> str:
+    """httpx 代理URL"""
+    if proxy.user and proxy.password:
+        return f"http://{proxy.user}:{proxy.password}@{proxy.ip}:{proxy.port}"
+    return f"http://{proxy.ip}:{proxy.port}"
+
+
+class ProxyHealth:
+    """
+    单个代理的滚动健康度：最近 window 次请求（含校验）的成功率、延迟分位数和最近一次错误
+    """
+
+    def __init__(self, proxy: IpInfoModel, window: int = 50):
+        self.proxy = proxy
+        self.key = proxy_key(proxy)
+        # (是否成功, 耗时秒)
+        self._samples: Deque[Tuple[bool, float]] = deque(maxlen=max(1, window))
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+
+    def record_success(self, latency: float) -> None:
+        self._samples.append((True, latency))
+        self.consecutive_failures = 0
+
+    def record_failure(self, error: str) -> None:
+        self._samples.append((False, 0.0))
+        self.consecutive_failures += 1
+        self.last_error = error
+
+    @property
+    def success_rate(self) -> float:
+        """成功率，使用拉普拉斯平滑，没有样本时为 0.5"""
+        successes = sum(1 for ok, _ in self._samples if ok)
+        return (successes + 1) / (len(self._samples) + 2)
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        latencies = sorted(latency for ok, latency in self._samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+
+    def weight(self) -> float:
+        """抽样权重：成功率越高、p50 延迟越低权重越大"""
+        p50 = self.latency_percentile(0.5)
+        return self.success_rate / max(p50 if p50 is not None else 1.0, 0.05)
+
+    def stats(self) -> Dict:
+        p50 = self.latency_percentile(0.5)
+        p95 = self.latency_percentile(0.95)
+        return {
+            "proxy": self.key,
+            "samples": len(self._samples),
+            "success_rate": round(self.success_rate, 3),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
+
+
+class WeightedPicker:
+    """
+    Walker 别名表：构建 O(n)，每次按权重抽样 O(1)。代理集合或权重变化时重新构建
+    """
+
+    def __init__(self, items: Sequence, weights: Sequence[float]):
+        self.items = list(items)
+        n = len(self.items)
+        self._prob: List[float] = [1.0] * n
+        self._alias: List[int] = list(range(n))
+        total = sum(weights)
+        if n == 0 or total <= 0:
+            return
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, g = small.pop(), large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = g
+            scaled[g] -= 1.0 - scaled[s]
+            (small if scaled[g] < 1.0 else large).append(g)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def pick(self):
+        if not self.items:
+            return None
+        i = random.randrange(len(self.items))
+        return self.items[i] if random.random() < self._prob[i] else self.items[self._alias[i]]
@@ -21,41 +21,93 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2023/12/2 13:45
 # @Desc    : ip代理池实现
-import random
-from typing import Dict, List
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 import config
 from proxy.providers import (
     new_kuai_daili_proxy,
+    new_local_proxy,
     new_wandou_http_proxy,
 )
 from tools import utils
 
 from .base_proxy import ProxyProvider
+from .proxy_health import ProxyHealth, WeightedPicker, proxy_key, proxy_url
 from .types import IpInfoModel, ProviderNameEnum
 
 
 class ProxyIpPool:
+    """
+    代理IP池
+
+    - 从提供商拉取的候选代理在后台并发校验，校验通过后进入可用集合（warm set）
+    - 每个代理记录滚动健康度（成功率、p50/p95 延迟、最近错误），按成功率和延迟加权抽取
+    - 连续失败的代理被剔除，可用代理不足时后台补充；取代理只是一次 O(1) 抽样，不做网络请求
+    - 后台刷新任务提前准备并校验好下一个代理（successor），当前代理进入 refresh_lead_seconds
+      过期窗口或被剔除时原子切换，并通知订阅者（如 client 切换连接池），请求路径不等待提供商
+    """
 
     def __init__(
-        self, ip_pool_count: int, enable_validate_ip: bool, ip_provider: ProxyProvider
+        self,
+        ip_pool_count: int,
+        enable_validate_ip: bool,
+        ip_provider: ProxyProvider,
+        validate_concurrency: int = 8,
+        validate_timeout: float = 10,
+        maintain_interval: float = 30,
+        evict_after_failures: int = 3,
+        refresh_lead_seconds: float = 60,
+        refresh_check_interval: float = 5,
     ) -> None:
         """
 
         Args:
-            ip_pool_count:
-            enable_validate_ip:
-            ip_provider:
+            ip_pool_count: 可用代理的目标数量
+            enable_validate_ip: 是否校验代理
+            ip_provider: 代理提供商
+            validate_concurrency: 同时校验的代理数量
+            validate_timeout: 单次校验超时时间（秒）
+            maintain_interval: 后台维护间隔（秒）
+            evict_after_failures: 连续失败多少次后剔除
+            refresh_lead_seconds: 当前代理剩余有效期低于该值时由后台切换到下一个代理
+            refresh_check_interval: 后台刷新任务的检查间隔（秒）
         """
         self.valid_ip_url = "https://echo.apifox.cn/"  # 验证 IP 是否有效的地址
         self.ip_pool_count = ip_pool_count
         self.enable_validate_ip = enable_validate_ip
-        self.proxy_list: List[IpInfoModel] = []
+        self.proxy_list: List[IpInfoModel] = []  # 待校验的候选代理
         self.ip_provider: ProxyProvider = ip_provider
         self.current_proxy: IpInfoModel | None = None  # 当前正在使用的代理
+        self.validate_timeout = validate_timeout
+        self.maintain_interval = maintain_interval
+        self.evict_after_failures = max(1, evict_after_failures)
+        self._validate_semaphore = asyncio.Semaphore(max(1, validate_concurrency))
+        self._health: Dict[str, ProxyHealth] = {}  # 可用代理
+        self._picker = WeightedPicker([], [])
+        self._picker_dirty = False
+        self._refill_lock = asyncio.Lock()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._maintain_task: Optional[asyncio.Task] = None
+        self.refresh_lead_seconds = refresh_lead_seconds
+        self.refresh_check_interval = refresh_check_interval
+        self._successor: Optional[IpInfoModel] = None  # 已校验、等待切换的下一个代理
+        self._successor_ready_at = 0.0
+        self._rotate_listeners: List[Callable[[IpInfoModel], None]] = []
+        self._refresh_wakeup = asyncio.Event()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.validated = 0
+        self.rejected = 0
+        self.evicted = 0
+        self.rotations = 0
+        self.proactive_rotations = 0  # 后台在过期前完成的切换
+        self.inline_refreshes = 0  # 没有可用 successor、请求路径只能等待补充的次数
+        self.successors_prepared = 0
+        self.successors_rejected = 0
+        self.last_rotation_remaining_sec: Optional[float] = None  # 最近一次切换时旧代理的剩余有效期
 
     async def load_proxies(self) -> None:
         """
@@ -65,52 +117,280 @@ class ProxyIpPool:
         """
         self.proxy_list = await self.ip_provider.get_proxy(self.ip_pool_count)
 
+    async def start(self) -> None:
+        """拉取并校验第一批代理，然后启动后台维护和刷新任务"""
+        await self.refill()
+        if self._maintain_task is None:
+            self._maintain_task = asyncio.create_task(self._maintain_loop())
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self) -> None:
+        tasks = [t for t in (self._maintain_task, self._refill_task, self._refresh_task) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._maintain_task = self._refill_task = self._refresh_task = None
+        utils.logger.info(f"[ProxyIpPool.close] Proxy pool stats: {self.stats()}")
+
     async def _is_valid_proxy(self, proxy: IpInfoModel) -> bool:
         """
-        验证代理IP是否有效
+        验证代理IP是否有效，校验耗时计入该代理的健康度
         :param proxy:
         :return:
         """
         utils.logger.info(
             f"[ProxyIpPool._is_valid_proxy] testing {proxy.ip} is it valid "
         )
+        health = self._health.get(proxy_key(proxy)) or ProxyHealth(proxy)
+        start = time.perf_counter()
         try:
-            # httpx 0.28.1 需要直接传入代理URL字符串，而不是字典
-            if proxy.user and proxy.password:
-                proxy_url = f"http://{proxy.user}:{proxy.password}@{proxy.ip}:{proxy.port}"
-            else:
-                proxy_url = f"http://{proxy.ip}:{proxy.port}"
-
-            async with httpx.AsyncClient(proxy=proxy_url) as client:
-                response = await client.get(self.valid_ip_url)
-            if response.status_code == 200:
-                return True
-            else:
-                return False
+            async with self._validate_semaphore:
+                async with httpx.AsyncClient(proxy=proxy_url(proxy), timeout=self.validate_timeout) as client:
+                    response = await client.get(self.valid_ip_url)
         except Exception as e:
             utils.logger.info(
                 f"[ProxyIpPool._is_valid_proxy] testing {proxy.ip} err: {e}"
             )
-            raise e
+            health.record_failure(f"{e.__class__.__name__}: {e}")
+            return False
+        if response.status_code != 200:
+            health.record_failure(f"status {response.status_code}")
+            return False
+        health.record_success(time.perf_counter() - start)
+        self._health.setdefault(health.key, health)
+        return True
+
+    async def _validate_candidates(self) -> None:
+        """并发校验所有候选代理，通过的加入可用集合"""
+        candidates = [
+            p for p in self.proxy_list if not p.is_expired() and proxy_key(p) not in self._health
+        ]
+        self.proxy_list = []
+        if not candidates:
+            return
+        if self.enable_validate_ip:
+            results = await asyncio.gather(*[self._is_valid_proxy(p) for p in candidates])
+        else:
+            results = [True] * len(candidates)
+            for p in candidates:
+                self._health.setdefault(proxy_key(p), ProxyHealth(p))
+        valid = sum(1 for ok in results if ok)
+        self.validated += valid
+        self.rejected += len(candidates) - valid
+        self._picker_dirty = True
+        utils.logger.info(
+            f"[ProxyIpPool._validate_candidates] {valid}/{len(candidates)} proxies valid, available: {len(self._health)}"
+        )
+
+    async def refill(self, target: Optional[int] = None) -> None:
+        """
+        可用代理不足时从提供商补充
+        Args:
+            target: 可用代理的目标数量，默认为 ip_pool_count
+        """
+        async with self._refill_lock:
+            self._evict_expired()
+            if len(self._health) >= (target or self.ip_pool_count):
+                return
+            await self.load_proxies()
+            await self._validate_candidates()
+
+    def _schedule_refill(self) -> None:
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill_in_background())
+
+    async def _refill_in_background(self) -> None:
+        try:
+            await self.refill()
+        except Exception as e:
+            utils.logger.error(f"[ProxyIpPool._refill_in_background] refill proxies error: {e}")
+
+    async def _maintain_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.maintain_interval)
+            await self._refill_in_background()
+            # 健康度随请求结果变化，定期重建抽样表
+            self._picker_dirty = True
+
+    def _evict(self, key: str, reason: str) -> None:
+        health = self._health.pop(key, None)
+        if health is None:
+            return
+        self.evicted += 1
+        self._picker_dirty = True
+        if self._successor is not None and proxy_key(self._successor) == key:
+            self._successor = None
+        if self.current_proxy is not None and proxy_key(self.current_proxy) == key:
+            # 当前代理被剔除，唤醒后台刷新任务切换到 successor
+            self.current_proxy = None
+            self._refresh_wakeup.set()
+        utils.logger.info(f"[ProxyIpPool._evict] Evict proxy {key}, reason: {reason}, stats: {health.stats()}")
+
+    def _evict_expired(self) -> None:
+        for key, health in list(self._health.items()):
+            if health.proxy.is_expired():
+                self._evict(key, "expired")
+
+    def _pick(self) -> Optional[ProxyHealth]:
+        if self._picker_dirty:
+            healths = list(self._health.values())
+            self._picker = WeightedPicker(healths, [h.weight() for h in healths])
+            self._picker_dirty = False
+        health = self._picker.pick()
+        # 切换代理时尽量换一个不同的代理
+        if health is not None and len(self._picker) > 1 and self.current_proxy is not None:
+            for _ in range(3):
+                if health.key != proxy_key(self.current_proxy):
+                    break
+                health = self._picker.pick()
+        return health
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
     async def get_proxy(self) -> IpInfoModel:
         """
-        从代理池中随机提取一个代理IP
+        按健康度加权从可用代理中抽取一个代理IP，只有可用集合为空时才会等待补充
         :return:
         """
-        if len(self.proxy_list) == 0:
-            await self._reload_proxies()
+        self._evict_expired()
+        if not self._health:
+            await self.refill()
+            if not self._health:
+                raise Exception("[ProxyIpPool.get_proxy] no valid proxy available")
+        health = self._pick()
+        if len(self._health) < self.ip_pool_count:
+            self._schedule_refill()
+        self._rotate(health.proxy, proactive=False)
+        return health.proxy
 
-        proxy = random.choice(self.proxy_list)
-        self.proxy_list.remove(proxy)  # 取出来一个IP就应该移出掉
-        if self.enable_validate_ip:
-            if not await self._is_valid_proxy(proxy):
-                raise Exception(
-                    "[ProxyIpPool.get_proxy] current ip invalid and again get it"
-                )
+    def add_rotate_listener(self, listener: Callable[[IpInfoModel], None]) -> None:
+        """
+        订阅代理切换事件，切换时同步回调，回调中不能 await
+        Args:
+            listener: 参数为新的当前代理
+        """
+        self._rotate_listeners.append(listener)
+
+    def _rotate(self, proxy: IpInfoModel, proactive: bool) -> None:
+        """切换当前代理并同步通知订阅者，中间没有 await，请求看不到新旧代理混用的状态"""
+        old = self.current_proxy
         self.current_proxy = proxy  # 保存当前使用的代理
-        return proxy
+        if self._successor is proxy:
+            self._successor = None
+        if old is not None and proxy_key(old) == proxy_key(proxy):
+            return
+        self.rotations += 1
+        if proactive:
+            self.proactive_rotations += 1
+        if old is not None and old.expired_time_ts is not None:
+            self.last_rotation_remaining_sec = round(old.expired_time_ts - time.time(), 1)
+        for listener in self._rotate_listeners:
+            listener(proxy)
+
+    def _rotate_due(self) -> bool:
+        """当前代理缺失、已被剔除或进入提前刷新窗口"""
+        current = self.current_proxy
+        return (
+            current is None
+            or proxy_key(current) not in self._health
+            or current.is_expired(self.refresh_lead_seconds)
+        )
+
+    def _successor_usable(self) -> bool:
+        successor = self._successor
+        return (
+            successor is not None
+            and proxy_key(successor) in self._health
+            and not successor.is_expired(self.refresh_lead_seconds)
+            and time.monotonic() - self._successor_ready_at < self.maintain_interval
+        )
+
+    async def _prepare_successor(self) -> Optional[IpInfoModel]:
+        """
+        从可用集合中选出一个不同于当前代理、剩余有效期足够的代理并重新校验，作为下一个代理
+        """
+        if self._successor_usable():
+            return self._successor
+        self._successor = None
+        # 至少需要当前代理之外的另一个可用代理
+        await self.refill(max(self.ip_pool_count, 2))
+        current_key = proxy_key(self.current_proxy) if self.current_proxy is not None else None
+        for _ in range(3):
+            health = self._pick()
+            if health is None:
+                return None
+            proxy = health.proxy
+            if health.key == current_key or proxy.is_expired(self.refresh_lead_seconds):
+                continue
+            if self.enable_validate_ip and not await self._is_valid_proxy(proxy):
+                self.successors_rejected += 1
+                if health.consecutive_failures >= self.evict_after_failures:
+                    self._evict(health.key, health.last_error or "validate failed")
+                continue
+            if health.key not in self._health:
+                continue
+            self._successor = proxy
+            self._successor_ready_at = time.monotonic()
+            self.successors_prepared += 1
+            return proxy
+        return None
+
+    async def _refresh_once(self) -> None:
+        successor = await self._prepare_successor()
+        if successor is not None and self._rotate_due():
+            utils.logger.info(
+                f"[ProxyIpPool._refresh_once] Rotate proxy to {proxy_key(successor)} ahead of expiry"
+            )
+            self._rotate(successor, proactive=True)
+            # 切换后立即为新的当前代理准备下一个
+            await self._prepare_successor()
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                async with asyncio.timeout(self.refresh_check_interval):
+                    await self._refresh_wakeup.wait()
+            except TimeoutError:
+                pass
+            self._refresh_wakeup.clear()
+            try:
+                await self._refresh_once()
+            except Exception as e:
+                utils.logger.error(f"[ProxyIpPool._refresh_loop] refresh proxy error: {e}")
+
+    def report_success(self, proxy: IpInfoModel, latency: float) -> None:
+        """记录一次经由该代理的成功请求"""
+        health = self._health.get(proxy_key(proxy))
+        if health is not None:
+            health.record_success(latency)
+
+    def report_failure(self, proxy: IpInfoModel, error: str) -> None:
+        """记录一次经由该代理的失败请求，连续失败达到阈值时剔除"""
+        key = proxy_key(proxy)
+        health = self._health.get(key)
+        if health is None:
+            return
+        health.record_failure(error)
+        if health.consecutive_failures >= self.evict_after_failures:
+            self._evict(key, error)
+            self._schedule_refill()
+
+    def stats(self) -> Dict:
+        return {
+            "available": len(self._health),
+            "validated": self.validated,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+            "refresh": {
+                "rotations": self.rotations,
+                "proactive_rotations": self.proactive_rotations,
+                "inline_refreshes": self.inline_refreshes,
+                "successors_prepared": self.successors_prepared,
+                "successors_rejected": self.successors_rejected,
+                "successor_ready": self._successor_usable(),
+                "last_rotation_remaining_sec": self.last_rotation_remaining_sec,
+            },
+            "proxies": [h.stats() for h in self._health.values()],
+        }
 
     def is_current_proxy_expired(self, buffer_seconds: int = 30) -> bool:
         """
@@ -127,31 +407,34 @@ class ProxyIpPool:
     async def get_or_refresh_proxy(self, buffer_seconds: int = 30) -> IpInfoModel:
         """
         获取当前代理，如果已过期则自动刷新
-        每次发起请求前调用此方法来确保代理有效
+        每次发起请求前调用此方法来确保代理有效；正常情况下后台刷新任务会在过期前完成切换，
+        这里只在后台落后时兜底：优先切换到已准备好的 successor，其次在代理真正过期前继续使用当前代理，
+        只有两者都没有时才在请求路径上等待补充
         Args:
             buffer_seconds: 缓冲时间（秒），提前多少秒认为已过期
         Returns:
             IpInfoModel: 有效的代理IP信息
         """
-        if self.is_current_proxy_expired(buffer_seconds):
-            utils.logger.info(
-                f"[ProxyIpPool.get_or_refresh_proxy] Current proxy expired or not set, getting new proxy..."
-            )
-            return await self.get_proxy()
-        return self.current_proxy
-
-    async def _reload_proxies(self):
-        """
-        # 重新加载代理池
-        :return:
-        """
-        self.proxy_list = []
-        await self.load_proxies()
-
+        if not self.is_current_proxy_expired(buffer_seconds):
+            return self.current_proxy
+        self._refresh_wakeup.set()
+        if self._successor_usable():
+            successor = self._successor
+            self._rotate(successor, proactive=False)
+            return successor
+        current = self.current_proxy
+        if current is not None and proxy_key(current) in self._health and not current.is_expired(0):
+            return current
+        utils.logger.info(
+            f"[ProxyIpPool.get_or_refresh_proxy] Current proxy expired or not set, getting new proxy..."
+        )
+        self.inline_refreshes += 1
+        return await self.get_proxy()
 
 IpProxyProvider: Dict[str, ProxyProvider] = {
     ProviderNameEnum.KUAI_DAILI_PROVIDER.value: new_kuai_daili_proxy(),
     ProviderNameEnum.WANDOU_HTTP_PROVIDER.value: new_wandou_http_proxy(),
+    ProviderNameEnum.LOCAL_PROVIDER.value: new_local_proxy(),
 }
 
 
@@ -166,8 +449,14 @@ async def create_ip_pool(ip_pool_count: int, enable_validate_ip: bool) -> ProxyI
         ip_pool_count=ip_pool_count,
         enable_validate_ip=enable_validate_ip,
         ip_provider=IpProxyProvider.get(config.IP_PROXY_PROVIDER_NAME),
+        validate_concurrency=config.IP_PROXY_VALIDATE_CONCURRENCY,
+        validate_timeout=config.IP_PROXY_VALIDATE_TIMEOUT_SEC,
+        maintain_interval=config.IP_PROXY_MAINTAIN_INTERVAL_SEC,
+        evict_after_failures=config.IP_PROXY_EVICT_AFTER_FAILURES,
+        refresh_lead_seconds=config.IP_PROXY_REFRESH_LEAD_SEC,
+        refresh_check_interval=config.IP_PROXY_REFRESH_CHECK_INTERVAL_SEC,
     )
-    await pool.load_proxies()
+    await pool.start()
     return pool
 
 
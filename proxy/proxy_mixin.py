@@ -25,10 +25,12 @@
 
 from typing import TYPE_CHECKING, Optional
 
+from proxy.proxy_health import proxy_url
 from tools import utils
 
 if TYPE_CHECKING:
     from proxy.proxy_ip_pool import ProxyIpPool
+    from proxy.types import IpInfoModel
 
 
 class ProxyRefreshMixin:
@@ -38,7 +40,12 @@ class ProxyRefreshMixin:
     使用方法：
     1. 让 client 类继承此 Mixin
     2. 在 client 的 __init__ 中调用 init_proxy_pool(proxy_ip_pool)
-    3. 在每次 request 方法调用前调用 await _refresh_proxy_if_expired()
+    3. 在每次 request 方法调用前调用 await _refresh_proxy_if_expired()，
+       请求结束后调用 _report_proxy_result() 更新代理健康度
+    4. 如需在代理切换时做额外处理（如切换连接池），重写 _on_proxy_changed
+
+    代理池的后台刷新任务在当前代理过期前切换代理，并通过订阅回调同步更新 self.proxy，
+    _refresh_proxy_if_expired 只在后台刷新落后时兜底
 
     要求：
     - client 类必须有 self.proxy 属性来存储当前代理URL
@@ -53,6 +60,23 @@ class ProxyRefreshMixin:
             proxy_ip_pool: 代理IP池实例
         """
         self._proxy_ip_pool = proxy_ip_pool
+        if proxy_ip_pool is not None:
+            proxy_ip_pool.add_rotate_listener(self._switch_proxy)
+
+    def _switch_proxy(self, new_proxy: "IpInfoModel") -> None:
+        """
+        切换到新的代理，与连接池切换（_on_proxy_changed）在同一步内完成，中间没有 await
+        Args:
+            new_proxy: 新的代理IP信息
+        """
+        old_proxy_url = self.proxy
+        # 更新 httpx 代理URL
+        self.proxy = proxy_url(new_proxy)
+        if old_proxy_url != self.proxy:
+            utils.logger.info(
+                f"[{self.__class__.__name__}._switch_proxy] New proxy: {new_proxy.ip}:{new_proxy.port}"
+            )
+            self._on_proxy_changed(old_proxy_url, self.proxy)
 
     async def _refresh_proxy_if_expired(self) -> None:
         """
@@ -67,11 +91,28 @@ class ProxyRefreshMixin:
                 f"[{self.__class__.__name__}._refresh_proxy_if_expired] Proxy expired, refreshing..."
             )
             new_proxy = await self._proxy_ip_pool.get_or_refresh_proxy()
-            # 更新 httpx 代理URL
-            if new_proxy.user and new_proxy.password:
-                self.proxy = f"http://{new_proxy.user}:{new_proxy.password}@{new_proxy.ip}:{new_proxy.port}"
-            else:
-                self.proxy = f"http://{new_proxy.ip}:{new_proxy.port}"
-            utils.logger.info(
-                f"[{self.__class__.__name__}._refresh_proxy_if_expired] New proxy: {new_proxy.ip}:{new_proxy.port}"
-            )
+            self._switch_proxy(new_proxy)
+
+    def _report_proxy_result(self, latency: Optional[float] = None, error: Optional[str] = None) -> None:
+        """
+        把经由当前代理的请求结果反馈给代理池，连续失败的代理会被剔除并在下次请求前切换
+        Args:
+            latency: 请求耗时（秒），成功时传入
+            error: 失败原因，为空表示成功
+        """
+        pool = self._proxy_ip_pool
+        if pool is None or pool.current_proxy is None or self.proxy != proxy_url(pool.current_proxy):
+            return
+        if error is None:
+            pool.report_success(pool.current_proxy, latency or 0.0)
+        else:
+            pool.report_failure(pool.current_proxy, error)
+
+    def _on_proxy_changed(self, old_proxy: Optional[str], new_proxy: Optional[str]) -> None:
+        """
+        代理切换后的回调，默认不做处理
+        Args:
+            old_proxy: 旧的代理URL
+            new_proxy: 新的代理URL
+        """
+        pass
@@ -343,6 +343,23 @@ class ExcelStoreBase(AbstractStore):
 
         utils.logger.info(f"[ExcelStoreBase] Stored dynamic to Excel: {dynamic_item.get('dynamic_id', 'N/A')}")
 
+    def _sync_sheets(self):
+        """
+        Rebuild the workbook sheet list from the sheets that currently have data rows
+        """
+        sheets = [
+            sheet
+            for sheet in (self.contents_sheet, self.comments_sheet, self.creators_sheet,
+                          self.contacts_sheet, self.dynamics_sheet)
+            if sheet is not None
+        ]
+        for sheet in sheets:
+            if sheet in self.workbook.worksheets:
+                self.workbook.remove(sheet)
+        for sheet in sheets:
+            if sheet.max_row > 1:
+                self.workbook._add_sheet(sheet)
+
     def flush(self):
         """
         Save workbook to file
@@ -357,17 +374,9 @@ class ExcelStoreBase(AbstractStore):
             if self.dynamics_sheet is not None:
                 self._auto_adjust_column_width(self.dynamics_sheet)
 
-            # Remove empty sheets (only header row)
-            if self.contents_sheet.max_row == 1:
-                self.workbook.remove(self.contents_sheet)
-            if self.comments_sheet.max_row == 1:
-                self.workbook.remove(self.comments_sheet)
-            if self.creators_sheet.max_row == 1:
-                self.workbook.remove(self.creators_sheet)
-            if self.contacts_sheet is not None and self.contacts_sheet.max_row == 1:
-                self.workbook.remove(self.contacts_sheet)
-            if self.dynamics_sheet is not None and self.dynamics_sheet.max_row == 1:
-                self.workbook.remove(self.dynamics_sheet)
+            # Keep only sheets with data (more than the header row). Flush may be called
+            # several times per run: a sheet left out earlier is added back once it has data
+            self._sync_sheets()
 
             # Check if there are any sheets left
             if len(self.workbook.sheetnames) == 0:
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/store/store_registry.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 运行级存储注册表：每种存储后端在一次运行中只创建一次，由 main 负责 open/flush/close
+import inspect
+from typing import Callable, Dict, Hashable
+
+from base.base_crawler import AbstractStore
+from tools import utils
+
+
+async def _call_hook(store: AbstractStore, name: str) -> None:
+    """调用存储的 flush/close 钩子（同步或异步均可），不存在时跳过"""
+    hook = getattr(store, name, None)
+    if hook is None:
+        return
+    result = hook()
+    if inspect.isawaitable(result):
+        await result
+
+
+class StoreRegistry:
+    """
+    存储注册表
+
+    使用方法：
+        store_registry.open()                       # 运行开始
+        store = store_registry.get(key, factory)    # 每条数据入库时获取，同一 key 复用同一个实例
+        await store_registry.flush()                # 爬取结束，生成词云/报告之前
+        await store_registry.close()                # 退出清理（被中断时也会执行）
+
+    未 open 时 get 每次返回新实例，与单独调用存储函数（如测试、脚本）时的行为一致
+    """
+
+    def __init__(self):
+        self._stores: Dict[Hashable, AbstractStore] = {}
+        self._opened = False
+        # flush 之后是否又取用过存储（有新写入）
+        self._dirty = False
+
+    @property
+    def opened(self) -> bool:
+        return self._opened
+
+    def open(self) -> None:
+        """开始一次运行，清理上一次运行遗留的实例"""
+        self._stores.clear()
+        self._opened = True
+        self._dirty = False
+
+    def get(self, key: Hashable, factory: Callable[[], AbstractStore]) -> AbstractStore:
+        """
+        获取 key 对应的存储实例，不存在时用 factory 创建
+        Args:
+            key: 存储标识，如 (平台, 存储方式, 爬取类型)
+            factory: 创建存储实例的函数
+
+        Returns:
+            AbstractStore
+        """
+        if not self._opened:
+            return factory()
+        store = self._stores.get(key)
+        if store is None:
+            store = factory()
+            self._stores[key] = store
+            utils.logger.info(f"[StoreRegistry.get] Store created for {key}: {store.__class__.__name__}")
+        self._dirty = True
+        return store
+
+    async def flush(self) -> None:
+        """把所有存储的缓冲数据写出"""
+        for key, store in list(self._stores.items()):
+            try:
+                await _call_hook(store, "flush")
+            except Exception as e:
+                utils.logger.error(f"[StoreRegistry.flush] Flush store {key} error: {e}")
+        self._dirty = False
+
+    async def close(self) -> None:
+        """有未写出的数据时先 flush，然后关闭所有存储并结束本次运行"""
+        if self._dirty:
+            await self.flush()
+        for key, store in list(self._stores.items()):
+            try:
+                await _call_hook(store, "close")
+            except Exception as e:
+                utils.logger.error(f"[StoreRegistry.close] Close store {key} error: {e}")
+        self._stores.clear()
+        self._opened = False
+
+
+store_registry = StoreRegistry()
@@ -21,10 +21,12 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/1/14 17:34
 # @Desc    :
-from typing import List
+from typing import Callable, List
 
 import config
-from var import source_keyword_var
+from store.store_registry import store_registry
+from tools.buffered_file_writer import buffered_file_writer
+from var import crawler_type_var, source_keyword_var
 
 from .xhs_store_media import *
 from ._store_impl import *
@@ -48,6 +50,14 @@ class XhsStoreFactory:
             raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or json or sqlite or mongodb or excel ...")
         return store_class()
 
+    @staticmethod
+    def get_store() -> AbstractStore:
+        """
+        获取本次运行共享的存储实例（见 store.store_registry），避免每条数据都新建存储和文件写入器
+        """
+        key = ("xhs", config.SAVE_DATA_OPTION, crawler_type_var.get())
+        return store_registry.get(key, XhsStoreFactory.create_store)
+
 
 def get_video_url_arr(note_item: Dict) -> List:
     """
@@ -118,11 +128,11 @@ async def update_xhs_note(note_item: Dict):
         "last_modify_ts": utils.get_current_timestamp(),  # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
         "note_url": f"https://www.xiaohongshu.com/explore/{note_id}?xsec_token={note_item.get('xsec_token')}&xsec_source=pc_search",  # 帖子url
         "post_url": f"https://www.xiaohongshu.com/explore/{note_id}?xsec_token={note_item.get('xsec_token')}&xsec_source=pc_search",
-        "source_keyword": source_keyword_var.get(),  # 搜索关键词
+        "source_keyword": note_item.get("source_keyword") or source_keyword_var.get(),  # 搜索关键词（跨关键词去重时为全部来源关键词）
         "xsec_token": note_item.get("xsec_token"),  # xsec_token
     }
     utils.logger.info(f"[store.xhs.update_xhs_note] xhs note: {local_db_item}")
-    await XhsStoreFactory.create_store().store_content(local_db_item)
+    await XhsStoreFactory.get_store().store_content(local_db_item)
 
 
 async def batch_update_xhs_note_comments(note_id: str, comments: List[Dict]):
@@ -171,7 +181,7 @@ async def update_xhs_note_comment(note_id: str, comment_item: Dict):
         "like_count": comment_item.get("like_count", 0),
     }
     utils.logger.info(f"[store.xhs.update_xhs_note_comment] xhs note comment:{local_db_item}")
-    await XhsStoreFactory.create_store().store_comment(local_db_item)
+    await XhsStoreFactory.get_store().store_comment(local_db_item)
 
 
 async def save_creator(user_id: str, creator: Dict):
@@ -220,7 +230,7 @@ async def save_creator(user_id: str, creator: Dict):
         "last_modify_ts": utils.get_current_timestamp(),  # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
     }
     utils.logger.info(f"[store.xhs.save_creator] creator:{local_db_item}")
-    await XhsStoreFactory.create_store().store_creator(local_db_item)
+    await XhsStoreFactory.get_store().store_creator(local_db_item)
 
 
 async def update_xhs_note_image(note_id, pic_content, extension_file_name):
@@ -251,3 +261,51 @@ async def update_xhs_note_video(note_id, video_content, extension_file_name):
     """
 
     await XiaoHongShuVideo().store_video({"notice_id": note_id, "video_content": video_content, "extension_file_name": extension_file_name})
+
+
+def get_note_image_path(note_id: str, extension_file_name: str) -> str:
+    """
+    小红书笔记图片的保存路径，媒体下载器直接流式写入该路径
+    Args:
+        note_id:
+        extension_file_name:
+
+    Returns:
+
+    """
+    return XiaoHongShuImage().make_save_file_name(note_id, extension_file_name)
+
+
+def get_note_video_path(note_id: str, extension_file_name: str) -> str:
+    """
+    小红书笔记视频的保存路径，媒体下载器直接流式写入该路径
+    Args:
+        note_id:
+        extension_file_name:
+
+    Returns:
+
+    """
+    return XiaoHongShuVideo().make_save_file_name(note_id, extension_file_name)
+
+
+def call_after_stored(callback: Callable[[], None]) -> None:
+    """
+    已提交存储的数据全部落盘后再执行 callback，用于写入断点日志、增量水位线等"已入库"记录；
+    csv/jsonl 存储写入有缓冲（见 tools.buffered_file_writer），其他存储没有待写出的数据，立即执行
+    Args:
+        callback: 同步回调
+
+    Returns:
+
+    """
+    buffered_file_writer.call_after_commit(callback)
+
+
+async def flush_stored() -> None:
+    """
+    立即写出缓冲的数据，并执行 call_after_stored 登记的回调，关闭断点日志、增量水位线前调用
+    Returns:
+
+    """
+    await buffered_file_writer.flush()
@@ -64,8 +64,15 @@ class XhsCsvStoreImplement(AbstractStore):
     async def store_creator(self, creator_item: Dict):
         pass
 
-    def flush(self):
-        pass
+    async def flush(self):
+        """
+        flush buffered rows to csv file
+        :return:
+        """
+        await self.writer.flush()
+
+    async def close(self):
+        await self.writer.close()
 
 
 class XhsJsonStoreImplement(AbstractStore):
@@ -87,7 +94,7 @@ class XhsJsonStoreImplement(AbstractStore):
         await self.writer.write_to_jsonl(item_type="contents", item=content_item)
         try:
             from tools.utils import utils as _u
-            import json as _json
+            from tools import jsoncodec as _json
             payload = {"stage":"write_jsonl","file":"contents.jsonl","written":1}
             if file_path:
                 payload["path"] = file_path
@@ -109,7 +116,7 @@ class XhsJsonStoreImplement(AbstractStore):
         await self.writer.write_to_jsonl(item_type="comments", item=comment_item)
         try:
             from tools.utils import utils as _u
-            import json as _json
+            from tools import jsoncodec as _json
             payload = {"stage":"write_jsonl","file":"comments.jsonl","written":1}
             if file_path:
                 payload["path"] = file_path
@@ -120,12 +127,15 @@ class XhsJsonStoreImplement(AbstractStore):
     async def store_creator(self, creator_item: Dict):
         pass
 
-    def flush(self):
+    async def flush(self):
         """
         flush data to jsonl file
         :return:
         """
-        pass
+        await self.writer.flush()
+
+    async def close(self):
+        await self.writer.close()
 
 
 
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_async_pager.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 流水线分页测试
+
+import asyncio
+import time
+from contextlib import aclosing
+from unittest import IsolatedAsyncioTestCase
+
+from tools.async_pager import iter_pages_pipelined
+
+
+class TestPipelinedPager(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.requested = []
+
+    async def fetch_page(self, cursor: str):
+        self.requested.append(cursor)
+        await asyncio.sleep(0.05)
+        index = int(cursor or 0)
+        return {"items": [index], "cursor": str(index + 1), "has_more": index < 4}
+
+    @staticmethod
+    def next_cursor(page):
+        return page["cursor"] if page["has_more"] else None
+
+    async def test_pages_in_order_and_overlapped(self):
+        start = time.monotonic()
+        pages = []
+        async for page in iter_pages_pipelined(self.fetch_page, self.next_cursor, lookahead=1):
+            pages.append(page["items"][0])
+            await asyncio.sleep(0.05)  # 模拟入库耗时
+        elapsed = time.monotonic() - start
+        self.assertEqual(pages, [0, 1, 2, 3, 4])
+        # 顺序执行约 0.5 秒，流水线下请求与处理重叠
+        self.assertLess(elapsed, 0.4)
+
+    async def test_lookahead_bound_and_early_exit(self):
+        pages = iter_pages_pipelined(self.fetch_page, self.next_cursor, lookahead=1)
+        async with aclosing(pages):
+            async for _ in pages:
+                await asyncio.sleep(0.2)
+                # 处理第一页期间最多提前请求一页
+                self.assertEqual(self.requested, ["", "1"])
+                break
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.requested, ["", "1"])
+
+    async def test_error_propagates(self):
+        async def failing_fetch(cursor: str):
+            if cursor:
+                raise ValueError("boom")
+            return {"cursor": "1", "has_more": True}
+
+        with self.assertRaises(ValueError):
+            async for _ in iter_pages_pipelined(failing_fetch, self.next_cursor):
+                pass
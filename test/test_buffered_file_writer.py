@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_buffered_file_writer.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 缓冲文件写入器测试：批量写出、按时间/大小阈值写出、CSV 表头与退出时写出
+
+import asyncio
+import csv
+import os
+import tempfile
+import unittest
+
+from tools.buffered_file_writer import BufferedFileWriter
+from tools.checkpoint import CheckpointJournal
+
+
+class TestBufferedFileWriter(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    async def test_rows_are_group_committed(self):
+        writer = BufferedFileWriter(flush_bytes=1 << 20, flush_interval=60)
+        path = self._path("comments.jsonl")
+        for i in range(1000):
+            await writer.write_line(path, f'{{"i": {i}}}')
+        # 未达到阈值前只在内存中
+        self.assertFalse(os.path.exists(path))
+        await writer.flush()
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read().splitlines(), [f'{{"i": {i}}}' for i in range(1000)])
+        self.assertEqual(writer.commits, 1)
+        await writer.close()
+
+    async def test_flush_by_interval_and_size(self):
+        writer = BufferedFileWriter(flush_bytes=100, flush_interval=0.05)
+        slow, fast = self._path("slow.jsonl"), self._path("fast.jsonl")
+        await writer.write_line(slow, "a")
+        await asyncio.sleep(0.2)
+        with open(slow, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "a\n")
+        for _ in range(20):
+            await writer.write_line(fast, "x" * 9)
+        # 达到 max_pending_bytes 时写入方等待写出
+        self.assertLess(writer.stats()["pending_bytes"], writer.max_pending_bytes)
+        await writer.close()
+        with open(fast, encoding="utf-8") as f:
+            self.assertEqual(len(f.read().splitlines()), 20)
+        self.assertEqual(writer.stats()["open_files"], 0)
+
+    async def test_csv_header_written_once(self):
+        path = self._path("contents.csv")
+        writer = BufferedFileWriter(flush_interval=60)
+        await writer.write_csv_row(path, {"id": 1, "title": "a,b"})
+        await writer.write_csv_row(path, {"id": 2, "title": "c"})
+        await writer.close()
+        # 文件已有内容时追加不再写表头
+        writer = BufferedFileWriter(flush_interval=60)
+        await writer.write_csv_row(path, {"id": 3, "title": "d"})
+        await writer.close()
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([(r["id"], r["title"]) for r in rows], [("1", "a,b"), ("2", "c"), ("3", "d")])
+
+    async def test_flush_sync_on_forced_exit(self):
+        writer = BufferedFileWriter(flush_interval=60, fsync_policy="commit")
+        path = self._path("contents.jsonl")
+        await writer.write_line(path, "x")
+        writer.flush_sync()
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "x\n")
+        await writer.close()
+
+    async def test_bad_row_does_not_stop_writer(self):
+        writer = BufferedFileWriter(flush_interval=0.05)
+        path = self._path("comments.jsonl")
+        await writer.write_line(path, "good1")
+        # 单独的代理字符无法按 utf-8 编码，整批写入失败
+        await writer.write_line(path, "bad\ud800")
+        await writer.write_line(path, "good2")
+        await asyncio.sleep(0.2)
+        # 后台任务仍在运行，之后的数据照常写出
+        await writer.write_line(path, "good3")
+        await asyncio.sleep(0.2)
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read().splitlines(), ["good1", "good2", "good3"])
+        self.assertEqual(writer.write_errors, 1)
+        await writer.close()
+
+    async def test_journal_never_ahead_of_data(self):
+        writer = BufferedFileWriter(flush_interval=60)
+        data_path = self._path("comments.jsonl")
+        journal = CheckpointJournal(self._path("checkpoint.jsonl"))
+        self.addCleanup(journal.close)
+        await writer.write_line(data_path, "c1")
+        writer.call_after_commit(lambda: journal.append("comments", ids=["c1"]))
+        # 进程在写出前被杀死：数据和日志记录都不存在
+        self.assertFalse(os.path.exists(data_path))
+        self.assertEqual(CheckpointJournal.replay(journal.path), [])
+
+        await writer.flush()
+        with open(data_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "c1\n")
+        self.assertEqual([r["ids"] for r in CheckpointJournal.replay(journal.path)], [["c1"]])
+
+        # 写出进行中登记的回调等下一次写出完成后才执行
+        await writer.write_line(data_path, "c2")
+        commit = asyncio.create_task(writer.flush())
+        await asyncio.sleep(0)
+        await writer.write_line(data_path, "c3")
+        writer.call_after_commit(lambda: journal.append("comments", ids=["c3"]))
+        await commit
+        self.assertEqual(len(CheckpointJournal.replay(journal.path)), 1)
+        await writer.close()
+        self.assertEqual([r["ids"] for r in CheckpointJournal.replay(journal.path)], [["c1"], ["c3"]])
+        with open(data_path, encoding="utf-8") as f:
+            self.assertEqual(f.read().splitlines(), ["c1", "c2", "c3"])
+
+    async def test_after_commit_runs_immediately_without_pending_data(self):
+        writer = BufferedFileWriter(flush_interval=60)
+        called = []
+        writer.call_after_commit(lambda: called.append(1))
+        self.assertEqual(called, [1])
+        await writer.close()
+
+    def test_invalid_fsync_policy(self):
+        with self.assertRaises(ValueError):
+            BufferedFileWriter(fsync_policy="always")
+
+
+if __name__ == "__main__":
+    unittest.main()
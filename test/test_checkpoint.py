@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_checkpoint.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 断点续爬日志测试
+
+import os
+import tempfile
+import unittest
+
+from media_platform.xhs.search_checkpoint import SearchCheckpoint
+from tools.checkpoint import CheckpointJournal
+
+
+class TestSearchCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def reopen(self) -> SearchCheckpoint:
+        return SearchCheckpoint(CheckpointJournal(self.path), CheckpointJournal.replay(self.path))
+
+    def test_resume_from_first_unfinished_page(self):
+        checkpoint = self.reopen()
+        checkpoint.record_page(0, 1, "sid", ["n1", "n2"])
+        checkpoint.record_page(0, 2, "sid", ["n3"])
+        checkpoint.record_note_done("n1")
+        checkpoint.record_note_done("n3")
+        checkpoint.close()
+
+        checkpoint = self.reopen()
+        self.assertEqual(checkpoint.resume_page(0), (1, "sid"))
+        self.assertIsNone(checkpoint.resume_page(1))
+        checkpoint.record_note_done("n2")
+        checkpoint.record_keyword_done(0)
+        checkpoint.close()
+
+        checkpoint = self.reopen()
+        self.assertEqual(checkpoint.resume_page(0), (3, "sid"))
+        self.assertIn(0, checkpoint.done_keywords)
+        checkpoint.close()
+
+    def test_comment_progress(self):
+        checkpoint = self.reopen()
+        checkpoint.record_note_stored("n1")
+        checkpoint.record_comments("n1", ["c1", "c2"])
+        checkpoint.record_comment_page("n1", "cursor-2")
+        checkpoint.record_comments("n1", ["c3"])
+        checkpoint.close()
+
+        checkpoint = self.reopen()
+        self.assertIn("n1", checkpoint.stored_notes)
+        self.assertEqual(checkpoint.comment_progress("n1"), ("cursor-2", 3))
+        self.assertEqual(checkpoint.comments_collected, 3)
+        # 中断页中已入库的评论在续爬时跳过，之前页的评论不会再被请求
+        self.assertTrue(checkpoint.is_comment_stored("n1", "c3"))
+        self.assertFalse(checkpoint.is_comment_stored("n1", "c1"))
+        checkpoint.close()
+
+    def test_replay_ignores_truncated_record(self):
+        checkpoint = self.reopen()
+        checkpoint.record_note_done("n1")
+        checkpoint.close()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"type":"note_done","note_id":"n2"')
+
+        checkpoint = self.reopen()
+        self.assertEqual(checkpoint.done_notes, {"n1"})
+        checkpoint.close()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_comment_budget.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 评论预算调度测试
+
+import unittest
+
+from media_platform.xhs.comment_budget import CommentBudgetScheduler
+
+
+class TestCommentBudgetScheduler(unittest.TestCase):
+
+    def test_allocate_proportional_to_engagement(self):
+        budget = CommentBudgetScheduler(total_budget=100, per_note_cap=100, min_per_note=1)
+        budget.register("hot", {"comment_count": "1.2万", "liked_count": "3万"})
+        budget.register("cold", {"comment_count": "10", "liked_count": "5"})
+        hot = budget.allocate("hot")
+        cold = budget.allocate("cold")
+        self.assertGreater(hot, 90)
+        self.assertLessEqual(cold, 10)
+        self.assertLessEqual(hot + cold, 100)
+
+    def test_caps_by_comment_count_and_per_note_cap(self):
+        budget = CommentBudgetScheduler(total_budget=100, per_note_cap=30)
+        budget.register("a", {"comment_count": "5"})
+        budget.register("b", {"comment_count": "0"})
+        budget.register("c", {"comment_count": "1000"})
+        self.assertEqual(budget.allocate("c"), 30)
+        self.assertEqual(budget.allocate("a"), 5)
+        self.assertEqual(budget.allocate("b"), 0)
+
+    def test_unused_quota_is_rebalanced(self):
+        budget = CommentBudgetScheduler(total_budget=20, per_note_cap=20)
+        budget.register("a", {"comment_count": "100"})
+        budget.register("b", {"comment_count": "100"})
+        quota_a = budget.allocate("a")
+        self.assertEqual(quota_a, 10)
+        # a 实际只有 3 条评论，剩余额度退回给 b
+        budget.finish("a", 3)
+        self.assertEqual(budget.allocate("b"), 17)
+
+    def test_discarded_notes_do_not_hold_budget(self):
+        budget = CommentBudgetScheduler(total_budget=20, per_note_cap=20)
+        budget.register("a", {"comment_count": "100"})
+        budget.register("b", {"comment_count": "100"})
+        budget.discard("a")
+        self.assertEqual(budget.allocate("b"), 20)
+        self.assertEqual(budget.allocate("a"), 0)
+
+    def test_reserves_budget_for_later_pages(self):
+        budget = CommentBudgetScheduler(total_budget=100, per_note_cap=100, expected_notes=4)
+        budget.register("a", {"comment_count": "50"})
+        budget.register("b", {"comment_count": "50"})
+        self.assertEqual(budget.allocate("a"), 25)
+        self.assertEqual(budget.allocate("b"), 25)
+        self.assertEqual(budget.pool, 50)
+
+    def test_release_expected_when_search_returns_fewer_notes(self):
+        budget = CommentBudgetScheduler(total_budget=90, per_note_cap=100, expected_notes=40)
+        # 第一页 20 条结果，过滤后只登记 3 篇，随后关键词没有更多结果
+        for note_id in ("a", "b", "c"):
+            budget.register(note_id, {"comment_count": "100"})
+        budget.release_expected(20 - 3)
+        budget.release_expected(40 - 20)
+        quotas = [budget.allocate(note_id) for note_id in ("a", "b", "c")]
+        self.assertEqual(quotas, [30, 30, 30])
+        self.assertEqual(budget.pool, 0)
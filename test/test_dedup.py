@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_dedup.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 布隆过滤器、请求合并与跨关键词笔记去重测试
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from media_platform.xhs.note_dedup import NoteDedup
+from tools.bloom_filter import BloomFilter
+from tools.single_flight import SingleFlight
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_add_and_contains(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"note-{i}")
+        self.assertTrue(all(f"note-{i}" in bloom for i in range(1000)))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "seen.bloom")
+            bloom = BloomFilter(capacity=100)
+            bloom.add("a")
+            bloom.save(path)
+            loaded = BloomFilter.load(path, capacity=100)
+            self.assertIn("a", loaded)
+            self.assertNotIn("b", loaded)
+            self.assertEqual(len(loaded), 1)
+
+
+class TestSingleFlight(IsolatedAsyncioTestCase):
+
+    async def test_concurrent_calls_share_result(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"items": [1]}
+
+        results = await asyncio.gather(*[flight.do("k", fetch) for _ in range(5)])
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r == {"items": [1]} for r in results))
+        results[1]["items"].append(2)
+        self.assertEqual(results[0], {"items": [1]})
+        # 执行结束后再次调用会重新请求
+        await flight.do("k", fetch)
+        self.assertEqual(len(calls), 2)
+
+    async def test_exception_is_shared(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+
+class TestNoteDedup(unittest.TestCase):
+
+    def test_claim_and_retag(self):
+        dedup = NoteDedup()
+        self.assertTrue(dedup.claim("n1", "kw1"))
+        self.assertFalse(dedup.claim("n1", "kw2"))
+        self.assertFalse(dedup.claim("n1", "kw2"))
+        self.assertEqual(dedup.source_keyword("n1"), "kw1,kw2")
+
+    def test_release_after_failed_fetch(self):
+        dedup = NoteDedup()
+        self.assertTrue(dedup.claim("n1", "kw1"))
+        dedup.release("n1")
+        self.assertTrue(dedup.claim("n1", "kw2"))
+
+    def test_history_skips_previous_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.bloom")
+            dedup = NoteDedup(history_path=path, capacity=100)
+            self.assertTrue(dedup.claim("n1", "kw1"))
+            dedup.record("n1", {"note_id": "n1"})
+            dedup.mark_stored("n1")
+            dedup.close()
+
+            dedup = NoteDedup(history_path=path, capacity=100)
+            self.assertFalse(dedup.claim("n1", "kw1"))
+            self.assertTrue(dedup.claim("n2", "kw1"))
+            self.assertEqual(dedup.history_skipped, 1)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_httpx_client_pool.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 长连接客户端池测试：同一代理复用客户端、下线后宽限期内保持可用、close 关闭全部客户端
+
+import asyncio
+import unittest
+
+from tools.httpx_client_pool import HttpxClientPool
+
+PROXY_A = "http://127.0.0.1:18080"
+PROXY_B = "http://127.0.0.1:18081"
+
+
+class TestHttpxClientPool(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.pool = HttpxClientPool(timeout=5, http2=False)
+        self.addAsyncCleanup(self.pool.close)
+
+    async def test_same_proxy_reuses_client(self):
+        direct = self.pool.get_client(None)
+        client_a = self.pool.get_client(PROXY_A)
+        self.assertIs(self.pool.get_client(PROXY_A), client_a)
+        self.assertIs(self.pool.get_client(None), direct)
+        self.assertIsNot(self.pool.get_client(PROXY_B), client_a)
+        self.assertIsNot(client_a, direct)
+
+    async def test_retire_keeps_client_open_during_grace_period(self):
+        old = self.pool.get_client(PROXY_A)
+        self.pool.retire(PROXY_A, grace_seconds=0.1)
+        await asyncio.sleep(0.02)
+        self.assertFalse(old.is_closed)
+        # 下线后再次获取会新建客户端
+        self.assertIsNot(self.pool.get_client(PROXY_A), old)
+        await asyncio.sleep(0.15)
+        self.assertTrue(old.is_closed)
+
+    async def test_close_cancels_retire_and_closes_all(self):
+        retired = self.pool.get_client(PROXY_A)
+        self.pool.retire(PROXY_A, grace_seconds=60)
+        clients = [self.pool.get_client(None), self.pool.get_client(PROXY_B)]
+        async with asyncio.timeout(1):
+            await self.pool.close()
+        self.assertEqual(self.pool._retire_tasks, set())
+        self.assertTrue(retired.is_closed)
+        self.assertTrue(all(c.is_closed for c in clients))
+        with self.assertRaises(RuntimeError):
+            self.pool.get_client(None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_jsoncodec.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : JSON 编解码层测试：签名序列化与标准库逐字节一致，两种后端的解析/序列化结果一致
+
+import json
+import unittest
+
+from tools import jsoncodec
+
+SIGN_PAYLOADS = [
+    {"keyword": "露营 装备", "page": 1, "page_size": 20, "search_id": "2c7hu5b3kzoivkh848hp0", "sort": "general"},
+    {"note_id": "64b8f0e1000000001203c5a1", "image_formats": ["jpg", "webp", "avif"], "extra": {"need_body_topic": 1}},
+    {"float": 1e-05, "big": 2 ** 70, "nan": float("nan"), "nested": [None, True, False, 0.1, -0.0]},
+    {"escape": "quote\" backslash\\ slash/ ctrl\x01\n\t emoji😀  "},
+    {1: "int key", "": "empty key"},
+]
+
+
+class TestJsonCodec(unittest.TestCase):
+
+    def test_dumps_compact_matches_stdlib(self):
+        for payload in SIGN_PAYLOADS:
+            expected = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+            self.assertEqual(jsoncodec.dumps_compact(payload), expected)
+
+    def test_dumps_roundtrip(self):
+        row = {"note_id": "abc", "content": "评论内容 😀", "like_count": "12", "pictures": None, "sub": [1, 2.5]}
+        line = jsoncodec.dumps(row)
+        self.assertNotIn("\n", line)
+        self.assertIn("评论内容", line)
+        self.assertEqual(json.loads(line), row)
+        # orjson 不支持的对象回退到标准库
+        self.assertEqual(json.loads(jsoncodec.dumps({1: 2 ** 70})), {"1": 2 ** 70})
+
+    def test_loads(self):
+        text = '{"success":true,"data":{"items":[{"id":"1","title":"标题"}]}}'
+        expected = json.loads(text)
+        self.assertEqual(jsoncodec.loads(text), expected)
+        self.assertEqual(jsoncodec.loads(text.encode("utf-8")), expected)
+        self.assertTrue(jsoncodec.loads("NaN") != jsoncodec.loads("NaN"))
+        with self.assertRaises(json.JSONDecodeError):
+            jsoncodec.loads('{"broken":')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_local_proxy.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 本地代理提供商测试：HTTP 转发、失败率、停止代理
+
+import asyncio
+import unittest
+
+import httpx
+
+from proxy.providers.local_proxy import LocalProxyProvider
+from proxy.proxy_health import proxy_url
+
+_BODY = b'{"success": true}'
+
+
+class TestLocalProxyProvider(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        async def handle(reader, writer):
+            try:
+                while True:
+                    await reader.readuntil(b"\r\n\r\n")
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(_BODY), _BODY))
+                    await writer.drain()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                writer.close()
+
+        self.upstream = await asyncio.start_server(handle, "127.0.0.1", 0)
+        self.url = f"http://127.0.0.1:{self.upstream.sockets[0].getsockname()[1]}/api"
+
+    async def asyncTearDown(self):
+        self.upstream.close()
+
+    async def test_forward_through_proxy(self):
+        provider = LocalProxyProvider(ttl_seconds=60)
+        [proxy] = await provider.get_proxy(1)
+        self.assertIsNotNone(proxy.expired_time_ts)
+        async with httpx.AsyncClient(proxy=proxy_url(proxy)) as client:
+            for _ in range(3):
+                response = await client.get(self.url)
+                self.assertEqual(response.content, _BODY)
+        self.assertEqual(provider.stats()["requests"], 3)
+        await provider.close()
+        self.assertEqual(provider.stats()["running"], 0)
+
+    async def test_failure_and_stopped_proxy(self):
+        provider = LocalProxyProvider(failure_rate=1.0)
+        [proxy] = await provider.get_proxy(1)
+        async with httpx.AsyncClient(proxy=proxy_url(proxy)) as client:
+            with self.assertRaises(httpx.TransportError):
+                await client.get(self.url)
+        await provider.stop_proxy(proxy.port)
+        async with httpx.AsyncClient(proxy=proxy_url(proxy)) as client:
+            with self.assertRaises(httpx.TransportError):
+                await client.get(self.url)
+        self.assertEqual(provider.stats()["failures"], 1)
+        await provider.close()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_media_downloader.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 媒体下载器测试：流式写入、原子重命名、Range 续传
+
+import os
+import tempfile
+import unittest
+
+import httpx
+
+from tools.media_downloader import MediaDownloader
+
+PAYLOAD = bytes(range(256)) * 1024
+
+
+class _BrokenStream(httpx.AsyncByteStream):
+    """输出一部分数据后连接中断"""
+
+    def __init__(self, data: bytes):
+        self._data = data
+
+    async def __aiter__(self):
+        yield self._data
+        raise httpx.ReadError("connection reset")
+
+
+class FakeMediaServer:
+    def __init__(self, support_range: bool = True, break_first: bool = False):
+        self.support_range = support_range
+        self.break_first = break_first
+        self.ranges = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("Range")
+        self.ranges.append(range_header)
+        if self.break_first:
+            self.break_first = False
+            return httpx.Response(200, stream=_BrokenStream(PAYLOAD[: len(PAYLOAD) // 3]))
+        if range_header and self.support_range:
+            start = int(range_header[len("bytes="):-1])
+            if start >= len(PAYLOAD):
+                return httpx.Response(416)
+            return httpx.Response(206, content=PAYLOAD[start:])
+        return httpx.Response(200, content=PAYLOAD)
+
+
+class TestMediaDownloader(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "note_id", "0.mp4")
+
+    async def asyncTearDown(self):
+        self.tmp.cleanup()
+
+    async def _run(self, server: FakeMediaServer, **kwargs) -> MediaDownloader:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+
+        async def client_factory():
+            return client
+
+        downloader = MediaDownloader(client_factory, concurrency=2, chunk_size=4096, **kwargs)
+        downloader.start()
+        await downloader.submit("https://sns-video.example/v.mp4", self.path)
+        await downloader.join()
+        await downloader.close()
+        await client.aclose()
+        return downloader
+
+    def _assert_complete(self):
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), PAYLOAD)
+        self.assertFalse(os.path.exists(self.path + ".part"))
+
+    async def test_download_and_skip_existing(self):
+        server = FakeMediaServer()
+        downloader = await self._run(server)
+        self._assert_complete()
+        self.assertEqual(downloader.completed, 1)
+        downloader = await self._run(server)
+        self.assertEqual(downloader.skipped, 1)
+        self.assertEqual(len(server.ranges), 1)
+
+    async def test_resume_partial_file_with_range(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path + ".part", "wb") as f:
+            f.write(PAYLOAD[:1000])
+        server = FakeMediaServer()
+        downloader = await self._run(server)
+        self._assert_complete()
+        self.assertEqual(server.ranges, ["bytes=1000-"])
+        self.assertEqual(downloader.resumed, 1)
+
+    async def test_server_without_range_restarts(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path + ".part", "wb") as f:
+            f.write(b"stale")
+        await self._run(FakeMediaServer(support_range=False))
+        self._assert_complete()
+
+    async def test_interrupted_download_is_resumed(self):
+        server = FakeMediaServer(break_first=True)
+        downloader = await self._run(server, max_attempts=2)
+        self._assert_complete()
+        # 只有完整写入磁盘的块才会被续传
+        self.assertIsNone(server.ranges[0])
+        resumed_from = int(server.ranges[1][len("bytes="):-1])
+        self.assertTrue(0 < resumed_from <= len(PAYLOAD) // 3)
+        self.assertEqual(downloader.failed, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -26,7 +26,9 @@ import time
 from unittest import IsolatedAsyncioTestCase
 from unittest.mock import AsyncMock, MagicMock
 
+from proxy.proxy_health import ProxyHealth, proxy_key
 from proxy.proxy_ip_pool import create_ip_pool, ProxyIpPool
+from proxy.proxy_mixin import ProxyRefreshMixin
 from proxy.types import IpInfoModel
 
 
@@ -269,3 +271,106 @@ class TestIpPool(IsolatedAsyncioTestCase):
         self.assertTrue(is_expired, msg="已过期的代理应该返回True")
 
         print("\n=== 独立IP代理过期检测测试完成 ===\n")
+
+
+def _ip(i: int, expired_time_ts=None) -> IpInfoModel:
+    return IpInfoModel(ip=f"10.0.0.{i}", port=8000 + i, user="", password="", expired_time_ts=expired_time_ts)
+
+
+class _Client(ProxyRefreshMixin):
+    def __init__(self, proxy_ip_pool: ProxyIpPool):
+        self.proxy = None
+        self.changes = []
+        self.init_proxy_pool(proxy_ip_pool)
+
+    def _on_proxy_changed(self, old_proxy, new_proxy):
+        self.changes.append((old_proxy, new_proxy))
+
+
+class TestProxyHealthPool(IsolatedAsyncioTestCase):
+    """代理池健康度、加权抽取与剔除（不依赖真实代理提供商）"""
+
+    async def asyncSetUp(self):
+        self.provider = MagicMock()
+        self.provider.get_proxy = AsyncMock(return_value=[_ip(1), _ip(2), _ip(3)])
+        self.pool = ProxyIpPool(ip_pool_count=3, enable_validate_ip=True, ip_provider=self.provider)
+        self.pool.maintain_interval = 3600
+
+        async def fake_validate(proxy):
+            if proxy.ip == "10.0.0.3":
+                return False
+            health = ProxyHealth(proxy)
+            health.record_success(0.1)
+            self.pool._health[health.key] = health
+            return True
+
+        self.pool._is_valid_proxy = AsyncMock(side_effect=fake_validate)
+        await self.pool.start()
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+
+    async def test_get_proxy_from_warm_set_without_network(self):
+        self.assertEqual(self.pool.stats()["available"], 2)
+        self.assertEqual(self.pool._is_valid_proxy.await_count, 3)
+        self.provider.get_proxy.reset_mock()
+        for _ in range(20):
+            proxy = await self.pool.get_proxy()
+            self.assertIn(proxy.ip, ("10.0.0.1", "10.0.0.2"))
+        self.assertEqual(self.pool._is_valid_proxy.await_count, 3)
+
+    async def test_latency_weighted_selection(self):
+        fast, slow = _ip(1), _ip(2)
+        for _ in range(10):
+            self.pool.report_success(fast, 0.05)
+            self.pool.report_success(slow, 2.0)
+        self.pool._picker_dirty = True
+        self.pool.current_proxy = None
+        picks = [self.pool._pick().proxy.ip for _ in range(2000)]
+        self.assertGreater(picks.count("10.0.0.1"), picks.count("10.0.0.2") * 5)
+
+    async def test_evict_after_consecutive_failures(self):
+        self.pool.current_proxy = _ip(1)
+        for _ in range(self.pool.evict_after_failures):
+            self.pool.report_failure(_ip(1), "ReadTimeout")
+        self.assertIsNone(self.pool.current_proxy)
+        self.assertTrue(self.pool.is_current_proxy_expired())
+        proxy = await self.pool.get_or_refresh_proxy()
+        self.assertEqual(proxy.ip, "10.0.0.2")
+        self.assertEqual(self.pool.evicted, 1)
+
+    async def test_expired_proxy_not_selected(self):
+        self.pool._health[proxy_key(_ip(1))].proxy = _ip(1, expired_time_ts=int(time.time()) - 60)
+        for _ in range(10):
+            self.assertEqual((await self.pool.get_proxy()).ip, "10.0.0.2")
+
+
+    async def test_rotate_ahead_of_expiry(self):
+        client = _Client(self.pool)
+        await self.pool.get_proxy()
+        current = self.pool.current_proxy
+        # 40 秒后过期，已进入 60 秒的提前刷新窗口，但还没到请求路径的 30 秒缓冲
+        current.expired_time_ts = int(time.time()) + 40
+        self.provider.get_proxy.reset_mock()
+        await self.pool._refresh_once()
+        self.assertNotEqual(proxy_key(self.pool.current_proxy), proxy_key(current))
+        self.assertEqual(client.proxy, f"http://{self.pool.current_proxy.ip}:{self.pool.current_proxy.port}")
+        self.assertEqual(client.changes[-1][1], client.proxy)
+        stats = self.pool.stats()["refresh"]
+        self.assertEqual(stats["proactive_rotations"], 1)
+        self.assertEqual(stats["inline_refreshes"], 0)
+
+    async def test_request_path_uses_prepared_successor(self):
+        client = _Client(self.pool)
+        await self.pool.get_proxy()
+        successor = await self.pool._prepare_successor()
+        self.assertIsNotNone(successor)
+        self.pool.current_proxy.expired_time_ts = int(time.time()) + 10
+        self.provider.get_proxy.reset_mock()
+        validate_calls = self.pool._is_valid_proxy.await_count
+        await client._refresh_proxy_if_expired()
+        self.assertIs(self.pool.current_proxy, successor)
+        self.assertEqual(client.proxy, f"http://{successor.ip}:{successor.port}")
+        self.provider.get_proxy.assert_not_awaited()
+        self.assertEqual(self.pool._is_valid_proxy.await_count, validate_calls)
+        self.assertEqual(self.pool.inline_refreshes, 0)
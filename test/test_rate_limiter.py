@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_rate_limiter.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 自适应限速器测试
+
+import asyncio
+import time
+from unittest import IsolatedAsyncioTestCase
+
+from tools.rate_limiter import AdaptiveRateController, TokenBucket, WeightedFairGate
+
+
+class TestTokenBucket(IsolatedAsyncioTestCase):
+
+    async def test_burst_then_paced(self):
+        bucket = TokenBucket(rate=20, capacity=2)
+        start = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        elapsed = time.monotonic() - start
+        # 前 2 个令牌来自突发容量，后 2 个需要按 20 req/s 等待约 0.1 秒
+        self.assertGreaterEqual(elapsed, 0.08)
+        self.assertLess(elapsed, 0.5)
+
+
+class TestAdaptiveRateController(IsolatedAsyncioTestCase):
+
+    async def test_aimd(self):
+        controller = AdaptiveRateController(
+            initial_rate=2.0, min_rate=0.5, max_rate=2.2, increase_step=0.1,
+            recover_after=3, decrease_factor=0.5, backoff_seconds=0.1,
+        )
+        controller.on_throttled("verify 461")
+        self.assertAlmostEqual(controller.rate, 1.0)
+        # 退避期内的限流信号不会重复降速
+        controller.on_throttled("verify 461")
+        self.assertAlmostEqual(controller.rate, 1.0)
+        self.assertEqual(controller.throttled, 2)
+
+        for _ in range(3):
+            controller.on_success()
+        self.assertAlmostEqual(controller.rate, 1.1)
+
+        start = time.monotonic()
+        await controller.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    async def test_rate_bounds(self):
+        controller = AdaptiveRateController(
+            initial_rate=1.0, min_rate=0.8, max_rate=1.05, increase_step=0.1,
+            recover_after=1, decrease_factor=0.1, backoff_seconds=0,
+        )
+        controller.on_success()
+        self.assertAlmostEqual(controller.rate, 1.05)
+        controller.on_throttled("ip block")
+        self.assertAlmostEqual(controller.rate, 0.8)
+
+
+class CountingLimiter:
+    """每次 acquire 等待 release 放行一个令牌，记录取走的令牌数"""
+
+    def __init__(self):
+        self.tokens = asyncio.Semaphore(0)
+        self.acquired = 0
+
+    async def acquire(self) -> None:
+        await self.tokens.acquire()
+        self.acquired += 1
+
+    def release(self) -> None:
+        self.tokens.release()
+
+
+class TestWeightedFairGate(IsolatedAsyncioTestCase):
+
+    async def test_weighted_round_robin(self):
+        gate = WeightedFairGate(TokenBucket(rate=200, capacity=1), weights={"a": 2})
+        order = []
+
+        async def worker(key: str, n: int):
+            for _ in range(n):
+                await gate.acquire(key)
+                order.append(key)
+
+        # a 请求密集，b、c 请求较少，放行顺序按 2:1:1 交替，而不是 a 先占满
+        await asyncio.gather(worker("a", 20), worker("b", 5), worker("c", 5))
+        first = order[:12]
+        self.assertEqual(first.count("a"), 6)
+        self.assertEqual(first.count("b"), 3)
+        self.assertEqual(first.count("c"), 3)
+        self.assertEqual(gate.stats(), {"a": 20, "b": 5, "c": 5})
+
+    async def test_cancelled_waiter_is_skipped(self):
+        gate = WeightedFairGate(TokenBucket(rate=50, capacity=1))
+        await gate.acquire("a")
+        waiter = asyncio.create_task(gate.acquire("a"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.wait_for(gate.acquire("b"), timeout=1)
+        self.assertEqual(gate.stats(), {"a": 1, "b": 1})
+
+    async def test_token_of_cancelled_waiters_is_kept(self):
+        limiter = CountingLimiter()
+        gate = WeightedFairGate(limiter)
+        waiter = asyncio.create_task(gate.acquire("a"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        # 放行任务已在等待令牌，取到后没有等待者，令牌留给下一个调用方
+        limiter.release()
+        await asyncio.sleep(0.01)
+        self.assertEqual(limiter.acquired, 1)
+        await asyncio.wait_for(gate.acquire("b"), timeout=1)
+        self.assertEqual(limiter.acquired, 1)
+        self.assertEqual(gate.stats(), {"b": 1})
+
+    async def test_close_stops_dispatcher(self):
+        limiter = CountingLimiter()
+        gate = WeightedFairGate(limiter)
+        waiter = asyncio.create_task(gate.acquire("a"))
+        await asyncio.sleep(0.01)
+        dispatcher = gate._dispatcher
+        await gate.close()
+        self.assertTrue(dispatcher.cancelled())
+        with self.assertRaises(RuntimeError):
+            await waiter
+        with self.assertRaises(RuntimeError):
+            await gate.acquire("a")
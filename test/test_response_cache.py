@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_response_cache.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : SQLite 缓存与接口响应缓存测试
+
+import os
+import tempfile
+import time
+import unittest
+
+from cache.response_cache import CacheMode, ResponseCache
+from cache.sqlite_cache import SqliteCache
+
+
+class TestSqliteCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = SqliteCache(os.path.join(self.tmp_dir.name, "cache.db"))
+
+    def test_set_and_get(self):
+        self.cache.set('key', {'comments': [1, 2, 3]}, 10)
+        self.assertEqual(self.cache.get('key'), {'comments': [1, 2, 3]})
+        self.assertEqual(self.cache.keys('k*'), ['key'])
+
+    def test_expired_key(self):
+        self.cache.set('key', 'value', 1)
+        time.sleep(1.2)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(self.cache.keys('*'), [])
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.backend = SqliteCache(os.path.join(self.tmp_dir.name, "cache.db"))
+
+    def test_read_write(self):
+        cache = ResponseCache(self.backend, CacheMode.READ_WRITE, ttls={"note_comments": 60, "note_detail": 0})
+        self.assertIsNone(cache.get("note_comments", "n1", "c1"))
+        cache.set("note_comments", "n1", {"cursor": "c2"}, "c1")
+        self.assertEqual(cache.get("note_comments", "n1", "c1"), {"cursor": "c2"})
+        # 不同游标互不影响
+        self.assertIsNone(cache.get("note_comments", "n1", "c2"))
+        # ttl 为 0 的接口不缓存
+        cache.set("note_detail", "n1", {"title": "t"})
+        self.assertIsNone(cache.get("note_detail", "n1"))
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_modes(self):
+        ResponseCache(self.backend, CacheMode.READ_WRITE).set("note_detail", "n1", {"title": "old"})
+
+        read_only = ResponseCache(self.backend, CacheMode.READ_ONLY)
+        read_only.set("note_detail", "n1", {"title": "ignored"})
+        self.assertEqual(read_only.get("note_detail", "n1"), {"title": "old"})
+
+        refresh = ResponseCache(self.backend, CacheMode.REFRESH)
+        self.assertIsNone(refresh.get("note_detail", "n1"))
+        refresh.set("note_detail", "n1", {"title": "new"})
+        self.assertEqual(read_only.get("note_detail", "n1"), {"title": "new"})
+
+        with self.assertRaises(ValueError):
+            ResponseCache(self.backend, "unknown")
+
+    def tearDown(self):
+        self.backend.close()
+        self.tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
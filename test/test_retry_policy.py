@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_retry_policy.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 重试策略测试：按失败类型重试、重试预算、接口熔断与恢复
+
+import time
+import unittest
+
+from tools.retry_policy import BreakerOpenError, CircuitBreaker, FailureClass, RetryBudget, RetryPolicy
+
+
+class TransientError(Exception):
+    pass
+
+
+class PermanentError(Exception):
+    pass
+
+
+def _classify(exc: BaseException) -> FailureClass:
+    return FailureClass.TRANSIENT if isinstance(exc, TransientError) else FailureClass.PERMANENT
+
+
+class FlakyCall:
+    def __init__(self, failures: int, exc: Exception = None):
+        self.failures = failures
+        self.exc = exc or TransientError("boom")
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.exc
+        return "ok"
+
+
+def _policy(**kwargs) -> RetryPolicy:
+    kwargs.setdefault("base_delay", 0)
+    kwargs.setdefault("throttled_base_delay", 0)
+    return RetryPolicy(classify=_classify, **kwargs)
+
+
+class TestRetryPolicy(unittest.IsolatedAsyncioTestCase):
+
+    async def test_transient_failure_is_retried(self):
+        call = FlakyCall(failures=2)
+        self.assertEqual(await _policy(max_attempts=3).call("search", call), "ok")
+        self.assertEqual(call.calls, 3)
+
+    async def test_permanent_failure_is_not_retried(self):
+        call = FlakyCall(failures=1, exc=PermanentError("gone"))
+        with self.assertRaises(PermanentError):
+            await _policy(max_attempts=3).call("feed", call)
+        self.assertEqual(call.calls, 1)
+
+    async def test_retry_budget_limits_retries(self):
+        policy = _policy(max_attempts=5, budget=RetryBudget(ratio=0, min_retries=2), failure_threshold=100)
+        call = FlakyCall(failures=10)
+        with self.assertRaises(TransientError):
+            await policy.call("comment_page", call)
+        self.assertEqual(call.calls, 3)
+        self.assertEqual(policy.budget.stats(), {"requests": 3, "retries": 2, "denied": 1})
+
+    async def test_open_circuit_sheds_load(self):
+        policy = _policy(max_attempts=10, failure_threshold=3, recovery_seconds=60)
+        call = FlakyCall(failures=100)
+        with self.assertRaises(TransientError):
+            await policy.call("sub_comment_page", call)
+        self.assertEqual(call.calls, 3)
+        with self.assertRaises(BreakerOpenError):
+            await policy.call("sub_comment_page", call)
+        self.assertEqual(call.calls, 3)
+        # 其他接口不受影响
+        self.assertEqual(await policy.call("search", FlakyCall(failures=0)), "ok")
+
+    async def test_half_open_probe_closes_circuit(self):
+        policy = _policy(max_attempts=1, failure_threshold=1, recovery_seconds=0.05)
+        with self.assertRaises(TransientError):
+            await policy.call("user_posted", FlakyCall(failures=1))
+        self.assertEqual(policy.breaker("user_posted").state, CircuitBreaker.OPEN)
+        time.sleep(0.06)
+        self.assertEqual(await policy.call("user_posted", FlakyCall(failures=0)), "ok")
+        self.assertEqual(policy.breaker("user_posted").state, CircuitBreaker.CLOSED)
+
+    async def test_unclassified_error_does_not_close_half_open_circuit(self):
+        from media_platform.xhs.exception import DataFetchError, classify_failure
+
+        policy = RetryPolicy(classify=classify_failure, max_attempts=3, base_delay=0, failure_threshold=1, recovery_seconds=0.05)
+        with self.assertRaises(DataFetchError):
+            await policy.call("feed", FlakyCall(failures=1, exc=DataFetchError("timeout")))
+        breaker = policy.breaker("feed")
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        time.sleep(0.06)
+        # 半开探测遇到代码错误：不重试，熔断器保持半开，下一次请求可以继续探测
+        call = FlakyCall(failures=1, exc=ValueError("bad response"))
+        with self.assertRaises(ValueError):
+            await policy.call("feed", call)
+        self.assertEqual(call.calls, 1)
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(DataFetchError):
+            await policy.call("feed", FlakyCall(failures=1, exc=DataFetchError("timeout")))
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    async def test_platform_open_error_is_catchable_by_both_hierarchies(self):
+        from media_platform.xhs.exception import CircuitOpenError, DataFetchError
+
+        policy = _policy(max_attempts=1, failure_threshold=1, recovery_seconds=60, open_error=CircuitOpenError)
+        with self.assertRaises(TransientError):
+            await policy.call("feed", FlakyCall(failures=1))
+        with self.assertRaises(DataFetchError) as ctx:
+            await policy.call("feed", FlakyCall(failures=0))
+        self.assertIsInstance(ctx.exception, BreakerOpenError)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_half_open_allows_single_probe(self):
+        breaker = CircuitBreaker("feed", failure_threshold=1, recovery_seconds=0)
+        breaker.on_failure()
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.on_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+
+if __name__ == "__main__":
+    unittest.main()
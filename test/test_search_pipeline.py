@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_search_pipeline.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 搜索流水线测试：有界队列背压、中途停止时逐级收尾、单个阶段出错不阻塞其他阶段、评论总量上限
+
+import asyncio
+import unittest
+from typing import Dict, List, Optional
+from unittest import mock
+
+import config
+from media_platform.xhs import search_pipeline
+from media_platform.xhs.search_pipeline import SearchPipeline
+
+
+class StubClient:
+    def __init__(self, pages: int = 5):
+        self.pages = pages
+        self.requested: List[int] = []
+
+    async def get_note_by_keyword(self, keyword, search_id, page, sort) -> Dict:
+        self.requested.append(page)
+        return {
+            "has_more": page < self.pages,
+            "items": [{"id": f"{page}-{i}", "xsec_token": "token"} for i in range(20)],
+        }
+
+
+class StubCrawler:
+    """只实现流水线用到的爬虫接口，每篇笔记返回 comments_per_note 条评论"""
+
+    def __init__(self, pages: int = 5, comments_per_note: int = 2, max_total_comments: int = 10_000):
+        self.xhs_client = StubClient(pages)
+        self.stop_requested = False
+        self.comments_limit_reached = False
+        self.comment_budget = None
+        self.checkpoint = None
+        self.watermark_store = None
+        self.note_dedup = None
+        self.time_window = None
+        self.comments_per_note = comments_per_note
+        self.max_total_comments = max_total_comments
+        self.total_comments_collected = 0
+        self.detail_calls: List[str] = []
+        self.comment_calls: List[str] = []
+        self.detail_hook = None
+
+    def _is_search_item_unchanged(self, post_item: Dict) -> bool:
+        return False
+
+    async def get_note_detail_async_task(self, note_id, xsec_source, xsec_token, semaphore) -> Optional[Dict]:
+        self.detail_calls.append(note_id)
+        if self.detail_hook is not None:
+            await self.detail_hook(note_id)
+        return {"note_id": note_id, "xsec_token": xsec_token}
+
+    async def get_notice_media(self, note_detail: Dict) -> None:
+        pass
+
+    def _commit_watermark(self, note_id: str, comments=None) -> None:
+        pass
+
+    def _reserve_comment_quota(self, comments: List[Dict]) -> List[Dict]:
+        if self.stop_requested or self.comments_limit_reached or not comments:
+            return []
+        sliced = comments[: self.max_total_comments - self.total_comments_collected]
+        self.total_comments_collected += len(sliced)
+        if self.total_comments_collected >= self.max_total_comments:
+            self.comments_limit_reached = True
+        return sliced
+
+    async def get_comments(self, note_id, xsec_token, semaphore, callback=None, resume=None, on_page_done=None,
+                           commit_watermark=True):
+        async with semaphore:
+            if self.stop_requested or self.comments_limit_reached:
+                return None
+            self.comment_calls.append(note_id)
+            comments = [{"id": f"{note_id}-c{i}"} for i in range(self.comments_per_note)]
+            await callback(note_id, comments)
+            return comments
+
+
+class TestSearchPipeline(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.stored_notes: List[str] = []
+        self.stored_comments: List[str] = []
+        patches = [
+            mock.patch.multiple(
+                config,
+                CRAWLER_MAX_NOTES_COUNT=100,
+                START_PAGE=1,
+                SORT_TYPE="",
+                ENABLE_GET_COMMENTS=True,
+                XHS_PIPELINE_QUEUE_SIZE=2,
+                XHS_PIPELINE_DETAIL_CONCURRENCY=2,
+                XHS_PIPELINE_COMMENT_CONCURRENCY=2,
+            ),
+            mock.patch.object(search_pipeline.xhs_store, "update_xhs_note", self._store_note),
+            mock.patch.object(search_pipeline.xhs_store, "batch_update_xhs_note_comments", self._store_comments),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def _store_note(self, note_detail: Dict) -> None:
+        self.stored_notes.append(note_detail["note_id"])
+
+    async def _store_comments(self, note_id: str, comments: List[Dict]) -> None:
+        self.stored_comments.extend(c["id"] for c in comments)
+
+    async def _run(self, crawler: StubCrawler) -> SearchPipeline:
+        pipeline = SearchPipeline(crawler, "keyword")
+        async with asyncio.timeout(5):
+            await pipeline.run()
+        return pipeline
+
+    async def test_full_run(self):
+        crawler = StubCrawler(pages=5)
+        pipeline = await self._run(crawler)
+        self.assertTrue(pipeline.search_completed)
+        self.assertEqual(len(self.stored_notes), 80)
+        self.assertEqual(len(self.stored_comments), 160)
+
+    async def test_bounded_queues_pause_search(self):
+        crawler = StubCrawler(pages=5)
+        release = asyncio.Event()
+
+        async def blocked(note_id: str) -> None:
+            await release.wait()
+
+        crawler.detail_hook = blocked
+        run = asyncio.create_task(self._run(crawler))
+        await asyncio.sleep(0.1)
+        # 详情阶段卡住时搜索阶段停在第一页：2 个详情任务各持有一条，队列中 2 条
+        self.assertEqual(crawler.xhs_client.requested, [1])
+        self.assertEqual(len(crawler.detail_calls), 2)
+        self.assertEqual(self.stored_notes, [])
+        release.set()
+        pipeline = await run
+        self.assertTrue(pipeline.search_completed)
+        self.assertEqual(len(self.stored_notes), 80)
+
+    async def test_stop_requested_shuts_down_in_order(self):
+        crawler = StubCrawler(pages=5)
+
+        async def stop_after_some(note_id: str) -> None:
+            if len(crawler.detail_calls) == 10:
+                crawler.stop_requested = True
+
+        crawler.detail_hook = stop_after_some
+        pipeline = await self._run(crawler)
+        self.assertFalse(pipeline.search_completed)
+        # 停止后不再翻页、不再请求详情和评论
+        self.assertLessEqual(len(crawler.xhs_client.requested), 2)
+        self.assertEqual(len(crawler.detail_calls), 10)
+        self.assertLessEqual(len(crawler.comment_calls), len(self.stored_notes))
+        self.assertLessEqual(len(self.stored_notes), 10)
+
+    async def test_stage_error_does_not_hang_pipeline(self):
+        crawler = StubCrawler(pages=2)
+
+        async def flaky_detail(note_id: str) -> None:
+            if note_id == "1-3":
+                raise RuntimeError("detail failed")
+
+        async def flaky_store(note_id: str, comments: List[Dict]) -> None:
+            if note_id == "1-5":
+                raise RuntimeError("store failed")
+            await self._store_comments(note_id, comments)
+
+        crawler.detail_hook = flaky_detail
+        with mock.patch.object(search_pipeline.xhs_store, "batch_update_xhs_note_comments", flaky_store):
+            pipeline = await self._run(crawler)
+        self.assertTrue(pipeline.search_completed)
+        self.assertEqual(len(self.stored_notes), 19)
+        self.assertNotIn("1-3", self.stored_notes)
+        self.assertEqual(len(self.stored_comments), 36)
+        self.assertNotIn("1-5-c0", self.stored_comments)
+
+    async def test_comments_limit_cuts_off_comment_fetching(self):
+        crawler = StubCrawler(pages=5, comments_per_note=5, max_total_comments=12)
+        pipeline = await self._run(crawler)
+        self.assertTrue(crawler.comments_limit_reached)
+        self.assertEqual(len(self.stored_comments), 12)
+        # 达到上限后笔记仍然入库，但不再请求评论
+        self.assertEqual(len(self.stored_notes), 80)
+        self.assertLessEqual(len(crawler.comment_calls), 3 + pipeline.comment_concurrency)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_sign_context.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 签名上下文测试：b1 缓存命中不再读取 localStorage、失效后重新读取、签名被拒时失效并重新签名
+
+import unittest
+
+import httpx
+
+from media_platform.xhs.client import XiaoHongShuClient
+from media_platform.xhs.sign_context import XhsSignContext
+from media_platform.xhs.sign_service import PlaywrightSignService
+
+
+class FakeSignPage:
+    """模拟签名页面，记录每次签名时是否读取了 localStorage 中的 b1"""
+
+    def __init__(self):
+        self.b1 = "b1-v1"
+        self.read_b1 = []
+
+    async def evaluate(self, expression, args):
+        items, read_b1 = args
+        self.read_b1.append(read_b1)
+        return {"b1": self.b1 if read_b1 else None, "signs": ["x3"] * len(items)}
+
+
+class FakeHttpClient:
+    """按顺序返回预设的响应"""
+
+    def __init__(self, bodies):
+        self.bodies = list(bodies)
+        self.headers = []
+
+    async def request(self, method, url, **kwargs):
+        self.headers.append(kwargs["headers"])
+        return httpx.Response(200, json=self.bodies.pop(0))
+
+
+class TestXhsSignContext(unittest.IsolatedAsyncioTestCase):
+
+    async def test_cached_b1_skips_localstorage(self):
+        page = FakeSignPage()
+        context = XhsSignContext({"a1": "a1-v"})
+        service = PlaywrightSignService(page, batch_window_ms=0, sign_context=context)
+        await service.sign("/api/a", {"k": 1})
+        await service.sign("/api/b", {"k": 2})
+        self.assertEqual(page.read_b1, [True, False])
+        self.assertEqual(context.stats(), {"hits": 1, "misses": 1, "invalidations": 0})
+        self.assertEqual(context.get_b1(), "b1-v1")
+
+    async def test_invalidate_reloads_b1(self):
+        page = FakeSignPage()
+        context = XhsSignContext({"a1": "a1-v"})
+        service = PlaywrightSignService(page, batch_window_ms=0, sign_context=context)
+        await service.sign("/api/a", {})
+        page.b1 = "b1-v2"
+        context.invalidate("test")
+        await service.sign("/api/a", {})
+        self.assertEqual(page.read_b1, [True, True])
+        self.assertEqual(context.get_b1(), "b1-v2")
+
+        context.update_cookies({"a1": "a1-new"})
+        await service.sign("/api/a", {})
+        self.assertEqual(page.read_b1, [True, True, True])
+        self.assertEqual(context.a1, "a1-new")
+        self.assertEqual(context.invalidations, 2)
+
+    async def test_sign_error_response_invalidates_and_resigns(self):
+        page = FakeSignPage()
+        client = XiaoHongShuClient(headers={}, playwright_page=page, cookie_dict={"a1": "a1-v"})
+        self.addAsyncCleanup(client.close)
+        http = FakeHttpClient([
+            {"success": False, "code": client.SIGN_ERROR_CODE, "msg": "sign error"},
+            {"success": True, "code": 0, "data": {"ok": 1}},
+        ])
+        client._client_pool.get_client = lambda proxy: http
+        await client._sign_service.sign("/api/warmup", {})
+        self.assertEqual(page.read_b1, [True])
+
+        self.assertEqual(await client.get("/api/sns/web/v1/user/me", {"k": "v"}), {"ok": 1})
+        # 第一次签名使用缓存的 b1；签名被拒后上下文失效，重新签名时重新读取 b1
+        self.assertEqual(page.read_b1, [True, False, True])
+        self.assertEqual(client._sign_context.invalidations, 1)
+        self.assertEqual(len(http.headers), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
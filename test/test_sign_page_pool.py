@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_sign_page_pool.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 签名页面池测试：最空闲页面分配、崩溃/跳转页面替换与重试、回退页面
+
+import asyncio
+import unittest
+
+from media_platform.xhs.sign_page_pool import SignPagePool
+
+INDEX_URL = "https://www.xiaohongshu.com"
+
+
+class FakePage:
+    def __init__(self, name: str):
+        self.name = name
+        self.url = "about:blank"
+        self.closed = False
+
+    async def goto(self, url, **kwargs):
+        self.url = url
+
+    async def wait_for_function(self, expression, **kwargs):
+        pass
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowserContext:
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.created = 0
+
+    async def new_page(self) -> FakePage:
+        if self.failures > 0:
+            self.failures -= 1
+            raise TimeoutError("network down")
+        self.created += 1
+        return FakePage(f"page{self.created}")
+
+
+class TestSignPagePool(unittest.IsolatedAsyncioTestCase):
+
+    async def _pool(self, size: int = 3, **kwargs) -> SignPagePool:
+        kwargs.setdefault("replace_retry_delay", 0.01)
+        pool = SignPagePool(FakeBrowserContext(), size, INDEX_URL, **kwargs)
+        await pool.start()
+        self.addAsyncCleanup(pool.close)
+        return pool
+
+    async def _wait_replaced(self, pool: SignPagePool) -> None:
+        async with asyncio.timeout(2):
+            while pool._replace_tasks:
+                await asyncio.sleep(0.01)
+
+    async def test_pick_least_inflight_page(self):
+        pool = await self._pool()
+        async with pool.acquire() as first:
+            async with pool.acquire() as second:
+                self.assertIsNot(first, second)
+                async with pool.acquire() as third:
+                    self.assertNotIn(third, (first, second))
+            # second 已释放，与 third 同为空闲
+            async with pool.acquire() as page:
+                self.assertIsNot(page, first)
+        self.assertEqual(sum(p["total"] for p in pool.stats()), 4)
+
+    async def test_replace_crashed_and_navigated_pages(self):
+        pool = await self._pool()
+        crashed, navigated = pool._pages[0].page, pool._pages[1].page
+        crashed.closed = True
+        navigated.url = "https://example.com/login"
+        async with pool.acquire() as page:
+            self.assertIs(page, pool._pages[2].page)
+        await self._wait_replaced(pool)
+        self.assertEqual(pool.replacements, 2)
+        self.assertTrue(navigated.closed)
+        pages = [p.page for p in pool._pages]
+        self.assertNotIn(crashed, pages)
+        self.assertNotIn(navigated, pages)
+        self.assertTrue(all(p.healthy for p in pool._pages))
+
+    async def test_failed_sign_marks_page_unhealthy(self):
+        pool = await self._pool(size=1)
+        with self.assertRaises(RuntimeError):
+            async with pool.acquire() as page:
+                raise RuntimeError("evaluate failed")
+        self.assertFalse(pool._pages[0].healthy)
+        await self._wait_replaced(pool)
+        self.assertIsNot(pool._pages[0].page, page)
+        self.assertEqual(pool.stats()[0]["failures"], 1)
+
+    async def test_replace_retries_until_success(self):
+        pool = await self._pool(size=1)
+        pool.browser_context.failures = 3
+        pool.mark_unhealthy(pool._pages[0].page)
+        await self._wait_replaced(pool)
+        self.assertTrue(pool._pages[0].healthy)
+        self.assertEqual(pool.replacements, 1)
+        self.assertEqual(pool.browser_context.failures, 0)
+
+    async def test_close_stops_retrying(self):
+        pool = await self._pool(size=1, replace_retry_delay=60)
+        pool.browser_context.failures = 100
+        pool.mark_unhealthy(pool._pages[0].page)
+        await asyncio.sleep(0.01)
+        await pool.close()
+        self.assertEqual(pool._replace_tasks, set())
+        self.assertEqual(pool.replacements, 0)
+
+    async def test_fallback_page_when_no_page_usable(self):
+        fallback = FakePage("fallback")
+        pool = await self._pool(size=2, fallback_page=fallback, replace_retry_delay=60)
+        pool.browser_context.failures = 100
+        for sign_page in pool._pages:
+            sign_page.page.closed = True
+        async with pool.acquire() as page:
+            self.assertIs(page, fallback)
+
+        pool.fallback_page = None
+        with self.assertRaises(RuntimeError):
+            async with pool.acquire():
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
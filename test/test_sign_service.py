@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_sign_service.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 批量签名服务测试：并发签名合并为一次 evaluate、结果分发、整批失败
+
+import asyncio
+import unittest
+
+from media_platform.xhs.exception import SignError
+from media_platform.xhs.playwright_sign import _build_xs_payload, _md5_hex
+from media_platform.xhs.sign_service import PlaywrightSignService
+
+
+class FakeSignPage:
+    """模拟已加载 window.mnsv2 的页面，签名结果为 x3-<md5>"""
+
+    def __init__(self, b1: str = "b1-value", error: Exception = None):
+        self.b1 = b1
+        self.error = error
+        self.batches = []
+        self.b1_reads = 0
+
+    async def evaluate(self, expression, args):
+        items, read_b1 = args
+        self.batches.append([sign_str for sign_str, _ in items])
+        if self.error is not None:
+            raise self.error
+        if read_b1:
+            self.b1_reads += 1
+        return {"b1": self.b1 if read_b1 else None, "signs": [f"x3-{md5}" for _, md5 in items]}
+
+
+class TestPlaywrightSignService(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_signs_share_one_evaluate(self):
+        page = FakeSignPage()
+        service = PlaywrightSignService(page, batch_window_ms=20, max_batch_size=16)
+        uris = [f"/api/sns/web/v1/feed/{i}" for i in range(5)]
+        results = await asyncio.gather(*[service.sign(uri, {"i": i}, a1="a1") for i, uri in enumerate(uris)])
+        self.assertEqual(len(page.batches), 1)
+        self.assertEqual(page.batches[0], [f'{uri}{{"i":{i}}}' for i, uri in enumerate(uris)])
+        # 每个请求拿到自己的签名
+        for sign_str, headers in zip(page.batches[0], results):
+            self.assertEqual(headers["x-s"], _build_xs_payload(f"x3-{_md5_hex(sign_str)}", "object"))
+        self.assertEqual(len({h["x-s"] for h in results}), 5)
+
+    async def test_max_batch_size_flushes_immediately(self):
+        page = FakeSignPage()
+        service = PlaywrightSignService(page, batch_window_ms=10_000, max_batch_size=2)
+        async with asyncio.timeout(1):
+            await asyncio.gather(*[service.sign(f"/api/{i}", {}, a1="a1") for i in range(4)])
+        self.assertEqual([len(batch) for batch in page.batches], [2, 2])
+
+    async def test_failed_evaluate_fails_whole_batch(self):
+        page = FakeSignPage(error=RuntimeError("Target page, context or browser has been closed"))
+        service = PlaywrightSignService(page, batch_window_ms=20)
+        results = await asyncio.gather(*[service.sign(f"/api/{i}", {}, a1="a1") for i in range(3)], return_exceptions=True)
+        self.assertEqual(len(page.batches), 1)
+        self.assertTrue(all(isinstance(r, SignError) for r in results))
+
+        # 下一批正常签名
+        page.error = None
+        headers = await service.sign("/api/ok", {}, a1="a1")
+        self.assertTrue(headers["x-s"].startswith("XYS_"))
+        self.assertEqual(len(page.batches), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_store_registry.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 运行级存储注册表测试：实例复用与 open/flush/close 生命周期
+
+import unittest
+from typing import Dict
+
+from base.base_crawler import AbstractStore
+from store.store_registry import StoreRegistry
+
+
+class _Store(AbstractStore):
+    created = 0
+
+    def __init__(self):
+        _Store.created += 1
+        self.items = []
+        self.flushes = 0
+        self.closed = False
+
+    async def store_content(self, content_item: Dict):
+        self.items.append(content_item)
+
+    async def store_comment(self, comment_item: Dict):
+        self.items.append(comment_item)
+
+    async def store_creator(self, creator: Dict):
+        self.items.append(creator)
+
+    def flush(self):
+        self.flushes += 1
+
+    async def close(self):
+        self.closed = True
+
+
+class TestStoreRegistry(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        _Store.created = 0
+        self.registry = StoreRegistry()
+
+    async def test_reuse_store_within_run(self):
+        self.registry.open()
+        key = ("xhs", "jsonl", "search")
+        for i in range(100):
+            await self.registry.get(key, _Store).store_content({"i": i})
+        self.assertEqual(_Store.created, 1)
+        self.assertEqual(len(self.registry.get(key, _Store).items), 100)
+        self.assertIsNot(self.registry.get(("xhs", "jsonl", "detail"), _Store), self.registry.get(key, _Store))
+        self.assertEqual(_Store.created, 2)
+
+    async def test_new_store_per_call_when_not_opened(self):
+        self.assertIsNot(self.registry.get("k", _Store), self.registry.get("k", _Store))
+        self.assertEqual(_Store.created, 2)
+
+    async def test_flush_then_close(self):
+        self.registry.open()
+        store = self.registry.get("k", _Store)
+        await self.registry.flush()
+        await self.registry.close()
+        # flush 之后没有新写入，close 不再重复 flush
+        self.assertEqual(store.flushes, 1)
+        self.assertTrue(store.closed)
+        self.assertFalse(self.registry.opened)
+
+    async def test_close_flushes_pending_writes(self):
+        # 运行被中断、没有走到 flush 时，close 负责写出数据
+        self.registry.open()
+        store = self.registry.get("k", _Store)
+        await self.registry.close()
+        self.assertEqual(store.flushes, 1)
+        self.assertTrue(store.closed)
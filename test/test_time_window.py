@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_time_window.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 爬取时间窗口测试
+
+import unittest
+from datetime import datetime
+
+from media_platform.xhs.time_window import NoteTimeWindow, parse_publish_time_text
+
+
+def ms(*args) -> int:
+    return int(datetime(*args).timestamp() * 1000)
+
+
+class TestParsePublishTime(unittest.TestCase):
+
+    def test_formats(self):
+        now = datetime(2025, 3, 10, 12, 0, 0)
+        self.assertEqual(parse_publish_time_text("刚刚", now), ms(2025, 3, 10, 12, 0, 0))
+        self.assertEqual(parse_publish_time_text("5分钟前", now), ms(2025, 3, 10, 11, 55, 0))
+        self.assertEqual(parse_publish_time_text("3小时前 广东", now), ms(2025, 3, 10, 9, 0, 0))
+        self.assertEqual(parse_publish_time_text("2天前", now), ms(2025, 3, 8, 12, 0, 0))
+        self.assertEqual(parse_publish_time_text("昨天 08:30", now), ms(2025, 3, 9, 8, 30, 0))
+        self.assertEqual(parse_publish_time_text("01-05", now), ms(2025, 1, 5))
+        self.assertEqual(parse_publish_time_text("2023-11-20", now), ms(2023, 11, 20))
+        self.assertIsNone(parse_publish_time_text("未知", now))
+
+
+class TestNoteTimeWindow(unittest.TestCase):
+
+    def test_skip_search_item(self):
+        window = NoteTimeWindow(since=ms(2024, 1, 1), until=ms(2024, 12, 31))
+        old = {"id": "a", "note_card": {"corner_tag_info": [{"type": "publish_time", "text": "2023-05-01"}]}}
+        recent = {"id": "b", "note_card": {"corner_tag_info": [{"type": "publish_time", "text": "2024-05-01"}]}}
+        unknown = {"id": "c", "note_card": {}}
+        self.assertTrue(window.skip_search_item(old))
+        self.assertFalse(window.skip_search_item(recent))
+        self.assertFalse(window.skip_search_item(unknown))
+        self.assertEqual(window.dropped_notes, 1)
+        self.assertGreaterEqual(window.saved_requests, 1)
+
+    def test_comment_cutoff_when_time_descending(self):
+        window = NoteTimeWindow(since=ms(2024, 1, 1))
+        cutoff = window.comment_cutoff()
+        page1 = [{"create_time": ms(2024, 3, 1)}, {"create_time": ms(2023, 12, 1)}]
+        page2 = [{"create_time": ms(2023, 11, 1)}, {"create_time": ms(2023, 10, 1)}]
+        self.assertEqual(len(cutoff.filter(page1)), 1)
+        self.assertFalse(cutoff.should_stop(page1, has_more=True))
+        self.assertTrue(cutoff.should_stop(page2, has_more=True))
+        self.assertEqual(window.saved_requests, 1)
+
+    def test_no_cutoff_when_not_ordered(self):
+        window = NoteTimeWindow(since=ms(2024, 1, 1))
+        cutoff = window.comment_cutoff()
+        # 热门评论排序：时间不是倒序，后续页面可能还有窗口内的评论，不能截断
+        self.assertFalse(cutoff.should_stop([{"create_time": ms(2023, 1, 1)}, {"create_time": ms(2023, 6, 1)}], True))
+        self.assertFalse(cutoff.should_stop([{"create_time": ms(2022, 1, 1)}], True))
+        self.assertEqual(window.saved_requests, 0)
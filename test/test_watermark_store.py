@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_watermark_store.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 增量爬取水位线存储测试
+
+import os
+import tempfile
+import unittest
+
+from media_platform.xhs.watermark_store import NoteWatermarkStore, parse_count
+
+
+class TestNoteWatermarkStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = NoteWatermarkStore(os.path.join(self.tmp_dir.name, "state.db"), max_seen_ids=3)
+
+    def test_parse_count(self):
+        self.assertEqual(parse_count("12"), 12)
+        self.assertEqual(parse_count("1.2万"), 12000)
+        self.assertEqual(parse_count("10+"), 10)
+        self.assertEqual(parse_count(7), 7)
+        self.assertIsNone(parse_count(""))
+        self.assertIsNone(parse_count(None))
+
+    def test_commit_and_unchanged(self):
+        note = {"last_update_time": 1700000000000, "interact_info": {"comment_count": "2"}}
+        comments = [
+            {"id": "c1", "create_time": 1700000001000},
+            {"id": "c2", "create_time": 1700000002000},
+            {"id": "s1", "create_time": 1700000003000, "target_comment": {"id": "c1"}},
+        ]
+        self.assertFalse(self.store.is_unchanged(self.store.get("n1"), "2", 1700000000000))
+
+        watermark = self.store.commit("n1", note, comments)
+        # 只记录一级评论，按时间倒序
+        self.assertEqual(watermark.seen_comment_ids, ["c2", "c1"])
+        self.assertEqual(watermark.newest_comment_time, 1700000002000)
+
+        saved = self.store.get("n1")
+        self.assertTrue(self.store.is_unchanged(saved, "2", 1700000000000))
+        self.assertTrue(self.store.is_unchanged(saved, "2"))
+        self.assertFalse(self.store.is_unchanged(saved, "3", 1700000000000))
+        self.assertFalse(self.store.is_unchanged(saved, "2", 1700000009000))
+
+    def test_seen_ids_capped(self):
+        note = {"last_update_time": 1, "interact_info": {"comment_count": "4"}}
+        self.store.commit("n1", note, [{"id": "c1", "create_time": 1}, {"id": "c2", "create_time": 2}])
+        watermark = self.store.commit("n1", note, [{"id": "c3", "create_time": 3}, {"id": "c4", "create_time": 4}])
+        self.assertEqual(watermark.seen_comment_ids, ["c4", "c3", "c2"])
+        self.assertEqual(watermark.newest_comment_time, 4)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_xhs_extractor.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 小红书 __INITIAL_STATE__ 提取器测试：子树定位、undefined 处理与 decamelize 范围
+
+import json
+import unittest
+
+from media_platform.xhs.extractor import XiaoHongShuExtractor
+
+NOTE_ID = "64b8f0e1000000001203c5a1"
+
+
+def _page(state: str) -> str:
+    return (
+        "<html><head><script>window.__SSR__=true</script></head><body>"
+        f"<script>window.__INITIAL_STATE__={state}</script>"
+        "<script>console.log('tail')</script></body></html>"
+    )
+
+
+def _note_state(desc: str = "hello") -> str:
+    note = {
+        "noteId": NOTE_ID,
+        "title": "标题",
+        "desc": desc,
+        "interactInfo": {"likedCount": "10"},
+    }
+    state = json.dumps(
+        {
+            "global": {"appSettings": {"notificationInterval": 30}},
+            "note": {"noteDetailMap": {NOTE_ID: {"note": note, "currentTime": 1}}},
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return state.replace('"currentTime":1', '"currentTime":undefined')
+
+
+class TestXiaoHongShuExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = XiaoHongShuExtractor()
+
+    def test_note_detail_only_target_subtree_decamelized(self):
+        note = self.extractor.extract_note_detail_from_html(NOTE_ID, _page(_note_state()))
+        self.assertEqual(note["note_id"], NOTE_ID)
+        self.assertEqual(note["interact_info"], {"liked_count": "10"})
+
+    def test_undefined_inside_string_is_kept(self):
+        desc = 'value is undefined, "quoted":undefined'
+        note = self.extractor.extract_note_detail_from_html(NOTE_ID, _page(_note_state(desc)))
+        self.assertEqual(note["desc"], desc)
+
+    def test_note_missing(self):
+        self.assertIsNone(self.extractor.extract_note_detail_from_html(NOTE_ID, "<html>captcha</html>"))
+        page = _page('{"note":{"noteDetailMap":{}}}')
+        self.assertIsNone(self.extractor.extract_note_detail_from_html(NOTE_ID, page))
+
+    def test_creator_info_keeps_camel_case(self):
+        state = '{"user":{"userPageData":{"basicInfo":{"nickname":"a"},"tags":undefined},"notes":[[]]}}'
+        info = self.extractor.extract_creator_info_from_html(_page(state))
+        self.assertEqual(info, {"basicInfo": {"nickname": "a"}, "tags": None})
+        self.assertIsNone(self.extractor.extract_creator_info_from_html("<html></html>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_xhs_sign.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 小红书签名编码函数的黄金向量测试，保证快速实现与原始 JS 移植版本逐位一致
+
+import json
+import random
+import unittest
+
+from media_platform.xhs import help as xhs_help
+from media_platform.xhs import xhs_sign
+
+# (输入, 原始实现的 mrc 结果)
+MRC_VECTORS = [
+    ("", 3988292384),
+    ("a", -4210082461),
+    ("ab", -2361668787),
+    ("abc", -660815134),
+    ("hello world", -520973659),
+    ("~()*!.'-_ special %20 chars &=?/\\\"\n\t", -1370631850),
+    ("x" * 56, -4236772261),
+    ("y" * 57, -3672795878),
+    ("z" * 58, -2219033907),
+    ("ÿþý latin1 high bytes ¡¿", -4151518948),
+]
+
+# (输入, UTF-8 字节 hex, 自定义 Base64 结果)
+ENCODE_VECTORS = [
+    ("", "", ""),
+    ("a", "61", "Gc=="),
+    ("ab", "6162", "GnH="),
+    ("abc", "616263", "GnQ0"),
+    ("hello world", "68656c6c6f20776f726c64", "yBpVJBuW49RUJBc="),
+    ("你好，世界", "e4bda0e5a5bdefbc8ce4b896e7958c", "EN9WEynRvvUPENjnEEnP"),
+    (
+        "混合 mixed テキスト 🚀 emoji",
+        "e6b7b7e59088206d6978656420e38386e382ade382b9e3838820f09f9a8020656d6f6a69",
+        "E327E8sHHBMk2BpDHwweY1ws32ws12wejseIdExZHBpTJ9kk",
+    ),
+    (
+        "~()*!.'-_ special %20 chars &=?/\\\"\n\t",
+        "7e28292a212e272d5f207370656369616c2025323020636861727320263d3f2f5c220a09",
+        "KjWktjr1QUMKHo+I8n+kGnIWQ/HIHB+iGgQAHsGROURqHWiQ",
+    ),
+    (
+        "ÿþý latin1 high bytes ¡¿",
+        "c3bfc3bec3bd206c6174696e31206869676820627974657320c2a1c2bf",
+        "Iv5e6VwRHBlY4BS1Pamiyn4iHBQE4BpAHPtYI3u=",
+    ),
+]
+
+XS_COMMON_INPUT = {
+    "a1": "18c0a1b2c3d4e5f6",
+    "b1": "I38rHdgsjopgIvesdVwgIC+oIELmBZ5e3VwXLgFTIxS3bqwErFeexd0ekncAzMFYnqthIhJeSnMDKutRI3KsYorWHPtGrbV0P9WfIi/eWc6eYqtyQApPI37ekmR6QL",
+    "x_s": "XYS_2UQhPsHCH0c1PjhlHjIj2erjwjQhyoPTqBPT49pjHjIj2eHjwjQgynEDJ74AHjIj2ePjwjQTJdPIPAZlg94tP",
+    "x_t": "1700000000000",
+}
+XS_COMMON_EXPECTED = (
+    "2UQAPsHCPUIjqArjwjHjNsQhPsHCH0rjNsQhPaHCH0c1PjhUHjIj2eHjwjQ+GnPW/MPjNsQhPUHCHdYiqUMIGUM78nHjNsQh+sHCH0c1+Ac1PsHVHdWMH0ijP/Y0PBrlG0Q0P9cF8/pf+jHVHdW9H0ijP/qIPeZIPeZIPeZIPsHVHdW7H0ijnbS/gAQpLnYcqFYeaem0PpmxyBlHyDSxPfpUyd4xLnYEJMmLqLQcpecEqBkHyDSxPfpHyd4xLn4EJDpra0qFcLYxaniU8pmx49kzprkDLrSccpkV8ADF4bZjNsQhwsHCHDDAwoQH8B4AyfRI8FS98g+Dpd4daLP3JFSb/BMsn0pSPM87nrldzSzQ2bPAGdb7zgQB8nph8emSy9E0cgk+zSS1qgzianYt8p+1/LzN4gzaa/+NqMS6qS4HLozoqfQnPbZEp98QyaRSp9P98pSl4oSzcgmca/P78nTTL08z/sHVHdWEH0iT+ecFweWM+0LVHdWlPsHCP/LFNsQhP/rjwjQ1J7QTGnIjKc=="
+)
+
+
+class TestXhsSignEncoders(unittest.TestCase):
+
+    def test_mrc_golden_vectors(self):
+        for text, expected in MRC_VECTORS:
+            self.assertEqual(xhs_sign.mrc(text), expected, msg=repr(text))
+            self.assertEqual(xhs_sign._mrc_reference(text), expected, msg=repr(text))
+
+    def test_mrc_non_latin1_keeps_original_error(self):
+        # 原始实现对码点 > 255 的字符会查表越界
+        with self.assertRaises(IndexError):
+            xhs_sign.mrc("你好，世界")
+
+    def test_encode_golden_vectors(self):
+        for text, utf8_hex, b64 in ENCODE_VECTORS:
+            raw = bytes.fromhex(utf8_hex)
+            self.assertEqual(xhs_sign.encode_utf8(text), list(raw), msg=repr(text))
+            self.assertEqual(xhs_sign.encode_utf8_bytes(text), raw, msg=repr(text))
+            self.assertEqual(xhs_sign.b64_encode(raw), b64, msg=repr(text))
+            self.assertEqual(xhs_sign.b64_encode(list(raw)), b64, msg=repr(text))
+            self.assertEqual(xhs_sign._b64_encode_reference(list(raw)), b64, msg=repr(text))
+
+    def test_xs_common_golden_vector(self):
+        data = XS_COMMON_INPUT
+        result = xhs_help.sign(a1=data["a1"], b1=data["b1"], x_s=data["x_s"], x_t=data["x_t"])
+        self.assertEqual(result["x-s-common"], XS_COMMON_EXPECTED)
+
+    def test_random_inputs_match_reference(self):
+        rng = random.Random(20250101)
+        for _ in range(2000):
+            length = rng.randint(0, 120)
+            text = "".join(chr(rng.choice((rng.randint(32, 126), rng.randint(0, 255), rng.randint(0x4E00, 0x9FFF))))
+                           for _ in range(length))
+            utf8 = xhs_sign.encode_utf8(text)
+            self.assertEqual(utf8, xhs_sign._encode_utf8_reference(text))
+            self.assertEqual(xhs_sign.b64_encode(utf8), xhs_sign._b64_encode_reference(utf8))
+            try:
+                expected = xhs_sign._mrc_reference(text)
+            except IndexError:
+                with self.assertRaises(IndexError):
+                    xhs_sign.mrc(text)
+                continue
+            self.assertEqual(xhs_sign.mrc(text), expected)
+
+    def test_help_shares_fast_implementation(self):
+        payload = json.dumps({"x": "小红书"}, separators=(",", ":"))
+        self.assertEqual(xhs_help.encodeUtf8(payload), xhs_sign.encode_utf8(payload))
+        self.assertEqual(xhs_help.b64Encode(xhs_help.encodeUtf8(payload)),
+                         xhs_sign.b64_encode(xhs_sign.encode_utf8_bytes(payload)))
+        self.assertEqual(xhs_help.mrc("y" * 57), xhs_sign.mrc("y" * 57))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/test/test_xhs_sub_comments.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 二级评论并发展开测试：并发数不超过上限、单个分页请求失败不影响其他一级评论
+
+import asyncio
+import unittest
+from typing import Dict, List
+from unittest import mock
+
+import config
+from media_platform.xhs.client import XiaoHongShuClient
+from media_platform.xhs.exception import DataFetchError
+
+PAGES_PER_ROOT = 3
+
+
+class StubSubCommentApi:
+    """每个一级评论有 PAGES_PER_ROOT 页二级评论，记录同时进行的请求数"""
+
+    def __init__(self, fail_root: str = "", fail_page: int = -1):
+        self.fail_root = fail_root
+        self.fail_page = fail_page
+        self.inflight = 0
+        self.max_inflight = 0
+
+    async def __call__(self, note_id, root_comment_id, xsec_token, num=10, cursor="") -> Dict:
+        page = int(cursor or 0)
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            await asyncio.sleep(0.01)
+            if root_comment_id == self.fail_root and page == self.fail_page:
+                raise DataFetchError("sub comment page failed")
+            return {
+                "has_more": page + 1 < PAGES_PER_ROOT,
+                "cursor": str(page + 1),
+                "comments": [{"id": f"{root_comment_id}-p{page}"}],
+            }
+        finally:
+            self.inflight -= 1
+
+
+def _roots(count: int) -> List[Dict]:
+    return [
+        {
+            "id": f"r{i}",
+            "note_id": "n1",
+            "sub_comments": [{"id": f"r{i}-inline"}],
+            "sub_comment_has_more": True,
+            "sub_comment_cursor": "1",
+        }
+        for i in range(count)
+    ]
+
+
+class TestSubCommentFanOut(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        patch = mock.patch.multiple(
+            config, ENABLE_GET_SUB_COMMENTS=True, XHS_SUB_COMMENT_CONCURRENCY=3, XHS_SUB_COMMENT_MAX_PAGES_PER_ROOT=0
+        )
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.client = XiaoHongShuClient(headers={}, playwright_page=None, cookie_dict={})
+        self.addAsyncCleanup(self.client.close)
+        self.delivered: List[str] = []
+
+    async def _callback(self, note_id: str, comments: List[Dict]) -> None:
+        self.delivered.extend(c["id"] for c in comments)
+
+    async def test_concurrency_is_bounded(self):
+        api = StubSubCommentApi()
+        self.client.get_note_sub_comments = api
+        result = await self.client.get_comments_all_sub_comments(_roots(10), "token", callback=self._callback)
+        self.assertEqual(api.max_inflight, 3)
+        # 首页随一级评论返回，继续翻第 1、2 页
+        self.assertEqual(len(result), 10 * (PAGES_PER_ROOT - 1))
+        self.assertEqual(len(self.delivered), 10 * PAGES_PER_ROOT)
+
+    async def test_failed_page_does_not_drop_other_roots(self):
+        api = StubSubCommentApi(fail_root="r2", fail_page=1)
+        self.client.get_note_sub_comments = api
+        await self.client.get_comments_all_sub_comments(_roots(5), "token", callback=self._callback)
+        for i in range(5):
+            self.assertIn(f"r{i}-inline", self.delivered)
+            if i != 2:
+                self.assertIn(f"r{i}-p1", self.delivered)
+                self.assertIn(f"r{i}-p2", self.delivered)
+        # 失败的一级评论之后的分页不再请求
+        self.assertNotIn("r2-p1", self.delivered)
+        self.assertNotIn("r2-p2", self.delivered)
+
+    async def test_max_count_caps_total(self):
+        self.client.get_note_sub_comments = StubSubCommentApi()
+        result = await self.client.get_comments_all_sub_comments(
+            _roots(10), "token", callback=self._callback, max_count=5
+        )
+        self.assertEqual(len(result), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -186,6 +186,40 @@ class TestExcelStoreBase:
         assert "Creators" not in wb.sheetnames
         wb.close()
 
+    def test_flush_write_flush(self, excel_store):
+        """Test that flushing again after more writes keeps all rows"""
+        asyncio.run(excel_store.store_content({"note_id": "note1"}))
+        excel_store.flush()
+
+        # Comments sheet was empty on the first flush and gets data afterwards
+        asyncio.run(excel_store.store_content({"note_id": "note2"}))
+        asyncio.run(excel_store.store_comment({"comment_id": "c1", "note_id": "note2"}))
+        excel_store.flush()
+
+        wb = openpyxl.load_workbook(excel_store.filename)
+        assert wb.sheetnames == ["Contents", "Comments"]
+        assert [row[0] for row in wb["Contents"].iter_rows(min_row=2, values_only=True)] == ["note1", "note2"]
+        assert wb["Comments"].max_row == 2
+        wb.close()
+
+    @pytest.mark.asyncio
+    async def test_store_registry_flush_after_flush_all(self, excel_store):
+        """Test that the run-scoped store registry can flush an instance already flushed by flush_all"""
+        from store.store_registry import StoreRegistry
+
+        registry = StoreRegistry()
+        registry.open()
+        ExcelStoreBase._instances["test_search"] = excel_store
+        store = registry.get("excel", lambda: ExcelStoreBase.get_instance("test", "search"))
+        await store.store_content({"note_id": "note1"})
+        ExcelStoreBase.flush_all()
+        await store.store_content({"note_id": "note2"})
+        await registry.close()
+
+        wb = openpyxl.load_workbook(excel_store.filename)
+        assert wb["Contents"].max_row == 3
+        wb.close()
+
 
 @pytest.mark.skipif(not EXCEL_AVAILABLE, reason="openpyxl not installed")
 def test_excel_import_availability():
@@ -5,6 +5,7 @@ from datetime import datetime
 import httpx
 import config
 from api.services.settings_manager import settings_manager
+from tools import jsoncodec
 from tools.utils import utils
 import re
 from collections import Counter
@@ -100,7 +101,7 @@ def _read_jsonl(path: str, limit: int) -> list[dict]:
             if len(items) >= limit:
                 break
             try:
-                obj = json.loads(line)
+                obj = jsoncodec.loads(line)
                 if isinstance(obj, dict):
                     items.append(obj)
             except Exception:
@@ -327,7 +328,7 @@ def generate_feedback_report(platform: str, crawler_type: str) -> str | None:
         utils.logger.info(f"[AnalysisAgent] Report saved: {out_path}")
         try:
             from tools.utils import utils as _u
-            import json as _json
+            from tools import jsoncodec as _json
             _u.logger.info('[EVENT] ' + _json.dumps({"stage":"report","status":"saved","path": out_path}))
         except Exception:
             pass
@@ -485,7 +486,7 @@ B) “体验不好”判定（满足任意1条就归入）：
     
     try:
         from tools.utils import utils as _u
-        import json as _json
+        from tools import jsoncodec as _json
         try:
             _u.logger.info('[EVENT] ' + _json.dumps({"stage":"report","status":"start"}))
         except Exception:
@@ -522,7 +523,7 @@ B) “体验不好”判定（满足任意1条就归入）：
     utils.logger.info(f"[AnalysisAgent] Report saved: {out_path}")
     try:
         from tools.utils import utils as _u
-        import json as _json
+        from tools import jsoncodec as _json
         _u.logger.info('[EVENT] ' + _json.dumps({"stage":"report","status":"saved","path": out_path}))
     except Exception:
         pass
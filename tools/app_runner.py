@@ -26,6 +26,8 @@ import signal
 from collections.abc import Awaitable, Callable
 from typing import Optional
 
+from tools.buffered_file_writer import buffered_file_writer
+
 AsyncFn = Callable[[], Awaitable[None]]
 
 
@@ -71,6 +73,11 @@ def run(
 
             if shutdown_requested:
                 print("[Main] 再次收到中断信号，强制退出。")
+                # 强制退出不再执行清理，同步写出已缓冲的 csv/jsonl 数据
+                try:
+                    buffered_file_writer.flush_sync()
+                except Exception:
+                    pass
                 os._exit(force_exit_code)
 
             shutdown_requested = True
@@ -101,6 +108,11 @@ def run(
                 await _cleanup_with_timeout()
             except Exception as e:
                 print(f"[Main] 清理时出错: {e}")
+            # 缓冲写入的数据不受清理超时影响，在取消剩余任务前全部写出
+            try:
+                await buffered_file_writer.close()
+            except Exception as e:
+                print(f"[Main] 写出缓冲文件时出错: {e}")
             await _cancel_remaining_tasks()
 
         if cancelled:
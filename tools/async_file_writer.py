@@ -17,13 +17,14 @@
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
 import asyncio
-import csv
 import json
 import os
 import pathlib
-from typing import Dict, List
+from typing import Dict, List, Set
 import aiofiles
 import config
+from tools import jsoncodec
+from tools.buffered_file_writer import buffered_file_writer
 from tools.utils import utils
 from tools.words import AsyncWordCloudGenerator
 
@@ -32,8 +33,25 @@ class AsyncFileWriter:
         self.lock = asyncio.Lock()
         self.platform = platform
         self.crawler_type = crawler_type
-        self.wordcloud_generator = AsyncWordCloudGenerator() if config.ENABLE_GET_WORDCLOUD else None
-        self._jsonl_prefix: str | None = None
+        # 词云生成器在生成词云时才创建（加载停用词、注册自定义词有一定开销）
+        self._wordcloud_generator: AsyncWordCloudGenerator | None = None
+        # JSONL 目录 -> 文件批次前缀，同一目录在写入器生命周期内只计算一次
+        self._jsonl_prefixes: Dict[str, str] = {}
+        # 已创建的输出目录，避免每条数据都调用一次 mkdir
+        self._created_dirs: Set[str] = set()
+        # 通过缓冲写入器写过的文件，flush/close 时只处理这些文件
+        self._buffered_paths: Set[str] = set()
+
+    def _ensure_dir(self, base_path: str) -> None:
+        if base_path not in self._created_dirs:
+            pathlib.Path(base_path).mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(base_path)
+
+    @property
+    def wordcloud_generator(self) -> AsyncWordCloudGenerator | None:
+        if self._wordcloud_generator is None and config.ENABLE_GET_WORDCLOUD:
+            self._wordcloud_generator = AsyncWordCloudGenerator()
+        return self._wordcloud_generator
 
     def _get_file_path(self, file_type: str, item_type: str) -> str:
         base_path = f"data/{self.platform}/{file_type}"
@@ -51,10 +69,11 @@ class AsyncFileWriter:
                 if safe_kw:
                     base_path = f"data/{self.platform}/{file_type}/{safe_kw}"
             
-            pathlib.Path(base_path).mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(base_path)
             
-            # 2. 确定批次前缀（仅初始化一次）：关键词 + 任务开始时间（HH:MM_MM/DD）
-            if not self._jsonl_prefix:
+            # 2. 确定批次前缀（每个目录仅初始化一次）：关键词 + 任务开始时间（HH:MM_MM/DD）
+            prefix = self._jsonl_prefixes.get(base_path)
+            if not prefix:
                 # 获取任务开始时间（可能含有无效文件名字符）
                 raw_ts = request_start_time_var.get()
                 if not raw_ts or not raw_ts.strip():
@@ -68,24 +87,20 @@ class AsyncFileWriter:
                 safe_ts = raw_ts.replace(":", "-").replace("/", "-")
                 base_kw = os.path.basename(base_path.rstrip("/"))
                 prefix_kw = base_kw if base_kw not in ("jsonl", "") else "generic"
-                self._jsonl_prefix = f"{prefix_kw}_{safe_ts}"
+                prefix = f"{prefix_kw}_{safe_ts}"
+                self._jsonl_prefixes[base_path] = prefix
             # 3. 文件名：<prefix>_<item_type>.jsonl
-            file_name = f"{self._jsonl_prefix}_{item_type}.{file_type}"
+            file_name = f"{prefix}_{item_type}.{file_type}"
         else:
-            pathlib.Path(base_path).mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(base_path)
             file_name = f"{self.crawler_type}_{item_type}_{utils.get_current_date()}.{file_type}"
             
         return f"{base_path}/{file_name}"
 
     async def write_to_csv(self, item: Dict, item_type: str):
         file_path = self._get_file_path('csv', item_type)
-        async with self.lock:
-            file_exists = os.path.exists(file_path)
-            async with aiofiles.open(file_path, 'a', newline='', encoding='utf-8-sig') as f:
-                writer = csv.DictWriter(f, fieldnames=item.keys())
-                if not file_exists or await f.tell() == 0:
-                    await writer.writeheader()
-                await writer.writerow(item)
+        self._buffered_paths.add(file_path)
+        await buffered_file_writer.write_csv_row(file_path, item)
 
     async def write_single_item_to_json(self, item: Dict, item_type: str):
         file_path = self._get_file_path('json', item_type)
@@ -109,10 +124,19 @@ class AsyncFileWriter:
 
     async def write_to_jsonl(self, item: Dict, item_type: str):
         file_path = self._get_file_path('jsonl', item_type)
-        async with self.lock:
-            async with aiofiles.open(file_path, 'a', encoding='utf-8') as f:
-                line = json.dumps(item, ensure_ascii=False)
-                await f.write(line + "\n")
+        self._buffered_paths.add(file_path)
+        await buffered_file_writer.write_line(file_path, jsoncodec.dumps(item))
+
+    async def flush(self):
+        """写出 csv/jsonl 的缓冲数据"""
+        if self._buffered_paths:
+            await buffered_file_writer.flush(self._buffered_paths)
+
+    async def close(self):
+        """写出缓冲数据并关闭 csv/jsonl 文件"""
+        if self._buffered_paths:
+            await buffered_file_writer.close_files(self._buffered_paths)
+            self._buffered_paths.clear()
 
     async def generate_wordcloud_from_comments(self):
         """
@@ -126,6 +150,8 @@ class AsyncFileWriter:
             return
 
         try:
+            # 评论可能还在缓冲区中，读取前先写出
+            await buffered_file_writer.flush()
             # Read comments from JSON/JSONL file
             comments_json_path = self._get_file_path('json', 'comments')
             comments_jsonl_path = self._get_file_path('jsonl', 'comments')
@@ -137,7 +163,7 @@ class AsyncFileWriter:
                         if not line:
                             continue
                         try:
-                            obj = json.loads(line)
+                            obj = jsoncodec.loads(line)
                             if isinstance(obj, dict):
                                 comments_data.append(obj)
                         except json.JSONDecodeError:
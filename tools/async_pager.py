@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/async_pager.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# 流水线分页：当前页还在处理（入库、展开子评论）时，后台已经按游标请求下一页，
+# 用 lookahead 限制最多提前请求的页数，让存储耗时与翻页请求耗时重叠
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+_DONE = object()
+
+
+class _PageError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def iter_pages_pipelined(
+    fetch_page: Callable[[str], Awaitable[Any]],
+    next_cursor: Callable[[Any], Optional[str]],
+    first_cursor: str = "",
+    lookahead: int = 1,
+) -> AsyncIterator[Any]:
+    """
+    按游标顺序异步迭代分页结果，后台提前请求后续页面
+
+    Args:
+        fetch_page: 根据游标请求一页数据的协程函数
+        next_cursor: 根据一页数据返回下一页游标，返回 None 表示不再翻页；
+            在后台请求任务中调用，不能依赖迭代方对该页的处理结果
+        first_cursor: 第一页游标
+        lookahead: 当前页处理期间最多提前请求的页数，0 表示不提前请求（顺序翻页）
+
+    Yields:
+        每一页数据；迭代方提前退出时后台请求会被取消，请求异常会在迭代方抛出
+    """
+    # 已请求但尚未处理完成的页数上限 = 正在处理的一页 + lookahead
+    slots = asyncio.Semaphore(max(0, lookahead) + 1)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def produce() -> None:
+        cursor: Optional[str] = first_cursor
+        try:
+            while cursor is not None:
+                await slots.acquire()
+                page = await fetch_page(cursor)
+                cursor = next_cursor(page)
+                queue.put_nowait(page)
+        except Exception as e:
+            queue.put_nowait(_PageError(e))
+        finally:
+            queue.put_nowait(_DONE)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _PageError):
+                raise item.error
+            yield item
+            slots.release()
+    finally:
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/bloom_filter.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# 布隆过滤器：用固定大小的位数组记录大量字符串（如历史笔记ID），
+# 判断"一定没见过"或"可能见过"，可保存到文件跨运行使用
+
+import hashlib
+import math
+import os
+import struct
+from typing import Optional
+
+from tools import utils
+
+_MAGIC = b"BLM1"
+_HEADER = struct.Struct("<4sQQQ")  # magic, 位数, 哈希函数个数, 已添加数量
+
+
+class BloomFilter:
+    """
+    布隆过滤器，capacity 个元素时误判率约为 error_rate；不支持删除
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        error_rate = min(max(error_rate, 1e-9), 0.5)
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # 双重哈希：h1 + i * h2 模拟 k 个独立哈希函数
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> bool:
+        """
+        添加元素
+        Returns:
+            元素之前是否可能已存在
+        """
+        existed = True
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            mask = 1 << bit
+            if not self._bits[byte] & mask:
+                existed = False
+                self._bits[byte] |= mask
+        if not existed:
+            self.count += 1
+        return existed
+
+    def __contains__(self, key: str) -> bool:
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            if not self._bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+    def save(self, path: str) -> None:
+        """先写临时文件再替换，避免中途退出损坏已有文件"""
+        file_dir = os.path.dirname(path)
+        if file_dir:
+            os.makedirs(file_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.count))
+            f.write(self._bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, capacity: int = 1_000_000, error_rate: float = 0.001) -> "BloomFilter":
+        """
+        从文件加载，文件不存在或格式不对时返回按 capacity/error_rate 新建的空过滤器
+        （已有文件沿用其自身的大小，capacity/error_rate 不生效）
+        """
+        bloom = cls(capacity, error_rate)
+        data: Optional[bytes] = None
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+        if not data:
+            return bloom
+        try:
+            magic, num_bits, num_hashes, count = _HEADER.unpack_from(data)
+            bits = data[_HEADER.size:]
+            if magic != _MAGIC or len(bits) != (num_bits + 7) // 8:
+                raise ValueError("bad bloom filter file")
+        except (struct.error, ValueError) as e:
+            utils.logger.error(f"[BloomFilter.load] Ignore invalid bloom filter file {path}: {e}")
+            return bloom
+        bloom.num_bits, bloom.num_hashes, bloom.count = num_bits, num_hashes, count
+        bloom._bits = bytearray(bits)
+        return bloom
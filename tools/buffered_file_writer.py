@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/buffered_file_writer.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# -*- coding: utf-8 -*-
+# @Desc    : 缓冲文件写入器：每个输出文件只打开一次，数据行先缓存在内存中，
+#            由一个后台任务按大小或时间阈值批量写入磁盘（group commit），退出时保证写出
+import asyncio
+import atexit
+import csv
+import io
+import os
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, TextIO, Tuple
+
+import config
+from tools import utils
+
+# fsync 策略：never 只交给操作系统缓存；commit 每次批量写入后 fsync；close 关闭文件时 fsync 一次
+FSYNC_NEVER = "never"
+FSYNC_COMMIT = "commit"
+FSYNC_CLOSE = "close"
+_FSYNC_POLICIES = (FSYNC_NEVER, FSYNC_COMMIT, FSYNC_CLOSE)
+
+
+class _FileSink:
+    """单个输出文件：常驻的文件句柄 + 等待写入的数据行"""
+
+    def __init__(self, path: str, encoding: str, newline: Optional[str]):
+        self.path = path
+        self.encoding = encoding
+        self.newline = newline
+        self.pending: List[str] = []
+        self.pending_bytes = 0
+        self._file: Optional[TextIO] = None
+        # 后台写入线程与退出时的同步写出可能同时访问文件句柄
+        self._lock = threading.Lock()
+        # CSV：复用同一个 csv.writer 格式化数据行，是否需要表头在创建时检查一次
+        self._csv_buffer: Optional[io.StringIO] = None
+        self._csv_writer = None
+        self.csv_header_needed = False
+
+    def format_csv(self, values: Iterable) -> str:
+        if self._csv_writer is None:
+            self._csv_buffer = io.StringIO()
+            self._csv_writer = csv.writer(self._csv_buffer)
+        self._csv_writer.writerow(values)
+        text = self._csv_buffer.getvalue()
+        self._csv_buffer.seek(0)
+        self._csv_buffer.truncate()
+        return text
+
+    def append(self, text: str) -> int:
+        self.pending.append(text)
+        size = len(text)
+        self.pending_bytes += size
+        return size
+
+    def take(self) -> List[str]:
+        lines, self.pending, self.pending_bytes = self.pending, [], 0
+        return lines
+
+    def write(self, lines: List[str], fsync: bool) -> int:
+        """在调用线程中写入一批数据行，返回写入的字符数"""
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding=self.encoding, newline=self.newline)
+            data = "".join(lines)
+            self._file.write(data)
+            self._file.flush()
+            if fsync:
+                os.fsync(self._file.fileno())
+            return len(data)
+
+    def close(self, fsync: bool) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._file.flush()
+                if fsync:
+                    os.fsync(self._file.fileno())
+            finally:
+                self._file.close()
+                self._file = None
+
+
+class BufferedFileWriter:
+    """
+    缓冲文件写入器
+
+    - 每个文件只打开一次，句柄保持到 close_files/close
+    - 写入只追加到内存缓冲区；缓冲数据达到 flush_bytes 时唤醒后台任务，否则最多等待 flush_interval 秒写出
+    - 缓冲数据达到 max_pending_bytes 时写入方等待本次写出完成（背压），避免磁盘慢时内存无限增长
+    - 实际的文件写入在线程中执行，不阻塞事件循环
+    - call_after_commit 登记的回调在此前缓冲的数据全部写入文件后才执行，断点日志、增量水位线等
+      "已入库"记录通过它写入，进程被强制杀死时这些记录不会跑到数据前面
+
+    使用方法：
+        await buffered_file_writer.write_line(path, line)
+        await buffered_file_writer.write_csv_row(path, item)
+        await buffered_file_writer.flush()     # 读取这些文件之前
+        await buffered_file_writer.close()     # 退出时（tools/app_runner.run 会自动调用）
+    """
+
+    def __init__(
+        self,
+        flush_bytes: int = 256 * 1024,
+        flush_interval: float = 1.0,
+        fsync_policy: str = FSYNC_CLOSE,
+        max_pending_bytes: Optional[int] = None,
+    ):
+        """
+        Args:
+            flush_bytes: 缓冲数据达到该大小（字符数）时立即批量写出
+            flush_interval: 缓冲数据最长停留时间（秒）
+            fsync_policy: fsync 策略，never / commit / close
+            max_pending_bytes: 缓冲数据上限，达到后写入方等待写出，默认 flush_bytes 的 4 倍
+        """
+        if fsync_policy not in _FSYNC_POLICIES:
+            raise ValueError(f"[BufferedFileWriter] invalid fsync policy: {fsync_policy}, expected one of {_FSYNC_POLICIES}")
+        self.flush_bytes = max(1, flush_bytes)
+        self.flush_interval = max(0.01, flush_interval)
+        self.fsync_policy = fsync_policy
+        self.max_pending_bytes = max(self.flush_bytes, max_pending_bytes or self.flush_bytes * 4)
+        self._sinks: Dict[str, _FileSink] = {}
+        self._pending_bytes = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._commit_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        # 已追加 / 已写入文件的数据行序号，以及等待数据写入后执行的回调 (需要写入到的序号, 回调)
+        self._appended_seq = 0
+        self._committed_seq = 0
+        self._after_commit: Deque[Tuple[int, Callable[[], None]]] = deque()
+        self.rows = 0
+        self.commits = 0
+        self.bytes_written = 0
+        self.write_errors = 0
+
+    def _ensure_started(self) -> None:
+        """在当前事件循环中启动后台写出任务（测试中每个用例使用新的事件循环，循环变化时重建）"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._task = None
+            self._wakeup = asyncio.Event()
+            self._commit_lock = asyncio.Lock()
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._flush_loop())
+
+    def _sink(self, path: str, encoding: str, newline: Optional[str]) -> _FileSink:
+        sink = self._sinks.get(path)
+        if sink is None:
+            sink = _FileSink(path, encoding, newline)
+            self._sinks[path] = sink
+        return sink
+
+    async def _append(self, sink: _FileSink, text: str) -> None:
+        self._ensure_started()
+        self._pending_bytes += sink.append(text)
+        self._appended_seq += 1
+        self.rows += 1
+        if self._pending_bytes >= self.max_pending_bytes:
+            await self.flush()
+        elif self._pending_bytes >= self.flush_bytes:
+            self._wakeup.set()
+
+    async def write_line(self, path: str, line: str, encoding: str = "utf-8") -> None:
+        """
+        追加一行文本（自动补换行符）
+        Args:
+            path: 文件路径
+            line: 一行文本，不含换行符
+            encoding: 文件编码
+        """
+        await self._append(self._sink(path, encoding, None), line + "\n")
+
+    async def write_csv_row(self, path: str, item: Dict, encoding: str = "utf-8-sig") -> None:
+        """
+        追加一行 CSV，按 item 的键顺序输出；文件不存在或为空时先写表头
+        Args:
+            path: 文件路径
+            item: 一行数据
+            encoding: 文件编码
+        """
+        sink = self._sinks.get(path)
+        if sink is None:
+            sink = self._sink(path, encoding, "")
+            sink.csv_header_needed = not os.path.exists(path) or os.path.getsize(path) == 0
+        text = ""
+        if sink.csv_header_needed:
+            text = sink.format_csv(item.keys())
+            sink.csv_header_needed = False
+        await self._append(sink, text + sink.format_csv(item.values()))
+
+    def call_after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        在当前已缓冲的数据全部写入文件后调用 callback，没有未写入的数据时立即调用；
+        回调按登记顺序执行，异常只记录日志
+        Args:
+            callback: 同步回调，如写入断点日志
+        """
+        if not self._after_commit and self._committed_seq >= self._appended_seq:
+            self._invoke(callback)
+            return
+        self._after_commit.append((self._appended_seq, callback))
+
+    @staticmethod
+    def _invoke(callback: Callable[[], None]) -> None:
+        try:
+            callback()
+        except Exception as e:
+            utils.logger.error(f"[BufferedFileWriter] After commit callback error: {e}")
+
+    def _mark_committed(self, seq: int) -> None:
+        """序号 seq 及之前的数据已全部写入文件，执行等待这些数据的回调"""
+        self._committed_seq = max(self._committed_seq, seq)
+        while self._after_commit and self._after_commit[0][0] <= self._committed_seq:
+            _, callback = self._after_commit.popleft()
+            self._invoke(callback)
+
+    async def _flush_loop(self) -> None:
+        while not self._stopping:
+            try:
+                async with asyncio.timeout(self.flush_interval):
+                    await self._wakeup.wait()
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._commit(self._sinks.values(), self.fsync_policy == FSYNC_COMMIT, complete=True)
+            except Exception as e:
+                # 后台任务退出后缓冲数据只能等到退出时写出，任何错误都不能中断循环
+                utils.logger.error(f"[BufferedFileWriter._flush_loop] Commit failed: {e}")
+
+    async def _commit(self, sinks: Iterable[_FileSink], fsync: bool, complete: bool = False) -> None:
+        """
+        把缓冲数据批量写出，多次写出按顺序执行
+        Args:
+            complete: sinks 是否为全部文件，是则写出后执行等待这些数据的回调
+        """
+        async with self._commit_lock:
+            seq = self._appended_seq
+            batch = [(sink, sink.take()) for sink in list(sinks) if sink.pending]
+            if batch:
+                self._pending_bytes -= sum(len(text) for _, lines in batch for text in lines)
+                written = await asyncio.to_thread(self._write_batch, batch, fsync)
+                self.commits += 1
+                self.bytes_written += written
+            if complete:
+                self._mark_committed(seq)
+
+    def _write_batch(self, batch: List, fsync: bool) -> int:
+        written = 0
+        for sink, lines in batch:
+            try:
+                written += sink.write(lines, fsync)
+            except OSError as e:
+                self.write_errors += 1
+                utils.logger.error(f"[BufferedFileWriter] Write {len(lines)} rows to {sink.path} failed: {e}")
+            except Exception as e:
+                # 个别数据行无法写入（如无法编码的字符）时整批都写不进去，改为逐行写入，只丢弃出错的行
+                utils.logger.error(f"[BufferedFileWriter] Write {len(lines)} rows to {sink.path} failed: {e}, retry row by row")
+                written += self._write_rows(sink, lines, fsync)
+        return written
+
+    def _write_rows(self, sink: _FileSink, lines: List[str], fsync: bool) -> int:
+        written = 0
+        for line in lines:
+            try:
+                written += sink.write([line], False)
+            except Exception as e:
+                self.write_errors += 1
+                utils.logger.error(f"[BufferedFileWriter] Drop row for {sink.path}: {e}")
+        if fsync and written:
+            try:
+                sink.write([], True)
+            except Exception as e:
+                utils.logger.error(f"[BufferedFileWriter] Fsync {sink.path} failed: {e}")
+        return written
+
+    def _select(self, paths: Optional[Iterable[str]]) -> List[_FileSink]:
+        if paths is None:
+            return list(self._sinks.values())
+        return [self._sinks[p] for p in paths if p in self._sinks]
+
+    async def flush(self, paths: Optional[Iterable[str]] = None) -> None:
+        """
+        立即写出缓冲数据
+        Args:
+            paths: 只写出这些文件，为空时写出全部
+        """
+        if self._sinks and self._loop is asyncio.get_running_loop():
+            await self._commit(self._select(paths), self.fsync_policy == FSYNC_COMMIT, complete=paths is None)
+        else:
+            # 没有在当前事件循环中写入过，直接同步写出遗留数据
+            self.flush_sync(paths)
+
+    async def close_files(self, paths: Iterable[str]) -> None:
+        """写出并关闭指定文件，之后再写入会重新打开"""
+        paths = list(paths)
+        await self.flush(paths)
+        fsync = self.fsync_policy != FSYNC_NEVER
+        for sink in self._select(paths):
+            # flush 等待期间可能又有新数据写入
+            self.flush_sync([sink.path])
+            await asyncio.to_thread(sink.close, fsync)
+            del self._sinks[sink.path]
+
+    async def close(self) -> None:
+        """停止后台任务，写出全部缓冲数据并关闭所有文件"""
+        if self._task is not None and not self._task.done() and self._loop is asyncio.get_running_loop():
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+        self._task = None
+        await self.flush()
+        await self.close_files(list(self._sinks))
+        if self.commits:
+            utils.logger.info(f"[BufferedFileWriter.close] Buffered writer stats: {self.stats()}")
+
+    def flush_sync(self, paths: Optional[Iterable[str]] = None) -> None:
+        """在当前线程中同步写出缓冲数据，用于无法再等待事件循环的场景（如强制退出前）"""
+        seq = self._appended_seq
+        batch = [(sink, sink.take()) for sink in self._select(paths) if sink.pending]
+        if batch:
+            self._pending_bytes -= sum(len(text) for _, lines in batch for text in lines)
+            self.bytes_written += self._write_batch(batch, self.fsync_policy != FSYNC_NEVER)
+            self.commits += 1
+        # 后台线程仍在写入上一批数据时，不能确认此前的数据都已写入
+        if paths is None and not (self._commit_lock is not None and self._commit_lock.locked()):
+            self._mark_committed(seq)
+
+    def stats(self) -> Dict:
+        return {
+            "rows": self.rows,
+            "commits": self.commits,
+            "bytes_written": self.bytes_written,
+            "write_errors": self.write_errors,
+            "pending_bytes": self._pending_bytes,
+            "open_files": len(self._sinks),
+        }
+
+
+buffered_file_writer = BufferedFileWriter(
+    flush_bytes=config.FILE_WRITER_FLUSH_BYTES,
+    flush_interval=config.FILE_WRITER_FLUSH_INTERVAL_SEC,
+    fsync_policy=config.FILE_WRITER_FSYNC,
+)
+# 不经过 tools/app_runner.run 的脚本退出时也写出遗留的缓冲数据
+atexit.register(buffered_file_writer.flush_sync)
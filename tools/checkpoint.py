@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/checkpoint.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# 断点续爬日志：爬取过程中每完成一项工作就追加一行 JSON（JSONL），
+# 进程异常退出后按 run_id 重放日志即可从中断处继续
+
+import json
+import os
+import secrets
+import time
+from typing import Any, Dict, List, Optional
+
+import config
+from tools import jsoncodec, utils
+
+
+def new_run_id() -> str:
+    """生成新的运行ID，如 20250101-120000-a1b2c3"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+
+
+def checkpoint_path(run_id: str, platform: Optional[str] = None) -> str:
+    """运行ID对应的断点日志路径：<CHECKPOINT_DIR>/<platform>/<run_id>.jsonl"""
+    if not run_id or os.path.basename(run_id) != run_id:
+        raise ValueError(f"invalid run id: {run_id!r}")
+    return os.path.join(config.CHECKPOINT_DIR, platform or config.PLATFORM, f"{run_id}.jsonl")
+
+
+class CheckpointJournal:
+    """
+    只追加的断点日志
+
+    每条记录写入后立即 flush 到操作系统，进程被 SIGTERM/SIGKILL 或崩溃时已写入的记录不会丢失；
+    重放时忽略最后一行写了一半的记录
+    """
+
+    def __init__(self, path: str):
+        file_dir = os.path.dirname(path)
+        if file_dir:
+            os.makedirs(file_dir, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, record_type: str, **fields: Any) -> None:
+        if self._file is None:
+            return
+        record = {"type": record_type, "ts": round(time.time(), 3), **fields}
+        self._file.write(jsoncodec.dumps(record) + "\n")
+        self._file.flush()
+
+    @staticmethod
+    def replay(path: str) -> List[Dict[str, Any]]:
+        """读取断点日志中的全部记录，文件不存在时返回空列表"""
+        if not os.path.exists(path):
+            return []
+        records: List[Dict[str, Any]] = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(jsoncodec.loads(line))
+                except json.JSONDecodeError:
+                    utils.logger.warning(f"[CheckpointJournal.replay] Skip broken record at {path}:{line_no}")
+        return records
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+
+def read_run_info(run_id: str, platform: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    读取运行开始时记录的运行信息（关键词、开始时间等），断点日志不存在时返回 None
+    """
+    for record in CheckpointJournal.replay(checkpoint_path(run_id, platform)):
+        if record.get("type") == "run":
+            return record
+    return None
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/httpx_client_pool.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 长连接 httpx 客户端池：每个代理 URL 对应一个常驻的 AsyncClient（连接池），
+# 复用 TCP/TLS 连接，避免每个请求都重新握手。
+
+import asyncio
+from typing import Dict, Optional, Set
+
+import httpx
+
+from tools import utils
+
+try:
+    import h2  # noqa: F401  httpx 开启 http2 需要安装 h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 直连（不走代理）时在字典中使用的 key
+_DIRECT_KEY = ""
+
+
+class HttpxClientPool:
+    """
+    按代理 URL 管理的 httpx.AsyncClient 池
+
+    - 同一个代理 URL 复用同一个 AsyncClient，连接保持 keep-alive
+    - 代理切换后旧的 AsyncClient 会在宽限期后关闭，避免打断进行中的请求
+    - close() 关闭所有连接池，应在爬虫退出时调用
+    """
+
+    def __init__(
+        self,
+        timeout: float = 60,
+        http2: bool = True,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+    ):
+        self._timeout = timeout
+        self._http2 = http2 and HTTP2_AVAILABLE
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._retire_tasks: Set[asyncio.Task] = set()
+        # 已下线、等待宽限期结束后关闭的客户端
+        self._retiring: Set[httpx.AsyncClient] = set()
+        self._closed = False
+
+    @property
+    def http2(self) -> bool:
+        return self._http2
+
+    def get_client(self, proxy: Optional[str] = None) -> httpx.AsyncClient:
+        """
+        获取代理对应的长连接客户端，不存在则创建
+        Args:
+            proxy: httpx 代理URL，None 表示直连
+
+        Returns:
+            httpx.AsyncClient
+        """
+        if self._closed:
+            raise RuntimeError("[HttpxClientPool.get_client] client pool already closed")
+        key = proxy or _DIRECT_KEY
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                proxy=proxy,
+                timeout=self._timeout,
+                limits=self._limits,
+                http2=self._http2,
+            )
+            self._clients[key] = client
+            utils.logger.info(
+                f"[HttpxClientPool.get_client] New connection pool created, proxy: {proxy or 'direct'}, http2: {self._http2}"
+            )
+        return client
+
+    def retire(self, proxy: Optional[str], grace_seconds: Optional[float] = None) -> None:
+        """
+        下线某个代理对应的连接池，等待宽限期（默认等于请求超时时间）后再关闭，
+        让已经发出的请求能正常结束
+        Args:
+            proxy: 需要下线的代理URL
+            grace_seconds: 宽限期（秒）
+        """
+        client = self._clients.pop(proxy or _DIRECT_KEY, None)
+        if client is None or client.is_closed:
+            return
+        delay = self._timeout if grace_seconds is None else grace_seconds
+        self._retiring.add(client)
+        task = asyncio.create_task(self._close_later(client, delay))
+        self._retire_tasks.add(task)
+        task.add_done_callback(self._retire_tasks.discard)
+
+    async def _close_later(self, client: httpx.AsyncClient, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._retiring.discard(client)
+        await client.aclose()
+
+    async def close(self) -> None:
+        """
+        关闭所有连接池
+        """
+        self._closed = True
+        for task in list(self._retire_tasks):
+            task.cancel()
+        if self._retire_tasks:
+            await asyncio.gather(*self._retire_tasks, return_exceptions=True)
+        # 被取消的下线任务可能还没开始执行，它们的客户端在此一并关闭
+        clients = [*self._clients.values(), *self._retiring]
+        self._clients.clear()
+        self._retiring.clear()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                utils.logger.error(f"[HttpxClientPool.close] close client error: {e}")
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/jsoncodec.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# JSON 编解码层：安装了 orjson 时使用 orjson，否则回退到标准库 json。
+# 热路径（接口响应解析、JSONL 写入、[EVENT] 日志、分析读取）统一走这里，
+# 签名相关的序列化使用 dumps_compact，保证与标准库输出逐字节一致。
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+BACKEND = "orjson" if ORJSON_AVAILABLE else "json"
+
+# 与 orjson 默认输出一致：紧凑分隔符、不转义非 ASCII 字符
+_STDLIB_DUMPS_KWARGS = {"ensure_ascii": False, "separators": (",", ":")}
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """
+    解析 JSON 文本（str 或 UTF-8 bytes）
+
+    orjson 不接受 NaN/Infinity 等标准库可以解析的非标准写法，此时回退到标准库，
+    解析失败统一抛出 json.JSONDecodeError（orjson.JSONDecodeError 是它的子类）
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """
+    序列化为 JSON 字符串：紧凑分隔符、保留非 ASCII 字符
+
+    orjson 无法序列化的对象（非字符串 key、超过 64 位的整数等）回退到标准库，
+    标准库也无法序列化时抛出 TypeError
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, **_STDLIB_DUMPS_KWARGS)
+
+
+def dumps_compact(obj: Any) -> str:
+    """
+    签名使用的序列化：与 json.dumps(obj, separators=(",", ":"), ensure_ascii=False) 逐字节一致
+
+    orjson 的浮点数格式（如 1e-5 与 1e-05）、NaN 等与标准库不同，签名字符串与请求体必须完全一致，
+    所以这里固定使用标准库（C 实现的 encoder，签名 payload 很小，两者耗时相差无几）
+    """
+    return json.dumps(obj, **_STDLIB_DUMPS_KWARGS)
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/media_downloader.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 媒体下载器：与笔记流水线解耦的有界下载队列 + 固定数量的下载 worker。
+# 响应体按块流式写入 <目标文件>.part，下载完成后原子重命名为目标文件；
+# 中断后再次下载同一文件时用 HTTP Range 从 .part 的末尾续传。所有下载共享一个字节/秒限速。
+
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiofiles
+import httpx
+
+from tools import utils
+from tools.rate_limiter import TokenBucket
+
+_PART_SUFFIX = ".part"
+
+
+class MediaJob:
+    """一个下载任务"""
+
+    def __init__(self, url: str, path: str, headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.path = path
+        self.headers = headers or {}
+        self.attempts = 0
+
+
+class MediaDownloader:
+    """
+    媒体下载器
+
+    使用方法：
+        downloader = MediaDownloader(client_factory, concurrency=4)
+        downloader.start()
+        await downloader.submit(url, "data/xhs/videos/<note_id>/0.mp4")
+        ...
+        await downloader.join()   # 等待队列中的下载全部完成
+        await downloader.close()
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Awaitable[httpx.AsyncClient]],
+        concurrency: int = 4,
+        queue_size: int = 100,
+        max_bytes_per_sec: int = 0,
+        chunk_size: int = 256 * 1024,
+        max_attempts: int = 3,
+    ):
+        """
+        Args:
+            client_factory: 返回 httpx.AsyncClient 的协程函数（每次下载前调用，代理切换后自动使用新连接池）
+            concurrency: 下载 worker 数量
+            queue_size: 等待下载的任务数上限，队列满时 submit 等待（背压）
+            max_bytes_per_sec: 所有下载共享的速率上限（字节/秒），0 表示不限速
+            chunk_size: 每次写入磁盘的块大小（字节）
+            max_attempts: 单个文件最多尝试次数，每次重试从已下载的位置续传
+        """
+        self._client_factory = client_factory
+        self._concurrency = max(1, concurrency)
+        self._queue: "asyncio.Queue[MediaJob]" = asyncio.Queue(maxsize=max(1, queue_size))
+        self._chunk_size = max(1024, chunk_size)
+        self._max_attempts = max(1, max_attempts)
+        self._bandwidth: Optional[TokenBucket] = None
+        if max_bytes_per_sec > 0:
+            self._bandwidth = TokenBucket(rate=max_bytes_per_sec, capacity=max(max_bytes_per_sec, self._chunk_size))
+        self._workers: List[asyncio.Task] = []
+        self._pending_paths: set = set()
+        self.completed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.resumed = 0
+        self.bytes_downloaded = 0
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self._concurrency)]
+
+    async def submit(self, url: str, path: str, headers: Optional[Dict[str, str]] = None) -> bool:
+        """
+        提交下载任务，目标文件已存在或已在队列中时跳过
+
+        Returns:
+            是否加入了队列
+        """
+        if os.path.exists(path) or path in self._pending_paths:
+            self.skipped += 1
+            return False
+        self._pending_paths.add(path)
+        await self._queue.put(MediaJob(url, path, headers))
+        return True
+
+    async def join(self) -> None:
+        """等待已提交的下载全部结束"""
+        if self._workers:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """停止所有 worker，未完成的下载保留 .part 文件，下次运行时续传"""
+        for task in self._workers:
+            task.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        utils.logger.info(f"[MediaDownloader.close] Media download stats: {self.stats()}")
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._download_with_retry(job)
+            except Exception as e:
+                self.failed += 1
+                utils.logger.error(f"[MediaDownloader._worker] download {job.url} error: {e}")
+            finally:
+                self._pending_paths.discard(job.path)
+                self._queue.task_done()
+
+    async def _download_with_retry(self, job: MediaJob) -> None:
+        while True:
+            job.attempts += 1
+            try:
+                await self._download(job)
+                self.completed += 1
+                utils.logger.info(f"[MediaDownloader._download_with_retry] save media {job.path} success ...")
+                return
+            except (httpx.HTTPError, OSError) as e:
+                if job.attempts >= self._max_attempts:
+                    self.failed += 1
+                    utils.logger.error(
+                        f"[MediaDownloader._download_with_retry] download {job.url} failed after {job.attempts} attempts: "
+                        f"{e.__class__.__name__} {e}"
+                    )
+                    return
+                utils.logger.warning(
+                    f"[MediaDownloader._download_with_retry] download {job.url} error: {e.__class__.__name__} {e}, "
+                    f"resume later (attempt {job.attempts})"
+                )
+                await asyncio.sleep(job.attempts)
+
+    async def _download(self, job: MediaJob) -> None:
+        part_path = job.path + _PART_SUFFIX
+        os.makedirs(os.path.dirname(job.path) or ".", exist_ok=True)
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = dict(job.headers)
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        client = await self._client_factory()
+        async with client.stream("GET", job.url, headers=headers) as response:
+            if offset and response.status_code == 416:
+                # .part 已经是完整文件（上次在重命名前中断）
+                os.replace(part_path, job.path)
+                return
+            response.raise_for_status()
+            if offset and response.status_code == 206:
+                self.resumed += 1
+                mode = "ab"
+            else:
+                # 服务端不支持 Range 时返回完整内容，从头写入
+                mode = "wb"
+            async with aiofiles.open(part_path, mode) as f:
+                async for chunk in response.aiter_bytes(self._chunk_size):
+                    if self._bandwidth is not None:
+                        await self._bandwidth.acquire(len(chunk))
+                    await f.write(chunk)
+                    self.bytes_downloaded += len(chunk)
+        os.replace(part_path, job.path)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "completed": self.completed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "resumed": self.resumed,
+            "bytes": self.bytes_downloaded,
+            "queued": self._queue.qsize(),
+        }
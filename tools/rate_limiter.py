@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/rate_limiter.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# 自适应限速：所有 API 请求共享一个异步令牌桶，按 AIMD（加性增、乘性减）策略调整速率。
+# 出现验证码(461/471)或 IP 被封时立即降速并暂停一段时间，请求持续正常时缓慢提速。
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Hashable, Optional
+
+from tools import utils
+
+
+class TokenBucket:
+    """
+    异步令牌桶，rate 为每秒生成的令牌数，capacity 为允许的突发请求数
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self._rate = max(rate, 1e-6)
+        self._capacity = max(1.0, capacity)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        # 按到达顺序排队取令牌
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def set_rate(self, rate: float) -> None:
+        self._refill()
+        self._rate = max(rate, 1e-6)
+
+    def drain(self) -> None:
+        """清空桶内令牌，之后的请求需要按新速率重新积累令牌"""
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        获取令牌，令牌不足时等待
+        Args:
+            amount: 令牌数量（如按字节限速时为字节数），超过桶容量时按桶容量计
+        Returns:
+            等待的秒数
+        """
+        amount = min(amount, self._capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self._rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+class AdaptiveRateController:
+    """
+    AIMD 自适应限速器
+
+    - acquire(): 每个请求发出前调用，处于退避期时先等待退避结束，再从令牌桶取令牌
+    - on_success(): 响应正常，连续 recover_after 次正常后速率增加 increase_step
+    - on_throttled(): 出现验证码或 IP 被封，速率乘以 decrease_factor 并暂停 backoff_seconds 秒；
+      退避期内的其他限流信号只计数，不会重复降速
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 1.0,
+        min_rate: float = 0.2,
+        max_rate: float = 3.0,
+        burst: int = 2,
+        increase_step: float = 0.1,
+        recover_after: int = 20,
+        decrease_factor: float = 0.5,
+        backoff_seconds: float = 30.0,
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max(min_rate, max_rate)
+        self.increase_step = increase_step
+        self.recover_after = max(1, recover_after)
+        self.decrease_factor = decrease_factor
+        self.backoff_seconds = backoff_seconds
+        self._bucket = TokenBucket(min(max(initial_rate, min_rate), self.max_rate), burst)
+        self._clean_streak = 0
+        self._backoff_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self._bucket.rate
+
+    async def acquire(self) -> None:
+        start = time.monotonic()
+        while True:
+            backoff = self._backoff_until - time.monotonic()
+            if backoff <= 0:
+                break
+            await asyncio.sleep(backoff)
+        await self._bucket.acquire()
+        self.requests += 1
+        self.total_wait += time.monotonic() - start
+
+    def on_success(self) -> None:
+        self._clean_streak += 1
+        if self._clean_streak < self.recover_after or self.rate >= self.max_rate:
+            return
+        self._clean_streak = 0
+        self._bucket.set_rate(min(self.max_rate, self.rate + self.increase_step))
+        utils.logger.info(f"[AdaptiveRateController.on_success] Rate increased to {self.rate:.2f} req/s")
+
+    def on_throttled(self, reason: str = "") -> None:
+        self.throttled += 1
+        self._clean_streak = 0
+        now = time.monotonic()
+        if now < self._backoff_until:
+            return
+        self._bucket.set_rate(max(self.min_rate, self.rate * self.decrease_factor))
+        self._bucket.drain()
+        self._backoff_until = now + self.backoff_seconds
+        utils.logger.warning(
+            f"[AdaptiveRateController.on_throttled] Throttled ({reason}), rate decreased to {self.rate:.2f} req/s, "
+            f"backoff {self.backoff_seconds}s"
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "rate": round(self.rate, 3),
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "total_wait_sec": round(self.total_wait, 2),
+        }
+
+
+class WeightedFairGate:
+    """
+    加权公平放行：多个调用方（如并发执行的多个关键词）共享同一个限速器时，
+    每取到一个令牌就按平滑加权轮询（smooth weighted round-robin）选出下一个放行的调用方，
+    请求密集的调用方不会占满令牌，总速率仍由限速器决定
+    """
+
+    def __init__(self, limiter, weights: Optional[Dict[Hashable, float]] = None):
+        """
+        Args:
+            limiter: 提供 async acquire() 的限速器，如 AdaptiveRateController
+            weights: 各调用方的权重，未设置的调用方权重为 1
+        """
+        self._limiter = limiter
+        self._weights: Dict[Hashable, float] = dict(weights or {})
+        self._waiters: Dict[Hashable, Deque[asyncio.Future]] = {}
+        self._current: Dict[Hashable, float] = {}
+        self._dispatcher: Optional[asyncio.Task] = None
+        # 已从限速器取到、但等待期间等待者全部取消而没有放行出去的令牌，留给下一个等待者
+        self._spare_token = False
+        self._closed = False
+        self.granted: Dict[Hashable, int] = defaultdict(int)
+
+    def set_weight(self, key: Hashable, weight: float) -> None:
+        self._weights[key] = max(weight, 1e-6)
+
+    async def acquire(self, key: Hashable = "") -> None:
+        """按调用方排队等待放行"""
+        if self._closed:
+            raise RuntimeError("[WeightedFairGate.acquire] gate already closed")
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(future)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    def _prune(self) -> None:
+        """移除已取消的等待者"""
+        for key in list(self._waiters):
+            waiters = self._waiters[key]
+            while waiters and waiters[0].done():
+                waiters.popleft()
+            if not waiters:
+                del self._waiters[key]
+                self._current.pop(key, None)
+
+    def _pick(self) -> Hashable:
+        total = 0.0
+        best_key, best_current = None, None
+        for key in self._waiters:
+            weight = self._weights.get(key, 1.0)
+            total += weight
+            current = self._current.get(key, 0.0) + weight
+            self._current[key] = current
+            if best_current is None or current > best_current:
+                best_key, best_current = key, current
+        self._current[best_key] -= total
+        return best_key
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._prune()
+            if not self._waiters:
+                return
+            if not self._spare_token:
+                await self._limiter.acquire()
+                self._spare_token = True
+                self._prune()
+                if not self._waiters:
+                    return
+            key = self._pick()
+            self._waiters[key].popleft().set_result(None)
+            self._spare_token = False
+            self.granted[key] += 1
+
+    async def close(self) -> None:
+        """停止放行任务，仍在等待的调用方收到 RuntimeError"""
+        self._closed = True
+        if self._dispatcher is not None and not self._dispatcher.done():
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+        self._dispatcher = None
+        for waiters in self._waiters.values():
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(RuntimeError("[WeightedFairGate.close] gate closed"))
+        self._waiters.clear()
+        self._current.clear()
+
+    def stats(self) -> Dict[Hashable, int]:
+        return dict(self.granted)
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/retry_policy.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+# 重试策略：按失败类型决定是否重试（临时失败、限流、永久失败、认证失效），
+# 指数退避 + 随机抖动，整个运行共享一个重试预算，并且每个接口一个熔断器，
+# 熔断期间请求直接失败，不再占用限速令牌和等待时间。
+
+import asyncio
+import enum
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Type, TypeVar
+
+from tools import utils
+
+T = TypeVar("T")
+
+
+class FailureClass(enum.Enum):
+    # 临时失败（网络错误、超时、响应无法解析等），退避后重试，计入熔断
+    TRANSIENT = "transient"
+    # 被限流（IP 被封等），用更长的退避时间重试
+    THROTTLED = "throttled"
+    # 永久失败（笔记状态异常等），不重试
+    PERMANENT = "permanent"
+    # 认证失效（签名被拒、验证码、登录过期），不重试，由调用方重新签名或人工处理
+    AUTH_EXPIRED = "auth_expired"
+    # 无法分类（代码错误等），不重试，不反映接口健康状况
+    UNKNOWN = "unknown"
+
+
+class BreakerOpenError(Exception):
+    """接口处于熔断状态，请求未发出"""
+
+
+class RetryBudget:
+    """
+    运行级重试预算：允许的重试次数 = min_retries + 请求次数 * ratio
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10):
+        self.ratio = max(0.0, ratio)
+        self.min_retries = max(0, min_retries)
+        self.requests = 0
+        self.retries = 0
+        self.denied = 0
+
+    def record_request(self) -> None:
+        self.requests += 1
+
+    def try_spend(self) -> bool:
+        """预算充足时消耗一次重试并返回 True"""
+        if self.retries >= self.min_retries + self.requests * self.ratio:
+            self.denied += 1
+            return False
+        self.retries += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "retries": self.retries, "denied": self.denied}
+
+
+class CircuitBreaker:
+    """
+    单个接口的熔断器
+
+    - closed: 正常放行，连续 failure_threshold 次临时失败后进入 open
+    - open: 直接拒绝，recovery_seconds 秒后进入 half_open
+    - half_open: 只放行一个探测请求，成功则 closed，失败则重新 open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_seconds: float = 30):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_seconds = max(0.0, recovery_seconds)
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opens = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_seconds:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                self.rejected += 1
+                return False
+            self._probing = True
+        return True
+
+    def on_success(self) -> None:
+        if self.state != self.CLOSED:
+            utils.logger.info(f"[CircuitBreaker.on_success] Endpoint {self.name} recovered, circuit closed")
+        self.state = self.CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def on_failure(self) -> None:
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._open()
+
+    def on_cancelled(self) -> None:
+        """请求被取消或失败原因无法分类，结果不反映接口健康状况，释放探测名额"""
+        self._probing = False
+
+    def _open(self) -> None:
+        if self.state != self.OPEN:
+            self.opens += 1
+            utils.logger.warning(
+                f"[CircuitBreaker._open] Endpoint {self.name} circuit open for {self.recovery_seconds}s, "
+                f"consecutive failures: {self._failures}"
+            )
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "opens": self.opens, "rejected": self.rejected}
+
+
+class RetryPolicy:
+    """
+    重试策略
+
+    使用方法：
+        policy = RetryPolicy(classify=classify_failure)
+        data = await policy.call("search", lambda: do_request())
+    """
+
+    def __init__(
+        self,
+        classify: Callable[[BaseException], FailureClass],
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        throttled_base_delay: float = 5.0,
+        budget: Optional[RetryBudget] = None,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 30,
+        open_error: Type[Exception] = BreakerOpenError,
+    ):
+        """
+        Args:
+            classify: 异常分类函数
+            max_attempts: 单个请求最多尝试次数（含首次）
+            base_delay: 临时失败的退避基础时间（秒）
+            max_delay: 单次退避时间上限（秒）
+            throttled_base_delay: 限流失败的退避基础时间（秒）
+            budget: 重试预算，为空时不限制
+            failure_threshold: 熔断阈值（连续临时失败次数）
+            recovery_seconds: 熔断持续时间（秒）
+            open_error: 熔断时抛出的异常类型，调用方可以传入同时继承自身异常体系和 BreakerOpenError 的子类
+        """
+        self._classify = classify
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = max(0.0, base_delay)
+        self.max_delay = max(0.0, max_delay)
+        self.throttled_base_delay = max(0.0, throttled_base_delay)
+        self.budget = budget
+        self._failure_threshold = failure_threshold
+        self._recovery_seconds = recovery_seconds
+        self._open_error = open_error
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.failures: Dict[str, int] = {c.value: 0 for c in FailureClass}
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(endpoint, self._failure_threshold, self._recovery_seconds)
+            self._breakers[endpoint] = breaker
+        return breaker
+
+    def backoff(self, attempt: int, failure: FailureClass) -> float:
+        """第 attempt 次失败后的等待时间：full jitter 指数退避"""
+        base = self.throttled_base_delay if failure == FailureClass.THROTTLED else self.base_delay
+        return random.uniform(0, min(self.max_delay, base * 2 ** (attempt - 1)))
+
+    async def call(self, endpoint: str, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        按策略执行 func，重试结束后抛出最后一次的异常
+
+        Args:
+            endpoint: 接口名，每个接口一个熔断器
+            func: 每次尝试调用的协程函数
+
+        Raises:
+            open_error: 接口处于熔断状态
+        """
+        breaker = self.breaker(endpoint)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise self._open_error(f"endpoint {endpoint} circuit is open")
+            attempt += 1
+            if self.budget is not None:
+                self.budget.record_request()
+            try:
+                result = await func()
+            except asyncio.CancelledError:
+                breaker.on_cancelled()
+                raise
+            except Exception as e:
+                failure = self._classify(e)
+                self.failures[failure.value] += 1
+                if failure == FailureClass.TRANSIENT:
+                    breaker.on_failure()
+                elif failure == FailureClass.UNKNOWN:
+                    # 不知道请求是否得到了服务端的响应，半开探测不能据此恢复
+                    breaker.on_cancelled()
+                else:
+                    # 服务端给出了明确的响应（限流、业务错误、认证失效），接口本身是可用的
+                    breaker.on_success()
+                if failure in (FailureClass.PERMANENT, FailureClass.AUTH_EXPIRED, FailureClass.UNKNOWN):
+                    raise
+                if attempt >= self.max_attempts or breaker.state == CircuitBreaker.OPEN:
+                    raise
+                if self.budget is not None and not self.budget.try_spend():
+                    utils.logger.warning(f"[RetryPolicy.call] Retry budget exhausted, give up {endpoint}: {e}")
+                    raise
+                delay = self.backoff(attempt, failure)
+                utils.logger.info(
+                    f"[RetryPolicy.call] {endpoint} {failure.value} failure (attempt {attempt}), retry in {delay:.2f}s: {e}"
+                )
+                await asyncio.sleep(delay)
+                continue
+            breaker.on_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "failures": dict(self.failures),
+            "budget": self.budget.stats() if self.budget is not None else None,
+            "breakers": {name: b.stats() for name, b in self._breakers.items()},
+        }
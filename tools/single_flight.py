@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 relakkes@gmail.com
+#
+# This file is part of MediaCrawler project.
+# Repository: https://github.com/NanmiCoder/MediaCrawler/blob/main/tools/single_flight.py
+# GitHub: https://github.com/NanmiCoder
+# Licensed under NON-COMMERCIAL LEARNING LICENSE 1.1
+#
+
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# 请求合并（single-flight）：同一个 key 同时只执行一次协程，
+# 执行期间到达的相同调用直接等待并共享这次的结果
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    使用方法：
+        flight = SingleFlight()
+        res = await flight.do(("note_detail", note_id), lambda: client.get(...))
+    """
+
+    def __init__(self, copy_shared: bool = True):
+        """
+        Args:
+            copy_shared: 等待方拿到的是结果的深拷贝，避免调用方修改结果时互相影响
+        """
+        self._copy_shared = copy_shared
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is not None:
+            self.shared += 1
+            result = await asyncio.shield(task)
+            return copy.deepcopy(result) if self._copy_shared else result
+
+        # 用独立的 task 执行，发起方被取消时不影响其他等待方
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+        self.executed += 1
+        task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # 所有等待方都已取消时避免 "exception was never retrieved" 警告
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {"executed": self.executed, "shared": self.shared, "inflight": len(self._calls)}
@@ -23,8 +23,10 @@
 # @Time    : 2023/12/2 12:52
 # @Desc    : 时间相关的工具函数
 
+import re
 import time
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 
 def get_current_timestamp() -> int:
@@ -98,6 +100,31 @@ def get_unix_timestamp():
     return int(time.time())
 
 
+def parse_time_bound(value: str, end_of_day: bool = False) -> Optional[int]:
+    """
+    解析命令行中的时间边界 ==> 13 位时间戳
+    支持 '2024-01-01'、'2024-01-01 08:00:00' 以及相对天数 '30d'（30 天前）
+    :param value:
+    :param end_of_day: 只有日期时取当天结束时刻（用于区间上界）
+    :return: 为空时返回 None，格式错误时抛出 ValueError
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    relative = re.fullmatch(r"(\d+)\s*d", value, re.IGNORECASE)
+    if relative:
+        return int((datetime.now() - timedelta(days=int(relative.group(1)))).timestamp() * 1000)
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            dt = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if fmt == "%Y-%m-%d" and end_of_day:
+            dt = dt + timedelta(days=1) - timedelta(milliseconds=1)
+        return int(dt.timestamp() * 1000)
+    raise ValueError(f"invalid time: {value!r}, expected YYYY-MM-DD, 'YYYY-MM-DD HH:MM:SS' or '<n>d'")
+
+
 def rfc2822_to_china_datetime(rfc2822_time):
     # 定义RFC 2822格式
     rfc2822_format = "%a %b %d %H:%M:%S %z %Y"